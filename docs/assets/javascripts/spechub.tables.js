@@ -240,6 +240,76 @@
     }
     refresh();
   }
+  // Sparse coverage matrices: rows come from the CSR sidecar (rows, cols, indptr, indices), fetched once visible
+  function renderCoverage(el, data){
+    var pageSize = parseInt(el.getAttribute('data-page-size'), 10) || 50;
+    var rowFormat = el.getAttribute('data-row-format') || '{}';
+    var id = 'coverage-' + slug(el.getAttribute('data-coverage-src')||'').replace(/[^a-z0-9_\-]+/g,'-');
+    var rows = data.rows.map(function(r, i){
+      var cols = data.indices.slice(data.indptr[i], data.indptr[i+1]).map(function(j){ return data.cols[j]; });
+      var label = rowFormat.replace('{}', r);
+      return {label: label, cols: cols, text: slug(label+' '+cols.join(' '))};
+    });
+    el.innerHTML =
+      '<div class="table-toolbar">' +
+      '<input id="filter-'+id+'" type="search" placeholder="Поиск…" aria-label="Search in '+(data.title||'coverage')+'" />' +
+      '<select id="show-'+id+'" aria-label="Rows"><option value="all">All rows</option><option value="covered">Covered</option><option value="uncovered">Uncovered</option></select>' +
+      '<button class="btn-export" type="button" data-page="-1">Prev</button>' +
+      '<button class="btn-export" type="button" data-page="1">Next</button>' +
+      '<span class="coverage-pages" aria-live="polite" id="live-'+id+'"></span>' +
+      '</div>' +
+      '<table id="'+id+'" class="spechub-table"><thead><tr>' +
+      '<th scope="col"></th><th scope="col">Covered</th><th scope="col">Columns</th>' +
+      '</tr></thead><tbody></tbody></table>';
+    $('th', el).textContent = data.row_label || el.getAttribute('data-row-label') || '';
+    var input = $('#filter-'+id, el), show = $('#show-'+id, el), live = $('#live-'+id, el), tbody = $('tbody', el);
+    var page = 0, matched = rows;
+    function draw(){
+      var pages = Math.max(1, Math.ceil(matched.length / pageSize));
+      page = Math.min(Math.max(page, 0), pages - 1);
+      tbody.textContent = '';
+      matched.slice(page * pageSize, (page + 1) * pageSize).forEach(function(r){
+        var tr = document.createElement('tr');
+        [r.label, String(r.cols.length), r.cols.join(', ')].forEach(function(v){
+          var td = document.createElement('td'); td.textContent = v; tr.appendChild(td);
+        });
+        tbody.appendChild(tr);
+      });
+      live.textContent = 'Найдено: '+matched.length+' · '+(page+1)+' / '+pages;
+    }
+    function refresh(){
+      var q = slug(input.value||''), mode = show.value;
+      matched = rows.filter(function(r){
+        if(mode==='covered' && !r.cols.length) return false;
+        if(mode==='uncovered' && r.cols.length) return false;
+        return !q || r.text.indexOf(q) !== -1;
+      });
+      page = 0; draw();
+    }
+    input.addEventListener('input', refresh);
+    show.addEventListener('change', refresh);
+    $all('button[data-page]', el).forEach(function(btn){
+      btn.addEventListener('click', function(){ page += parseInt(btn.getAttribute('data-page'), 10); draw(); });
+    });
+    refresh();
+  }
+  function loadCoverage(el){
+    if(el.getAttribute('data-loaded')) return;
+    el.setAttribute('data-loaded', '1');
+    fetch(el.getAttribute('data-coverage-src'))
+      .then(function(r){ if(!r.ok) throw new Error(r.status); return r.json(); })
+      .then(function(data){ renderCoverage(el, data); })
+      .catch(function(){ el.textContent = 'Coverage data could not be loaded.'; });
+  }
+  function attachCoverage(){
+    var els = $all('.coverage-matrix[data-coverage-src]');
+    if(!els.length) return;
+    if(!('IntersectionObserver' in window)){ els.forEach(loadCoverage); return; }
+    var io = new IntersectionObserver(function(entries){
+      entries.forEach(function(entry){ if(entry.isIntersecting){ io.unobserve(entry.target); loadCoverage(entry.target); } });
+    }, {rootMargin: '200px'});
+    els.forEach(function(el){ io.observe(el); });
+  }
   function highlightAnchor(){
     var h = location.hash||''; var id = null;
     if(h.startsWith('#row-')) id = h.slice(1);
@@ -252,6 +322,7 @@
   }
   function init(){
     $all('table[data-table]').forEach(attachTable);
+    attachCoverage();
     // Apply filters on hash change
     window.addEventListener('hashchange', function(){ $all('table[data-table]').forEach(function(tbl){ var fid='filter-'+tbl.id; var input=document.getElementById(fid); applyFilters(tbl, parseHashQuery(), input?input.value:''); }); highlightAnchor(); });
     highlightAnchor();
@@ -7,24 +7,28 @@ Generates Markdown pages in docs/ from specs/_build/*.json and renders DOT→SVG
 MVP scope:
  - Parse PRD, CJM, User Flow, User Stories, UX Principles, HIG, Contextual UX JSONs
  - Create per-entity Markdown using Jinja2 templates in docs/_templates/
- - Render userflow.svg and coverage.svg into docs/_media/
+ - Render userflow.svg (domain summary), per-domain and per-CJM-stage flow shards and coverage.svg into docs/_media/
+ - Write coverage matrices (dense tables, or sparse listings for large ones) with JSON sidecars in docs/coverage/
  - Build mkdocs.yml navigation automatically based on generated files
 
 This script is idempotent and safe to run multiple times.
 """
 from __future__ import annotations
 
+import array
+import hashlib
 import json
 import os
+import struct
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 import subprocess
+import tempfile
 import datetime
 
 # Third-party
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-import pydot
 
 # Optional import: markdownify for rich text fallbacks
 try:
@@ -33,7 +37,35 @@ except Exception:
     def md(s: str) -> str:
         return s
 
+class PageRegistry:
+    """Docs-relative .md pages that exist once the current run is done, answered from memory.
+
+    Seeded by one scan of docs/, minus pages this run will delete, plus the pages it plans to write;
+    links resolve against the run's output regardless of the order (or worker) pages render in.
+    """
+
+    def __init__(self, pages=()):
+        self.pages = set(pages)
+
+    @classmethod
+    def scan(cls, docs_dir: Path) -> "PageRegistry":
+        pages = set()
+        for dirpath, dirnames, filenames in os.walk(docs_dir):
+            dirnames[:] = [d for d in dirnames if not d.startswith((".", "_"))]
+            rel = Path(dirpath).relative_to(docs_dir).as_posix()
+            pages.update(f if rel == "." else f"{rel}/{f}" for f in filenames if f.endswith(".md"))
+        return cls(pages)
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.pages
+
+
+# Registry of the render in progress (render_site); None falls back to the filesystem
+_PAGES: Optional[PageRegistry] = None
+
 def page_exists(rel_path: str) -> bool:
+    if _PAGES is not None:
+        return rel_path in _PAGES
     return (DOCS_DIR / rel_path).exists()
 
 def chip(rel_path: Optional[str], label: str) -> Dict[str, Optional[str]]:
@@ -59,6 +91,17 @@ REQUIRED_FILES = {
 }
 
 GRAPH_FILE = BUILD_DIR / "graph.json"  # optional in MVP; script should tolerate absence
+# Columnar copy of graph.json written by build.py (write_compact_graph); used for the adjacency index when fresh
+COMPACT_GRAPH_FILE = BUILD_DIR / "graph.bin"
+COMPACT_GRAPH_MAGIC = b"SPHG"
+COMPACT_GRAPH_VERSION = 3
+# Content hashes of generated files (gitignored; dotfiles are not published by mkdocs)
+MANIFEST_PATH = DOCS_DIR / ".docs_manifest.json"
+MANIFEST_VERSION = 1
+# Graphviz output keyed by DOT source hash (gitignored); least recently used entries go past the caps
+DIAGRAM_CACHE_DIR = DOCS_DIR / ".diagram_cache"
+DIAGRAM_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DIAGRAM_CACHE_MAX_FILES = 64
 
 
 def ensure_dirs() -> None:
@@ -76,6 +119,18 @@ def slugify(s: str) -> str:
     )
 
 
+def load_config() -> Dict[str, Any]:
+    """spechub.yml as a dict; empty when the file or PyYAML is missing or the file does not parse."""
+    try:
+        if CONFIG_FILE.exists():
+            import yaml  # type: ignore
+            cfg = yaml.safe_load(CONFIG_FILE.read_text(encoding="utf-8")) or {}
+            return cfg if isinstance(cfg, dict) else {}
+    except Exception:
+        pass
+    return {}
+
+
 def get_repo_base() -> Tuple[Optional[str], str]:
     """Return (repo_url, default_branch) for building edit links.
 
@@ -84,17 +139,9 @@ def get_repo_base() -> Tuple[Optional[str], str]:
     - If none available, return (None, branch).
     """
     # Prefer spechub.yml if present
-    cfg_repo: Optional[str] = None
-    cfg_branch: Optional[str] = None
-    try:
-        if CONFIG_FILE.exists():
-            import yaml  # type: ignore
-            cfg = yaml.safe_load(CONFIG_FILE.read_text(encoding="utf-8")) or {}
-            cfg_repo = cfg.get("repo_url")
-            cfg_branch = cfg.get("default_branch")
-    except Exception:
-        cfg_repo = None
-        cfg_branch = None
+    cfg = load_config()
+    cfg_repo: Optional[str] = cfg.get("repo_url")
+    cfg_branch: Optional[str] = cfg.get("default_branch")
     env_repo = os.environ.get("SPECHUB_REPO")
     default_branch = cfg_branch or os.environ.get("SPECHUB_DEFAULT_BRANCH", "main")
     repo_url: Optional[str] = None
@@ -116,20 +163,6 @@ def get_repo_base() -> Tuple[Optional[str], str]:
     return repo_url, default_branch
 
 
-REPO_URL, REPO_BRANCH = get_repo_base()
-
-
-def edit_link(rel_path: str) -> str:
-    """Build an edit/source link pointing to repo file path.
-
-    If repo URL unavailable, return the relative path.
-    """
-    if REPO_URL:
-        # Use blob path for viewing; rely on GitHub default file viewer
-        return f"{REPO_URL}/blob/{REPO_BRANCH}/{rel_path}"
-    return rel_path
-
-
 def load_json(path: Path) -> Dict[str, Any]:
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
@@ -160,28 +193,158 @@ def jinja_env() -> Environment:
         lstrip_blocks=True,
     )
     env.filters["slugify"] = slugify
-    # Expose repo globals to templates
-    env.globals["REPO_URL"] = REPO_URL
-    env.globals["REPO_BRANCH"] = REPO_BRANCH
     return env
 
 
 # ---------- Rendering helpers ----------
+def _sources_epoch() -> Optional[int]:
+    """Newest mtime of the spec sources (specs/** without _build), in seconds."""
+    stamps = [p.stat().st_mtime for p in (ROOT / "specs").rglob("*")
+              if p.is_file() and BUILD_DIR not in p.parents]
+    return int(max(stamps)) if stamps else None
+
+
 def get_build_info() -> Dict[str, str]:
-    ts = datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    # The timestamp goes into every page, so it must not change between runs over the same tree
+    # (unchanged pages are not rewritten): SOURCE_DATE_EPOCH if set, else the HEAD commit time,
+    # else the newest source mtime
+    epoch: Optional[int] = None
+    sha = "unknown"
     try:
-        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT)).decode().strip()
+        out = subprocess.check_output(["git", "log", "-1", "--format=%ct %h", "HEAD"], cwd=str(ROOT),
+                                      stderr=subprocess.DEVNULL).decode().split()
+        epoch, sha = int(out[0]), out[1]
     except Exception:
-        sha = "unknown"
+        pass
+    env_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if env_epoch and env_epoch.isdigit():
+        epoch = int(env_epoch)
+    if epoch is None:
+        epoch = _sources_epoch()
+    if epoch is None:
+        ts = datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    else:
+        ts = datetime.datetime.utcfromtimestamp(epoch).isoformat() + "Z"
     return {"timestamp": ts, "git_sha": sha}
 
-def write_file(path: Path, content: str) -> None:
+
+class RunContext(NamedTuple):
+    """Values shared by every page of one docs run; created once (git is asked once, not per page)."""
+
+    timestamp: str
+    git_sha: str
+    repo_url: Optional[str]
+    branch: str
+    schema_ok: Optional[bool]  # from SPECHUB_SCHEMA_STATUS: ok / failed / anything else is unknown
+
+    @classmethod
+    def create(cls) -> "RunContext":
+        repo_url, branch = get_repo_base()
+        bi = get_build_info()
+        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
+        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
+        return cls(bi["timestamp"], bi["git_sha"], repo_url, branch, schema_ok)
+
+    @property
+    def build_info(self) -> Dict[str, str]:
+        return {"timestamp": self.timestamp, "git_sha": self.git_sha}
+
+    def edit_link(self, rel_path: str) -> str:
+        """Build an edit/source link pointing to repo file path.
+
+        If repo URL unavailable, return the relative path.
+        """
+        if self.repo_url:
+            # Use blob path for viewing; rely on GitHub default file viewer
+            return f"{self.repo_url}/blob/{self.branch}/{rel_path}"
+        return rel_path
+
+    def render(self, tmpl, **kwargs) -> str:
+        """Render a page template with the run values (build badge, schema status, repo links) in scope."""
+        return tmpl.render(build_info=self.build_info, schema_ok=self.schema_ok,
+                           REPO_URL=self.repo_url, REPO_BRANCH=self.branch, **kwargs)
+
+class OutputManifest:
+    """Render manifest: skips rewriting files whose content is unchanged and deletes pages of removed entities.
+
+    Entries are keyed by repo-relative path and hold the content sha256, the size/mtime seen after the
+    last write (a matching stat skips re-reading the file) and the page group for per-entity pages.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        try:
+            prev = load_json(path)
+        except Exception:
+            prev = {}
+        self.files: Dict[str, Dict[str, Any]] = prev.get("files", {}) if prev.get("version") == MANIFEST_VERSION else {}
+        self.written: set = set()
+        self.counts = {"created": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+    def write(self, path: Path, content: str, group: Optional[str] = None) -> str:
+        rel = path.resolve().relative_to(ROOT).as_posix()
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self.files.get(rel) or {}
+        self.written.add(rel)
+        status = "created"
+        if path.exists():
+            st = path.stat()
+            same = (entry.get("sha256") == digest and entry.get("size") == st.st_size
+                    and entry.get("mtime_ns") == st.st_mtime_ns)
+            if not same and st.st_size == len(data):
+                same = path.read_bytes() == data
+            status = "unchanged" if same else "updated"
+        if status != "unchanged":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        st = path.stat()
+        self.files[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "group": group}
+        self.counts[status] += 1
+        return status
+
+    def owned(self, groups: Optional[set] = None) -> set:
+        """Docs-relative per-entity pages recorded for the given groups (all when None)."""
+        prefix = DOCS_DIR.relative_to(ROOT).as_posix() + "/"
+        return {rel[len(prefix):] for rel, entry in self.files.items()
+                if rel.startswith(prefix) and entry.get("group") is not None
+                and (groups is None or entry["group"] in groups)}
+
+    def prune(self, groups: Optional[set] = None) -> List[str]:
+        """Delete per-entity pages of the given groups (all when None) that this run did not write."""
+        deleted = []
+        for rel, entry in sorted(self.files.items()):
+            group = entry.get("group")
+            if rel in self.written or group is None or (groups is not None and group not in groups):
+                continue
+            (ROOT / rel).unlink(missing_ok=True)
+            del self.files[rel]
+            deleted.append(rel)
+        self.counts["deleted"] += len(deleted)
+        return deleted
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"version": MANIFEST_VERSION, "files": self.files}, indent=1, sort_keys=True),
+                             encoding="utf-8")
+
+
+# Manifest of the render in progress (render_site); None writes unconditionally
+_OUTPUT: Optional[OutputManifest] = None
+
+
+def write_file(path: Path, content: str, group: Optional[str] = None) -> None:
+    if _PAGES is not None and path.suffix == ".md" and DOCS_DIR in path.parents:
+        _PAGES.pages.add(path.relative_to(DOCS_DIR).as_posix())
+    if _OUTPUT is not None:
+        _OUTPUT.write(path, content, group)
+        return
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
         f.write(content)
 
 
-def render_index(env: Environment, artifacts: Dict[str, Any], graph: Dict[str, Any]) -> None:
+def render_index(env: Environment, ctx: RunContext, artifacts: Dict[str, Any], graph: Dict[str, Any]) -> None:
     tmpl = env.get_template("index.md.j2")
     # Basic counts for MVP
     prd_sections = len(artifacts.get("prd", {}).get("sections", [])) or len(artifacts.get("prd", {}).get("prd", []))
@@ -190,7 +353,7 @@ def render_index(env: Environment, artifacts: Dict[str, Any], graph: Dict[str, A
     stories = len(artifacts.get("stories", {}).get("stories", []))
     ctxux_screens = len(artifacts.get("ctxux", {}).get("screens", []))
 
-    bi = get_build_info()
+    bi = ctx.build_info
 
     content = tmpl.render(
         prd_sections=prd_sections,
@@ -212,299 +375,357 @@ def render_index(env: Environment, artifacts: Dict[str, Any], graph: Dict[str, A
     )
     write_file(DOCS_DIR / "index.md", content)
     # Persist build info for footer injection
-    build_meta = {**bi, "repo_url": REPO_URL or "", "branch": REPO_BRANCH}
+    build_meta = {**bi, "repo_url": ctx.repo_url or "", "branch": ctx.branch}
     write_file(DOCS_DIR / "assets" / "build.json", json.dumps(build_meta))
 
 
-def render_prd(env: Environment, prd: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not prd:
-        return
+def render_prd_page(env: Environment, ctx: RunContext, section: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
     tmpl = env.get_template("prd_section.md.j2")
-    prd_version = prd.get("version")
-    for section in prd.get("sections", []):
-        sec_id = section.get("id") or section.get("section_id") or "unknown"
-        path = DOCS_DIR / "prd" / f"{slugify(str(sec_id))}.md"
-        edit_href = edit_link(f"specs/00_prd/sections/{sec_id}.json")
-        # Cross-links from PRD section
-        prd_nid = f"prd:{sec_id}"
-        story_ids = [s.split(":",1)[1] for s in _connected(graph, prd_nid, "story:")]
-        flow_nodes = [n.split(":",2)[2] for n in _connected(graph, prd_nid, "flow:node:")]
-        story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
-        flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
-        xlinks = {"stories": story_chips, "flow": flow_chips}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(section=section, edit_href=edit_href, version=prd_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+    sec_id = section.get("id") or section.get("section_id") or "unknown"
+    edit_href = ctx.edit_link(f"specs/00_prd/sections/{sec_id}.json")
+    # Cross-links from PRD section
+    prd_nid = f"prd:{sec_id}"
+    story_ids = [s.split(":",1)[1] for s in _connected(graph, prd_nid, "story:")]
+    flow_nodes = [n.split(":",2)[2] for n in _connected(graph, prd_nid, "flow:node:")]
+    story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
+    flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
+    xlinks = {"stories": story_chips, "flow": flow_chips}
+    return ctx.render(tmpl, section=section, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_cjm_page(env: Environment, ctx: RunContext, stage: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    tmpl = env.get_template("cjm_stage.md.j2")
+    st_id = stage.get("id") or stage.get("stage_id") or "unknown"
+    edit_href = ctx.edit_link(f"specs/01_cjm/stages/{st_id}.json")
+    # Cross-links
+    cjm_nid = f"cjm:{st_id}"
+    story_ids = [s.split(":",1)[1] for s in _connected(graph, cjm_nid, "story:")]
+    flow_nodes = [n.split(":",2)[2] for n in _connected(graph, cjm_nid, "flow:node:")]
+    story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
+    flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
+    xlinks = {"stories": story_chips, "flow": flow_chips}
+    return ctx.render(tmpl, stage=stage, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_flow_page(env: Environment, ctx: RunContext, node: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    tmpl = env.get_template("flow_node.md.j2")
+    node_id = node.get("id")
+    # For edit link, map by type if needed. Node definitions live in specs/02_userflow/nodes/<domain>.json
+    # We cannot always derive the domain file; provide folder link as fallback
+    edit_href = ctx.edit_link("specs/02_userflow/nodes/")
+    # Cross-links (relative to docs/flow/nodes/<node>.md)
+    nid = f"flow:node:{node_id}"
+    prd_ids = [p.split(":",1)[1] for p in _connected(graph, nid, "prd:")]
+    cjm_ids = [c.split(":",1)[1] for c in _connected(graph, nid, "cjm:")]
+    story_ids = [s.split(":",1)[1] for s in _connected(graph, nid, "story:")]
+    ctx_screens = [n.split(":",2)[2] for n in _connected(graph, nid, "ctxux:screen:")]
+    prd_chips = [{"label": pid, "href": f"../../prd/{slugify(pid)}.md"} for pid in prd_ids if page_exists(f"prd/{slugify(pid)}.md")]
+    cjm_chips = [{"label": cid, "href": f"../../cjm/{slugify(cid)}.md"} for cid in cjm_ids if page_exists(f"cjm/{slugify(cid)}.md")]
+    story_chips = [{"label": st, "href": f"../../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
+    ctx_chips = [{"label": cs, "href": f"../../ctxux/{slugify(cs)}.md"} for cs in ctx_screens if page_exists(f"ctxux/{slugify(cs)}.md")]
+    xlinks = {"prd": prd_chips, "cjm": cjm_chips, "stories": story_chips, "ctxux": ctx_chips}
+    return ctx.render(tmpl, node=node, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_story_page(env: Environment, ctx: RunContext, story: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    tmpl = env.get_template("story.md.j2")
+    sid = story.get("story_id")
+    edit_href = ctx.edit_link(f"specs/04_userstories/us/{sid}.json")
+    # Cross-links (relative to docs/stories/<sid>.md)
+    story_nid = f"story:{sid}"
+    prd_ids = [p.split(":",1)[1] for p in _connected(graph, story_nid, "prd:")]
+    cjm_ids = [c.split(":",1)[1] for c in _connected(graph, story_nid, "cjm:")]
+    flow_nodes = [n.split(":",2)[2] for n in _connected(graph, story_nid, "flow:node:")]
+    ctx_screens = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ctxux:screen:")]
+    prd_chips = [{"label": pid, "href": f"../prd/{slugify(pid)}.md"} for pid in prd_ids if page_exists(f"prd/{slugify(pid)}.md")]
+    cjm_chips = [{"label": cid, "href": f"../cjm/{slugify(cid)}.md"} for cid in cjm_ids if page_exists(f"cjm/{slugify(cid)}.md")]
+    flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
+    ctx_chips = [{"label": cs, "href": f"../ctxux/{slugify(cs)}.md"} for cs in ctx_screens if page_exists(f"ctxux/{slugify(cs)}.md")]
+    hig_href = f"../hig/{slugify(sid)}.md" if page_exists(f"hig/{slugify(sid)}.md") else None
+    xlinks = {"prd": prd_chips, "cjm": cjm_chips, "flow": flow_chips, "ctxux": ctx_chips, "hig": {"label": "HIG", "href": hig_href}}
+    return ctx.render(tmpl, story=story, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_ux_page(env: Environment, ctx: RunContext, principle: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    tmpl = env.get_template("ux_principle.md.j2")
+    pid = principle.get("id") or principle.get("principle_id")
+    edit_href = ctx.edit_link(f"specs/03_ux_principles/principles/{pid}.json")
+    # Cross-links for chips
+    ux_nid = f"ux:principle:{pid}"
+    story_ids = [n.split(":",1)[1] for n in _connected(graph, ux_nid, "story:")]
+    ctx_ids = [n.split(":",2)[2] for n in _connected(graph, ux_nid, "ctxux:screen:")]
+    story_chips = [{"label": sid, "href": f"../stories/{slugify(sid)}.md"} for sid in story_ids if page_exists(f"stories/{slugify(sid)}.md")]
+    ctx_chips = [{"label": cid, "href": f"../ctxux/{slugify(cid)}.md"} for cid in ctx_ids if page_exists(f"ctxux/{slugify(cid)}.md")]
+    xlinks = {"stories": story_chips, "ctxux": ctx_chips}
+    return ctx.render(tmpl, principle=principle, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_ctxux_page(env: Environment, ctx: RunContext, screen: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    tmpl = env.get_template("ctxux_screen.md.j2")
+    sid = screen.get("id")
+    edit_href = ctx.edit_link(f"specs/06_ctxux/screens/{sid}.json")
+    # Cross-links
+    nid = f"ctxux:screen:{sid}"
+    flow_nodes = [n.split(":",2)[2] for n in _connected(graph, nid, "flow:node:")]
+    story_ids = [s.split(":",1)[1] for s in _connected(graph, nid, "story:")]
+    flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
+    story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
+    xlinks = {"flow": flow_chips, "stories": story_chips}
+    return ctx.render(tmpl, screen=screen, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+def render_hig_page(env: Environment, ctx: RunContext, story: Dict[str, Any], version: Any, graph: Dict[str, Any]) -> str:
+    """Render HIG recommendations for one user story.
+
+    Input structure: { story_id, title, candidates: [...], recommendation: {...} }
+    Output: docs/hig/<story_id>.md
+    Edit link: specs/05_hig/stories/<story_id>/candidates.json
+    """
+    tmpl = env.get_template("hig_story.md.j2")
+    sid = story.get("story_id")
+    edit_href = ctx.edit_link(f"specs/05_hig/stories/{sid}/candidates.json")
+    # Cross-links based on story relationships for chips
+    story_nid = f"story:{sid}"
+    prd_ids = [p.split(":",1)[1] for p in _connected(graph, story_nid, "prd:")]
+    cjm_ids = [c.split(":",1)[1] for c in _connected(graph, story_nid, "cjm:")]
+    flow_nodes = [n.split(":",2)[2] for n in _connected(graph, story_nid, "flow:node:")]
+    ctx_screens = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ctxux:screen:")]
+    xlinks = {
+        "prd": prd_ids,
+        "cjm": cjm_ids,
+        "flow": flow_nodes,
+        "ctxux": ctx_screens,
+    }
+    return ctx.render(tmpl, hig_story=story, edit_href=edit_href, version=version, xlinks=xlinks)
+
+
+# Page group -> per-entity renderer(env, ctx, entity, version, graph) -> Markdown
+PAGE_RENDERERS = {
+    "prd": render_prd_page,
+    "cjm": render_cjm_page,
+    "flow": render_flow_page,
+    "stories": render_story_page,
+    "ux": render_ux_page,
+    "ctxux": render_ctxux_page,
+    "hig": render_hig_page,
+}
 
 
-def render_cjm(env: Environment, cjm: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not cjm:
+def page_jobs(artifacts: Dict[str, Any], groups: Optional[set] = None) -> List[Tuple[str, str, Any, Dict[str, Any]]]:
+    """Per-entity page jobs (group, docs-relative path, version, entity) in PAGE_GROUPS order."""
+    jobs: List[Tuple[str, str, Any, Dict[str, Any]]] = []
+
+    def add(group: str, rel: str, entity: Dict[str, Any]) -> None:
+        jobs.append((group, rel, (artifacts.get(group) or {}).get("version"), entity))
+
+    def items(group: str, *keys: str) -> List[Dict[str, Any]]:
+        data = artifacts.get(group) or {}
+        if groups is not None and group not in groups:
+            return []
+        for key in keys:
+            if data.get(key):
+                return data[key]
+        return []
+
+    for section in items("prd", "sections"):
+        add("prd", f"prd/{slugify(str(section.get('id') or section.get('section_id') or 'unknown'))}.md", section)
+    for stage in items("cjm", "stages"):
+        add("cjm", f"cjm/{slugify(str(stage.get('id') or stage.get('stage_id') or 'unknown'))}.md", stage)
+    for node in items("flow", "user_flow"):
+        if node.get("id"):
+            add("flow", f"flow/nodes/{slugify(node['id'])}.md", node)
+    for story in items("stories", "stories"):
+        if story.get("story_id"):
+            add("stories", f"stories/{slugify(story['story_id'])}.md", story)
+    for principle in items("ux", "principles", "global_principles"):
+        pid = principle.get("id") or principle.get("principle_id")
+        if pid:
+            add("ux", f"ux/{slugify(pid)}.md", principle)
+    for screen in items("ctxux", "screens"):
+        if screen.get("id"):
+            add("ctxux", f"ctxux/{slugify(screen['id'])}.md", screen)
+    for story in items("hig", "stories"):
+        if story.get("story_id"):
+            add("hig", f"hig/{slugify(story['story_id'])}.md", story)
+    return jobs
+
+
+def render_page(env: Environment, ctx: RunContext, graph: Dict[str, Any],
+                job: Tuple[str, str, Any, Dict[str, Any]]) -> Tuple[str, str]:
+    group, rel, version, entity = job
+    return rel, PAGE_RENDERERS[group](env, ctx, entity, version, graph)
+
+
+# ---------- Render pool ----------
+
+# Per-process worker state: each pool worker builds its own Jinja environment and graph index
+_WORKER: Dict[str, Any] = {}
+# Starting a worker costs about as much as rendering this many pages in-process
+POOL_MIN_PAGES_PER_WORKER = 64
+
+
+def _init_worker(ctx: RunContext, graph: Dict[str, Any], pages: PageRegistry) -> None:
+    global _PAGES
+    _PAGES = pages
+    _WORKER["env"] = jinja_env()
+    _WORKER["ctx"] = ctx
+    _WORKER["graph"] = graph
+    graph_index(graph)
+
+
+def _render_job(job: Tuple[str, str, Any, Dict[str, Any]]) -> Tuple[str, str]:
+    return render_page(_WORKER["env"], _WORKER["ctx"], _WORKER["graph"], job)
+
+
+def render_pages(env: Environment, ctx: RunContext, graph: Dict[str, Any],
+                 jobs: List[Tuple[str, str, Any, Dict[str, Any]]], workers: int = 1) -> None:
+    """Render page jobs, fanned out to a process pool when workers > 1; files are written in job order."""
+    workers = min(workers, len(jobs) // POOL_MIN_PAGES_PER_WORKER)
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ctx, graph, _PAGES)) as pool:
+            results = pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+            for job, (rel, content) in zip(jobs, results):
+                write_file(DOCS_DIR / rel, content, group=job[0])
         return
-    tmpl = env.get_template("cjm_stage.md.j2")
-    cjm_version = cjm.get("version")
-    for stage in cjm.get("stages", []):
-        st_id = stage.get("id") or stage.get("stage_id") or "unknown"
-        path = DOCS_DIR / "cjm" / f"{slugify(str(st_id))}.md"
-        edit_href = edit_link(f"specs/01_cjm/stages/{st_id}.json")
-        # Cross-links
-        cjm_nid = f"cjm:{st_id}"
-        story_ids = [s.split(":",1)[1] for s in _connected(graph, cjm_nid, "story:")]
-        flow_nodes = [n.split(":",2)[2] for n in _connected(graph, cjm_nid, "flow:node:")]
-        story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
-        flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
-        xlinks = {"stories": story_chips, "flow": flow_chips}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(stage=stage, edit_href=edit_href, version=cjm_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+    for job in jobs:
+        rel, content = render_page(env, ctx, graph, job)
+        write_file(DOCS_DIR / rel, content, group=job[0])
 
 
-def render_flow(env: Environment, flow: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not flow:
-        return
-    # Overview page with embeddable SVG (object) for pan/zoom
-    overview = (
-        "# User Flow\n\n"
-        "<figure class=\"graph\">\n"
-        "  <object type=\"image/svg+xml\" data=\"../_media/userflow.svg\" id=\"userflow-object\" aria-label=\"User Flow diagram\"></object>\n"
-        "  <div><button class=\"zoom-reset\" aria-label=\"Reset zoom\" onclick=\"window.spechubResetView && window.spechubResetView('userflow-object')\">Reset view</button></div>\n"
-        "</figure>\n"
-    )
-    write_file(DOCS_DIR / "flow" / "overview.md", overview)
+# ---------- Diagrams ----------
 
-    tmpl = env.get_template("flow_node.md.j2")
-    flow_version = flow.get("version")
-    for node in flow.get("user_flow", []):
-        node_id = node.get("id")
-        if not node_id:
-            continue
-        path = DOCS_DIR / "flow" / "nodes" / f"{slugify(node_id)}.md"
-        # For edit link, map by type if needed. Node definitions live in specs/02_userflow/nodes/<domain>.json
-        # We cannot always derive the domain file; provide folder link as fallback
-        edit_href = edit_link("specs/02_userflow/nodes/")
-        # Cross-links (relative to docs/flow/nodes/<node>.md)
-        nid = f"flow:node:{node_id}"
-        prd_ids = [p.split(":",1)[1] for p in _connected(graph, nid, "prd:")]
-        cjm_ids = [c.split(":",1)[1] for c in _connected(graph, nid, "cjm:")]
-        story_ids = [s.split(":",1)[1] for s in _connected(graph, nid, "story:")]
-        ctx_screens = [n.split(":",2)[2] for n in _connected(graph, nid, "ctxux:screen:")]
-        prd_chips = [{"label": pid, "href": f"../../prd/{slugify(pid)}.md"} for pid in prd_ids if page_exists(f"prd/{slugify(pid)}.md")]
-        cjm_chips = [{"label": cid, "href": f"../../cjm/{slugify(cid)}.md"} for cid in cjm_ids if page_exists(f"cjm/{slugify(cid)}.md")]
-        story_chips = [{"label": st, "href": f"../../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
-        ctx_chips = [{"label": cs, "href": f"../../ctxux/{slugify(cs)}.md"} for cs in ctx_screens if page_exists(f"ctxux/{slugify(cs)}.md")]
-        xlinks = {"prd": prd_chips, "cjm": cjm_chips, "stories": story_chips, "ctxux": ctx_chips}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(node=node, edit_href=edit_href, version=flow_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+def dot_quote(value: Any) -> str:
+    """DOT double-quoted string: backslashes and quotes escaped, newlines as centered line breaks."""
+    s = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return '"' + s.replace("\r\n", "\n").replace("\n", "\\n") + '"'
 
 
-def render_stories(env: Environment, stories: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not stories:
-        return
-    tmpl = env.get_template("story.md.j2")
-    us_version = stories.get("version")
-    for story in stories.get("stories", []):
-        sid = story.get("story_id")
-        if not sid:
-            continue
-        path = DOCS_DIR / "stories" / f"{slugify(sid)}.md"
-        edit_href = edit_link(f"specs/04_userstories/us/{sid}.json")
-        # Cross-links (relative to docs/stories/<sid>.md)
-        story_nid = f"story:{sid}"
-        prd_ids = [p.split(":",1)[1] for p in _connected(graph, story_nid, "prd:")]
-        cjm_ids = [c.split(":",1)[1] for c in _connected(graph, story_nid, "cjm:")]
-        flow_nodes = [n.split(":",2)[2] for n in _connected(graph, story_nid, "flow:node:")]
-        ctx_screens = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ctxux:screen:")]
-        ux_principles = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ux:principle:")]
-        ux_principles = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ux:principle:")]
-        # Metrics counts
-        met = story.get("metrics", {}) or {}
-        leading = len(met.get("leading", []) or [])
-        lagging = len(met.get("lagging", []) or [])
-        prd_chips = [{"label": pid, "href": f"../prd/{slugify(pid)}.md"} for pid in prd_ids if page_exists(f"prd/{slugify(pid)}.md")]
-        cjm_chips = [{"label": cid, "href": f"../cjm/{slugify(cid)}.md"} for cid in cjm_ids if page_exists(f"cjm/{slugify(cid)}.md")]
-        flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
-        ctx_chips = [{"label": cs, "href": f"../ctxux/{slugify(cs)}.md"} for cs in ctx_screens if page_exists(f"ctxux/{slugify(cs)}.md")]
-        hig_href = f"../hig/{slugify(sid)}.md" if page_exists(f"hig/{slugify(sid)}.md") else None
-        xlinks = {"prd": prd_chips, "cjm": cjm_chips, "flow": flow_chips, "ctxux": ctx_chips, "hig": {"label": "HIG", "href": hig_href}}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(story=story, edit_href=edit_href, version=us_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+class DotWriter:
+    """Streams DOT source line by line; every ID and attribute value is quoted.
 
+    No per-node objects are kept: clusters are opened with begin() and closed with end(),
+    nodes and edges are written where they are declared.
+    """
 
-def render_ux(env: Environment, ux: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not ux:
-        return
-    tmpl = env.get_template("ux_principle.md.j2")
-    ux_version = ux.get("version")
-    for principle in ux.get("principles", []) or ux.get("global_principles", []) or []:
-        pid = principle.get("id") or principle.get("principle_id")
-        if not pid:
-            continue
-        path = DOCS_DIR / "ux" / f"{slugify(pid)}.md"
-        edit_href = edit_link(f"specs/03_ux_principles/principles/{pid}.json")
-        # Cross-links for chips
-        ux_nid = f"ux:principle:{pid}"
-        story_ids = [n.split(":",1)[1] for n in _connected(graph, ux_nid, "story:")]
-        ctx_ids = [n.split(":",2)[2] for n in _connected(graph, ux_nid, "ctxux:screen:")]
-        story_chips = [{"label": sid, "href": f"../stories/{slugify(sid)}.md"} for sid in story_ids if page_exists(f"stories/{slugify(sid)}.md")]
-        ctx_chips = [{"label": cid, "href": f"../ctxux/{slugify(cid)}.md"} for cid in ctx_ids if page_exists(f"ctxux/{slugify(cid)}.md")]
-        xlinks = {"stories": story_chips, "ctxux": ctx_chips}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(principle=principle, edit_href=edit_href, version=ux_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+    def __init__(self, name: str = "G", directed: bool = True, **attrs: Any):
+        self.lines: List[str] = [f"{'digraph' if directed else 'graph'} {dot_quote(name)} {{"]
+        self.edge_op = "->" if directed else "--"
+        self.depth = 1
+        for k, v in attrs.items():
+            self._line(f"{k}={dot_quote(v)};")
 
+    def _line(self, text: str) -> None:
+        self.lines.append("  " * self.depth + text)
 
-def render_ctxux(env: Environment, ctxux: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    if not ctxux:
-        return
-    tmpl = env.get_template("ctxux_screen.md.j2")
-    ctxux_version = ctxux.get("version")
-    for screen in ctxux.get("screens", []):
-        sid = screen.get("id")
-        if not sid:
-            continue
-        path = DOCS_DIR / "ctxux" / f"{slugify(sid)}.md"
-        edit_href = edit_link(f"specs/06_ctxux/screens/{sid}.json")
-        # Cross-links
-        nid = f"ctxux:screen:{sid}"
-        flow_nodes = [n.split(":",2)[2] for n in _connected(graph, nid, "flow:node:")]
-        story_ids = [s.split(":",1)[1] for s in _connected(graph, nid, "story:")]
-        flow_chips = [{"label": fn, "href": f"../flow/nodes/{slugify(fn)}.md"} for fn in flow_nodes if page_exists(f"flow/nodes/{slugify(fn)}.md")]
-        story_chips = [{"label": st, "href": f"../stories/{slugify(st)}.md"} for st in story_ids if page_exists(f"stories/{slugify(st)}.md")]
-        xlinks = {"flow": flow_chips, "stories": story_chips}
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(screen=screen, edit_href=edit_href, version=ctxux_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+    @staticmethod
+    def _attrs(attrs: Dict[str, Any]) -> str:
+        if not attrs:
+            return ""
+        return " [" + ", ".join(f"{k}={dot_quote(v)}" for k, v in attrs.items()) + "]"
 
+    def defaults(self, kind: str, **attrs: Any) -> None:
+        """Default attributes for "graph", "node" or "edge"."""
+        self._line(kind + self._attrs(attrs) + ";")
 
-def render_hig(env: Environment, hig: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    """Render HIG recommendations per user story.
+    def node(self, node_id: str, **attrs: Any) -> None:
+        self._line(dot_quote(node_id) + self._attrs(attrs) + ";")
 
-    Input structure: { "stories": [ { story_id, title, candidates: [...], recommendation: {...} } ] }
-    Output: docs/hig/<story_id>.md
-    Edit link: specs/05_hig/stories/<story_id>/candidates.json
-    """
-    if not hig:
-        return
-    tmpl = env.get_template("hig_story.md.j2")
-    hig_version = hig.get("version")
-    for story in hig.get("stories", []):
-        sid = story.get("story_id")
-        if not sid:
-            continue
-        path = DOCS_DIR / "hig" / f"{slugify(sid)}.md"
-        edit_href = edit_link(f"specs/05_hig/stories/{sid}/candidates.json")
-        # Cross-links based on story relationships for chips
-        story_nid = f"story:{sid}"
-        prd_ids = [p.split(":",1)[1] for p in _connected(graph, story_nid, "prd:")]
-        cjm_ids = [c.split(":",1)[1] for c in _connected(graph, story_nid, "cjm:")]
-        flow_nodes = [n.split(":",2)[2] for n in _connected(graph, story_nid, "flow:node:")]
-        ctx_screens = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ctxux:screen:")]
-        xlinks = {
-            "prd": prd_ids,
-            "cjm": cjm_ids,
-            "flow": flow_nodes,
-            "ctxux": ctx_screens,
-        }
-        schema_status = os.environ.get("SPECHUB_SCHEMA_STATUS", "unknown").lower()
-        schema_ok = True if schema_status == "ok" else False if schema_status == "failed" else None
-        content = tmpl.render(hig_story=story, edit_href=edit_href, version=hig_version, build_info=get_build_info(), schema_ok=schema_ok, xlinks=xlinks)
-        write_file(path, content)
+    def edge(self, src: str, dst: str, **attrs: Any) -> None:
+        self._line(f"{dot_quote(src)} {self.edge_op} {dot_quote(dst)}" + self._attrs(attrs) + ";")
 
+    def begin(self, name: str, **attrs: Any) -> None:
+        self._line(f"subgraph {dot_quote(name)} {{")
+        self.depth += 1
+        for k, v in attrs.items():
+            self._line(f"{k}={dot_quote(v)};")
 
+    def end(self) -> None:
+        self.depth -= 1
+        self._line("}")
 
-def render_userflow_svg(flow: Dict[str, Any]) -> None:
-    if not flow:
-        return
-    graph = pydot.Dot(
-        graph_type="digraph",
-        rankdir="LR",
-        bgcolor="white",
-        fontname="Inter",
-        fontsize="12",
-        splines="true",
-        overlap="false",
-        concentrate="true",
-        nodesep="0.35",
-        ranksep="0.45",
-    )
-    graph.set_node_defaults(
-        shape="box",
-        style="rounded,filled",
-        fillcolor="#F6F8FA",
-        color="#D0D7DE",
-        fontname="Inter",
-        fontsize="12",
-    )
-    graph.set_edge_defaults(color="#8B949E", arrowsize="0.7", penwidth="1.1")
-
-    # Domain clusters
-    domains = ["projects", "daily", "weather", "export", "documents", "gallery", "entries", "app"]
-    clusters: Dict[str, pydot.Subgraph] = {}
-    for d in domains:
-        clusters[d] = pydot.Subgraph(name=f"cluster_{d}", label=d.title(), color="#D0D7DE")
-    misc = pydot.Subgraph(name="cluster_misc", label="Misc", color="#D0D7DE")
-
-    # Add nodes
-    for node in flow.get("user_flow", []):
-        nid = node.get("id")
-        ntype = node.get("type", "node")
-        label = f"{nid}\n({ntype})"
-        doc_path = DOCS_DIR / "flow" / "nodes" / f"{slugify(nid)}.md"
-        url = f"./flow/nodes/{slugify(nid)}.md" if doc_path.exists() else None
-        shape = {"screen": "box", "system": "ellipse", "decision": "diamond"}.get(ntype, "box")
-        kwargs = {"label": label, "shape": shape, "tooltip": label}
-        if url:
-            kwargs["URL"] = url
-        node_obj = pydot.Node(nid, **kwargs)
-        # Assign to cluster if prefix matches
-        bucket = next((d for d in domains if nid and nid.startswith(d + "-")), None)
-        if bucket:
-            clusters[bucket].add_node(node_obj)
-        else:
-            misc.add_node(node_obj)
-
-    # Attach clusters with nodes
-    for sg in clusters.values():
-        if sg.get_nodes():
-            graph.add_subgraph(sg)
-    if misc.get_nodes():
-        graph.add_subgraph(misc)
-
-    # Add edges
-    node_index = {n.get("id"): n for n in flow.get("user_flow", [])}
-    for n in flow.get("user_flow", []):
-        src = n.get("id")
-        for e in n.get("edges", []) or []:
-            tgt = e.get("target")
-            if not tgt:
-                continue
-            elabel = e.get("action") or e.get("id") or ""
-            graph.add_edge(pydot.Edge(src, tgt, label=elabel, tooltip=elabel))
+    def source(self) -> str:
+        return "\n".join(self.lines + ["}"]) + "\n"
+
+
+def run_dot(source: str, fmt: str = "svg") -> bytes:
+    """Lay out DOT source with Graphviz; the source is piped over stdin."""
+    try:
+        proc = subprocess.run(["dot", f"-T{fmt}"], input=source.encode("utf-8"),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise RuntimeError('"dot" not found in path (install Graphviz)')
+    if proc.returncode != 0:
+        raise RuntimeError(f"dot exited with {proc.returncode}: {proc.stderr.decode('utf-8', 'replace').strip()}")
+    return proc.stdout
+
+
+def diagram_key(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
 
-    # Legend cluster
-    present = [d.title() for d, sg in clusters.items() if sg.get_nodes()] + (["Misc"] if misc.get_nodes() else [])
-    legend_text = "Node types: box(screen) / ellipse(system) / diamond(decision)\nDomains: " + ", ".join(present)
-    legend = pydot.Subgraph(name="cluster_legend", label="Legend", color="#D0D7DE")
-    legend.add_node(pydot.Node("legend_node", label=legend_text, shape="note", fillcolor="#FFFFFF", style="filled"))
-    graph.add_subgraph(legend)
-    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
-    graph.write_svg(str(MEDIA_DIR / "userflow.svg"))
 
+def write_svg(source: str, paths: List[Path], cache: bool = True) -> str:
+    """Write DOT source as SVG to every path, reusing the cached Graphviz output for identical source.
 
-def render_coverage_svg(graph_data: Dict[str, Any]) -> None:
+    Returns "hit" or "miss". A hit refreshes the entry's mtime, which is the LRU order for eviction.
+    Safe to run concurrently: cache entries are written through a per-call temp file and replaced atomically.
+    """
+    cached = DIAGRAM_CACHE_DIR / f"{diagram_key(source)}.svg"
+    svg = None
+    if cache:
+        try:
+            svg = cached.read_bytes()
+            os.utime(cached)
+        except FileNotFoundError:  # not cached yet, or evicted by another process
+            svg = None
+    status = "hit" if svg is not None else "miss"
+    if svg is None:
+        svg = run_dot(source)
+        if cache:
+            DIAGRAM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(DIAGRAM_CACHE_DIR), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(svg)
+                os.replace(tmp, cached)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+    text = svg.decode("utf-8")
+    for path in paths:
+        write_file(path, text)
+    return status
+
+
+def evict_diagram_cache(keep: Set[str]) -> None:
+    """Drop least recently used cache entries past the caps; the keys in keep (this run's diagrams) stay.
+
+    The file cap grows with the run so a large spec never evicts its own diagrams.
+    """
+    max_files = max(DIAGRAM_CACHE_MAX_FILES, 2 * len(keep))
+    entries = []
+    for p in DIAGRAM_CACHE_DIR.glob("*.svg"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:  # evicted concurrently
+            continue
+        entries.append((p.stem in keep, st.st_mtime_ns, st.st_size, p))
+    entries.sort(reverse=True)
+    total = 0
+    for n, (kept, _, size, p) in enumerate(entries):
+        total += size
+        if not kept and (n >= max_files or total > DIAGRAM_CACHE_MAX_BYTES):
+            p.unlink(missing_ok=True)
+
+
+def coverage_dot(graph_data: Dict[str, Any]) -> str:
     # Clustered coverage diagram with styling
-    g = pydot.Dot(graph_type="digraph", rankdir="LR", compound="true", concentrate="true",
-                  bgcolor="white", fontname="Inter", fontsize="12", nodesep="0.35", ranksep="0.45")
-    g.set_node_defaults(shape="box", style="rounded,filled", fillcolor="#F6F8FA",
-                        color="#D0D7DE", fontname="Inter", fontsize="12")
-    g.set_edge_defaults(color="#8B949E", arrowsize="0.7", penwidth="1.1")
+    dot = DotWriter(rankdir="LR", compound="true", concentrate="true",
+                    bgcolor="white", fontname="Inter", fontsize="12", nodesep="0.35", ranksep="0.45")
+    dot.defaults("node", shape="box", style="rounded,filled", fillcolor="#F6F8FA",
+                 color="#D0D7DE", fontname="Inter", fontsize="12")
+    dot.defaults("edge", color="#8B949E", arrowsize="0.7", penwidth="1.1")
 
     clusters = {
         "PRD": [],
@@ -540,7 +761,6 @@ def render_coverage_svg(graph_data: Dict[str, Any]) -> None:
     def safe_id(s: str) -> str:
         return s.replace(":", "__")
 
-    nodes_map = {n.get("id"): n for n in graph_data.get("nodes", [])}
     for n in graph_data.get("nodes", []):
         t = n.get("type")
         if t in clusters:
@@ -549,97 +769,305 @@ def render_coverage_svg(graph_data: Dict[str, Any]) -> None:
     for t, nodes_in_cluster in clusters.items():
         if not nodes_in_cluster:
             continue
-        sg = pydot.Cluster(f"cluster_{t}", label=t, style="rounded")
+        dot.begin(f"cluster_{t}", label=t, style="rounded")
         for n in nodes_in_cluster:
             nid = n.get("id")
             label = n.get("title") or nid
             # compute URL and only set if file exists
             url_rel = node_url_for_coverage(n)
-            exists = (DOCS_DIR / url_rel).exists()
             kwargs = {"label": label, "tooltip": label}
-            if exists:
+            if page_exists(url_rel):
                 kwargs["URL"] = url_rel
-            sg.add_node(pydot.Node(safe_id(nid), **kwargs))
-        g.add_subgraph(sg)
+            dot.node(safe_id(nid), **kwargs)
+        dot.end()
 
     # Edges
     for e in graph_data.get("edges", []):
-        src = e.get("from")
-        dst = e.get("to")
-        g.add_edge(pydot.Edge(safe_id(src), safe_id(dst), label=e.get("type", "")))
-
-    g.write_svg(str(MEDIA_DIR / "coverage.svg"))
-
-
-def analyze_orphans(graph: Dict[str, Any]) -> Dict[str, List[str]]:
-    nodes = graph.get("nodes", [])
-    edges = graph.get("edges", [])
-    by_id = {n["id"]: n for n in nodes}
-    incoming: Dict[str, int] = {}
-    outgoing: Dict[str, int] = {}
-    for e in edges:
-        src = e.get("from"); dst = e.get("to")
-        if src: outgoing[src] = outgoing.get(src, 0) + 1
-        if dst: incoming[dst] = incoming.get(dst, 0) + 1
-    orphans: Dict[str, List[str]] = {
-        "STORY": [],
-        "CTXUX": [],
-        "FLOW_NODE": [],
-        "PRD": [],
-        "CJM": [],
-    }
-    for n in nodes:
-        t = n.get("type")
-        nid = n.get("id")
-        inc = incoming.get(nid, 0)
-        outc = outgoing.get(nid, 0)
-        if t == "STORY" and inc == 0:
-            orphans["STORY"].append(nid)
-        if t == "CTXUX":
-            # screen must have at least one map from flow
-            has_map = any(e.get("to") == nid and e.get("type") in {"maps_to"} for e in edges)
-            if not has_map:
-                orphans["CTXUX"].append(nid)
-        if t == "FLOW_NODE" and (inc + outc) == 0:
-            orphans["FLOW_NODE"].append(nid)
-        if t in ("PRD", "CJM") and outc == 0:
-            # no influence/maps_to outward
-            orphans[t].append(nid)
-    # sort and return
+        dot.edge(safe_id(e.get("from")), safe_id(e.get("to")), label=e.get("type", ""))
+    return dot.source()
+
+
+
+
+# ---------- Flow shards ----------
+
+# User Flow node id prefix -> domain cluster; anything else goes to "misc"
+FLOW_DOMAINS = ("projects", "daily", "weather", "export", "documents", "gallery", "entries", "app")
+
+
+class FlowShard(NamedTuple):
+    kind: str  # "domain" or "stage"
+    key: str  # domain name or CJM stage id
+    title: str
+    node_ids: Tuple[str, ...]
+
+    @property
+    def slug(self) -> str:
+        return slugify(self.key)
+
+    @property
+    def page(self) -> str:
+        """Docs-relative Markdown page embedding the shard diagram."""
+        return f"flow/{self.kind}s/{self.slug}.md"
+
+    @property
+    def svg(self) -> str:
+        """Path of the shard diagram under docs/_media/."""
+        return f"flow/{self.kind}-{self.slug}.svg"
+
+
+def flow_domain(node_id: Optional[str]) -> str:
+    return next((d for d in FLOW_DOMAINS if node_id and node_id.startswith(d + "-")), "misc")
+
+
+def flow_shards(flow: Dict[str, Any], cjm: Dict[str, Any], graph: Dict[str, Any]) -> List[FlowShard]:
+    """One shard per non-empty domain cluster (FLOW_DOMAINS order, then Misc) and per CJM stage with flow nodes."""
+    ids = [n.get("id") for n in flow.get("user_flow", []) or [] if n.get("id")]
+    shards: List[FlowShard] = []
+    for domain in FLOW_DOMAINS + ("misc",):
+        members = tuple(nid for nid in ids if flow_domain(nid) == domain)
+        if members:
+            shards.append(FlowShard("domain", domain, domain.title(), members))
+    known = set(ids)
+    cjm = cjm or {}
+    for stage in cjm.get("stages", []) or cjm.get("cjm", []) or []:
+        st_id = stage.get("id") or stage.get("stage_id")
+        if not st_id:
+            continue
+        members = tuple(n.split(":", 2)[2] for n in _connected(graph, f"cjm:{st_id}", "flow:node:"))
+        members = tuple(nid for nid in members if nid in known)
+        if members:
+            shards.append(FlowShard("stage", st_id, stage.get("title") or stage.get("name") or st_id, members))
+    return shards
+
+
+def _flow_dot_writer() -> DotWriter:
+    dot = DotWriter(
+        rankdir="LR",
+        bgcolor="white",
+        fontname="Inter",
+        fontsize="12",
+        splines="true",
+        overlap="false",
+        concentrate="true",
+        nodesep="0.35",
+        ranksep="0.45",
+    )
+    dot.defaults(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#F6F8FA",
+        color="#D0D7DE",
+        fontname="Inter",
+        fontsize="12",
+    )
+    dot.defaults("edge", color="#8B949E", arrowsize="0.7", penwidth="1.1")
+    return dot
+
+
+def _flow_node_url(nid: str) -> Optional[str]:
+    return f"./flow/nodes/{slugify(nid)}.md" if page_exists(f"flow/nodes/{slugify(nid)}.md") else None
+
+
+def flow_shard_dot(shard: FlowShard, flow: Dict[str, Any]) -> str:
+    """Nodes of one shard with their edges; neighbours outside the shard become dashed boundary stubs."""
+    members = set(shard.node_ids)
+    nodes = {n.get("id"): n for n in flow.get("user_flow", []) or [] if n.get("id")}
+    dot = _flow_dot_writer()
+    for nid in shard.node_ids:
+        ntype = nodes[nid].get("type", "node")
+        label = f"{nid}\n({ntype})"
+        shape = {"screen": "box", "system": "ellipse", "decision": "diamond"}.get(ntype, "box")
+        kwargs = {"label": label, "shape": shape, "tooltip": label}
+        url = _flow_node_url(nid)
+        if url:
+            kwargs["URL"] = url
+        dot.node(nid, **kwargs)
+
+    stubs: set = set()
+
+    def stub(nid: str) -> str:
+        sid = f"boundary:{nid}"
+        if sid not in stubs:
+            stubs.add(sid)
+            label = f"{nid}\n[{flow_domain(nid)}]"
+            kwargs = {"label": label, "tooltip": label, "style": "rounded,dashed", "fillcolor": "#FFFFFF",
+                      "fontcolor": "#57606A"}
+            url = _flow_node_url(nid)
+            if url:
+                kwargs["URL"] = url
+            dot.node(sid, **kwargs)
+        return sid
+
+    for src, n in nodes.items():
+        for e in n.get("edges", []) or []:
+            tgt = e.get("target")
+            if not tgt or (src not in members and tgt not in members):
+                continue
+            elabel = e.get("action") or e.get("id") or ""
+            if src in members and tgt in members:
+                dot.edge(src, tgt, label=elabel, tooltip=elabel)
+            elif src in members:
+                dot.edge(src, stub(tgt), label=elabel, tooltip=elabel, style="dashed")
+            else:
+                dot.edge(stub(src), tgt, label=elabel, tooltip=elabel, style="dashed")
+    return dot.source()
+
+
+def flow_summary_dot(shards: List[FlowShard], flow: Dict[str, Any]) -> str:
+    """Domain-level overview: one node per domain shard, edges aggregated across domains with their count."""
+    dot = _flow_dot_writer()
+    domains = [s for s in shards if s.kind == "domain"]
+    for shard in domains:
+        label = f"{shard.title}\n({len(shard.node_ids)} nodes)"
+        kwargs = {"label": label, "tooltip": label}
+        if page_exists(shard.page):
+            kwargs["URL"] = f"./{shard.page}"
+        dot.node(f"domain:{shard.key}", **kwargs)
+    links: Dict[Tuple[str, str], int] = {}
+    for n in flow.get("user_flow", []) or []:
+        src = n.get("id")
+        for e in n.get("edges", []) or []:
+            tgt = e.get("target")
+            if src and tgt and flow_domain(src) != flow_domain(tgt):
+                key = (flow_domain(src), flow_domain(tgt))
+                links[key] = links.get(key, 0) + 1
+    present = {s.key for s in domains}
+    for (a, b), count in links.items():
+        if a in present and b in present:
+            dot.edge(f"domain:{a}", f"domain:{b}", label=str(count), tooltip=f"{count} edge(s)")
+    return dot.source()
+
+
+def _figure(svg_rel: str, obj_id: str, label: str) -> str:
+    return (
+        "<figure class=\"graph\">\n"
+        f"  <object type=\"image/svg+xml\" data=\"{svg_rel}\" id=\"{obj_id}\" aria-label=\"{label}\"></object>\n"
+        f"  <div><button class=\"zoom-reset\" aria-label=\"Reset zoom\" onclick=\"window.spechubResetView && window.spechubResetView('{obj_id}')\">Reset view</button></div>\n"
+        "</figure>\n"
+    )
+
+
+def render_flow_overview(shards: List[FlowShard]) -> None:
+    # Overview page with the domain summary (object, for pan/zoom) and links to the shard pages
+    lines = ["# User Flow\n", _figure("../_media/userflow.svg", "userflow-object", "User Flow diagram")]
+    for kind, heading in (("domain", "Domains"), ("stage", "CJM stages")):
+        entries = [s for s in shards if s.kind == kind]
+        if entries:
+            lines.append(f"## {heading}\n")
+            lines.extend(f"- [{s.title}]({s.page[len('flow/'):]}) — {len(s.node_ids)} nodes" for s in entries)
+            lines.append("")
+    write_file(DOCS_DIR / "flow" / "overview.md", "\n".join(lines), group="flow")
+
+
+def render_flow_shard_page(shard: FlowShard) -> None:
+    heading = "Domain" if shard.kind == "domain" else "CJM stage"
+    lines = [f"# User Flow · {heading}: {shard.title}\n",
+             _figure(f"../../_media/{shard.svg}", f"flow-{shard.kind}-{shard.slug}-object", f"{shard.title} flow diagram"),
+             "Dashed nodes are neighbours outside this " + ("domain" if shard.kind == "domain" else "stage") + ".\n",
+             "## Nodes\n"]
+    for nid in shard.node_ids:
+        rel = f"flow/nodes/{slugify(nid)}.md"
+        lines.append(f"- [{nid}](../nodes/{slugify(nid)}.md)" if page_exists(rel) else f"- {nid}")
+    write_file(DOCS_DIR / shard.page, "\n".join(lines) + "\n", group="flow")
+
+
+def flow_diagrams(flow: Dict[str, Any], shards: List[FlowShard]) -> Dict[str, str]:
+    """docs/_media-relative SVG path -> DOT source for the summary and every shard."""
+    diagrams = {"userflow.svg": flow_summary_dot(shards, flow)}
+    for shard in shards:
+        diagrams[shard.svg] = flow_shard_dot(shard, flow)
+    return diagrams
+
+
+# ---------- Orphans ----------
+
+# One rule per node type: a node is an orphan when it has no edge of edge_types (None: any type)
+# in the given direction ("in", "out" or "any"). spechub.yml can override or disable them under
+# "orphans:", e.g. {"DD": false, "UX": {"edge_types": ["applies_to"]}}.
+ORPHAN_RULES: List[Dict[str, Any]] = [
+    {"type": "STORY", "title": "Stories without Flow coverage", "direction": "in", "edge_types": None},
+    {"type": "CTXUX", "title": "CtxUX screens without Flow mapping", "direction": "in", "edge_types": ["maps_to"]},
+    {"type": "FLOW_NODE", "title": "Flow nodes without edges", "direction": "any", "edge_types": None},
+    {"type": "PRD", "title": "PRD with no outgoing influence", "direction": "out", "edge_types": None},
+    {"type": "CJM", "title": "CJM with no mapping to Flow", "direction": "out", "edge_types": None},
+    {"type": "HIG", "title": "HIG patterns not selected by any story", "direction": "in", "edge_types": ["selects"]},
+    {"type": "UX", "title": "UX principles not applied to any screen", "direction": "out", "edge_types": ["applies_to"]},
+    {"type": "ANALYTICS", "title": "Analytics events not emitted by Flow", "direction": "in", "edge_types": ["emits"]},
+    {"type": "DD", "title": "Data Dictionary fields not used in Flow", "direction": "out", "edge_types": ["used_in"]},
+]
+
+
+def orphan_rules(config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """ORPHAN_RULES merged with the "orphans" mapping of spechub.yml (false drops a type, new types are appended)."""
+    overrides = (load_config() if config is None else config).get("orphans") or {}
+    rules: List[Dict[str, Any]] = []
+    for rule in ORPHAN_RULES:
+        override = overrides.get(rule["type"], {})
+        if override is False:
+            continue
+        rules.append({**rule, **(override if isinstance(override, dict) else {})})
+    known = {r["type"] for r in ORPHAN_RULES}
+    for ntype, override in overrides.items():
+        if ntype not in known and isinstance(override, dict):
+            rules.append({"type": ntype, "title": f"{ntype} orphans", "direction": "any", "edge_types": None, **override})
+    for rule in rules:
+        if rule["direction"] not in ("in", "out", "any"):
+            raise ValueError(f"orphans.{rule['type']}.direction must be in, out or any (got {rule['direction']!r})")
+    return rules
+
+
+def analyze_orphans(graph: Dict[str, Any], rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, List[str]]:
+    """Node type -> sorted ids of nodes that break their orphan rule; one degree lookup per node."""
+    rules = orphan_rules() if rules is None else rules
+    by_type = {r["type"]: r for r in rules}
+    degrees = DegreeIndex(graph)
+    orphans: Dict[str, List[str]] = {r["type"]: [] for r in rules}
+    for n in graph.get("nodes", []):
+        rule = by_type.get(n.get("type"))
+        if rule and degrees.degree(n.get("id"), rule["direction"], rule.get("edge_types")) == 0:
+            orphans[rule["type"]].append(n.get("id"))
     return {k: sorted(v) for k, v in orphans.items()}
 
 
+def _orphan_url(nid: str) -> Optional[str]:
+    """Docs page of a graph node id, or None for layers without pages (analytics, dd)."""
+    parts = nid.split(":")
+    prefix = parts[0]
+    if prefix == "story":
+        return f"stories/{slugify(nid.split(':',1)[1])}.md"
+    if prefix == "ctxux":
+        return f"ctxux/{nid.split(':',2)[2]}.md"
+    if prefix == "flow":
+        return f"flow/nodes/{slugify(nid.split(':',2)[2])}.md"
+    if prefix == "prd":
+        return f"prd/{slugify(nid.split(':',1)[1])}.md"
+    if prefix == "cjm":
+        return f"cjm/{slugify(nid.split(':',1)[1])}.md"
+    if prefix == "ux" and len(parts) > 2:
+        return f"ux/{slugify(nid.split(':',2)[2])}.md"
+    if prefix == "hig" and len(parts) > 1:
+        # HIG candidates are listed on their story's HIG page
+        return f"hig/{slugify(parts[1])}.md"
+    return None
+
+
 def render_orphans(env: Environment, graph: Dict[str, Any]) -> None:
-    data = analyze_orphans(graph)
+    rules = orphan_rules()
+    data = analyze_orphans(graph, rules)
     lines: List[str] = []
     lines.append("# Orphans\n")
-    for section, ids in (("Stories without Flow coverage", data.get("STORY", [])),
-                         ("CtxUX screens without Flow mapping", data.get("CTXUX", [])),
-                         ("Flow nodes without edges", data.get("FLOW_NODE", [])),
-                         ("PRD with no outgoing influence", data.get("PRD", [])),
-                         ("CJM with no mapping to Flow", data.get("CJM", []))):
-        lines.append(f"## {section}")
+    for rule in rules:
+        ids = data.get(rule["type"], [])
+        lines.append(f"## {rule['title']}")
         if not ids:
             lines.append("- none")
         else:
             for nid in ids:
-                # map to URL similar to coverage
-                ntype = nid.split(":", 1)[0].upper()
-                # compute candidate URL using same mapping as coverage
-                if ntype == "STORY":
-                    url_rel = f"stories/{slugify(nid.split(':',1)[1])}.md"
-                elif ntype == "CTXUX":
-                    url_rel = f"ctxux/{nid.split(':',2)[2]}.md"
-                elif ntype == "FLOW":
-                    url_rel = f"flow/nodes/{slugify(nid.split(':',2)[2])}.md"
-                elif ntype == "PRD":
-                    url_rel = f"prd/{slugify(nid.split(':',1)[1])}.md"
-                elif ntype == "CJM":
-                    url_rel = f"cjm/{slugify(nid.split(':',1)[1])}.md"
-                else:
-                    url_rel = None
+                url_rel = _orphan_url(nid)
                 # only create link if file exists; otherwise render as plain text to satisfy mkdocs strict
-                if url_rel and (DOCS_DIR / url_rel).exists():
+                if url_rel and page_exists(url_rel):
                     lines.append(f"- [{nid}]({url_rel})")
                 else:
                     lines.append(f"- {nid}")
@@ -647,43 +1075,106 @@ def render_orphans(env: Environment, graph: Dict[str, Any]) -> None:
     write_file(DOCS_DIR / "orphans.md", "\n".join(lines))
 
 
-def render_coverage_matrices(artifacts: Dict[str, Any], graph: Dict[str, Any]) -> None:
-    # PRD ↔ Stories matrix
+# ---------- Coverage matrices ----------
+
+# Matrices with more cells than this are written as a sparse, paginated listing instead of a dense table
+COVERAGE_DENSE_MAX_CELLS = 2000
+COVERAGE_PAGE_ROWS = 50
+COVERAGE_MODES = ("auto", "dense", "sparse")
+
+
+class CoverageMatrix:
+    """Row x column coverage in CSR form: the covered column indices of row i are indices[indptr[i]:indptr[i + 1]].
+
+    Built in one pass over the edges; memory and output size follow the number of covered cells,
+    not rows x columns.
+    """
+
+    def __init__(self, rows: List[str], cols: List[str], indptr: List[int], indices: List[int]):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, rows: List[str], cols: List[str], graph: Union[Dict[str, Any], CompactGraph],
+                   row_prefix: str = "", col_prefix: str = "") -> "CoverageMatrix":
+        """Cells (r, c) for which graph has an edge row_prefix+r -> col_prefix+c."""
+        row_pos = {row_prefix + r: i for i, r in enumerate(rows)}
+        col_pos = {col_prefix + c: j for j, c in enumerate(cols)}
+        per_row: List[set] = [set() for _ in rows]
+        for f, t, _ in _edge_triples(graph):
+            i = row_pos.get(f); j = col_pos.get(t)
+            if i is not None and j is not None:
+                per_row[i].add(j)
+        indptr = [0]
+        indices: List[int] = []
+        for cells in per_row:
+            indices.extend(sorted(cells))
+            indptr.append(len(indices))
+        return cls(rows, cols, indptr, indices)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def row(self, i: int) -> List[int]:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def to_json(self, title: str, row_label: str) -> str:
+        """Compact sidecar read by spechub.tables.js."""
+        return json.dumps({"title": title, "row_label": row_label, "rows": self.rows, "cols": self.cols,
+                           "indptr": self.indptr, "indices": self.indices},
+                          ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _coverage_dense(matrix: CoverageMatrix, title: str, row_label: str, row_fmt: str) -> str:
+    lines: List[str] = [f"# {title}\n"]
+    lines.append(f"| {row_label} " + " | ".join(matrix.cols) + " |\n")
+    lines.append("|" + "---|" * (1 + len(matrix.cols)) + "\n")
+    for i, rid in enumerate(matrix.rows):
+        covered = set(matrix.row(i))
+        lines.append("| " + " | ".join([row_fmt.format(rid)] + ["✔" if j in covered else "" for j in range(len(matrix.cols))]) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def _coverage_sparse(matrix: CoverageMatrix, name: str, title: str, row_label: str, row_fmt: str) -> str:
+    # Summary plus a placeholder that spechub.tables.js fills from the JSON sidecar (filter + pages)
+    rows, cols = len(matrix.rows), len(matrix.cols)
+    empty = sum(1 for i in range(rows) if matrix.indptr[i] == matrix.indptr[i + 1])
+    density = 100.0 * matrix.nnz / (rows * cols) if rows and cols else 0.0
+    return (
+        f"# {title}\n\n"
+        f"{rows} rows × {cols} columns, {matrix.nnz} covered cells ({density:.1f}%); {empty} rows without coverage.\n\n"
+        f"<div class=\"coverage-matrix\" data-coverage-src=\"../{name}.json\" data-page-size=\"{COVERAGE_PAGE_ROWS}\""
+        f" data-row-label=\"{row_label}\" data-row-format=\"{row_fmt}\"></div>\n\n"
+        f"Raw data: [{name}.json]({name}.json)\n"
+    )
+
+
+def write_coverage_matrix(matrix: CoverageMatrix, name: str, title: str, row_label: str,
+                          row_fmt: str = "{}", mode: str = "auto") -> None:
+    """Write coverage/<name>.md (dense table or sparse listing) and its coverage/<name>.json sidecar."""
+    write_file(DOCS_DIR / "coverage" / f"{name}.json", matrix.to_json(title, row_label))
+    dense = mode == "dense" or (mode == "auto" and len(matrix.rows) * len(matrix.cols) <= COVERAGE_DENSE_MAX_CELLS)
+    if dense:
+        content = _coverage_dense(matrix, title, row_label, row_fmt)
+    else:
+        content = _coverage_sparse(matrix, name, title, row_label, row_fmt)
+    write_file(DOCS_DIR / "coverage" / f"{name}.md", content)
+
+
+def render_coverage_matrices(artifacts: Dict[str, Any], graph: Dict[str, Any], mode: str = "auto") -> None:
+    """PRD ↔ Stories and Flow ↔ CtxUX matrices; mode is one of COVERAGE_MODES ("auto" picks by size)."""
     prd_ids = [s.get("id") for s in (artifacts.get("prd", {}).get("prd", []) or artifacts.get("prd", {}).get("sections", []) or [])]
     story_ids = [s.get("story_id") for s in artifacts.get("stories", {}).get("stories", []) or []]
-    edges = graph.get("edges", [])
-    covered = {(e.get("from"), e.get("to")) for e in edges}
-    lines1: List[str] = []
-    lines1.append("# PRD ↔ Stories\n")
-    # header
-    header = "| PRD "+ " | ".join(story_ids) + " |\n"
-    sep = "|" + "---|" * (1 + len(story_ids)) + "\n"
-    lines1.append(header)
-    lines1.append(sep)
-    for pid in prd_ids:
-        row = [f"prd:{pid}"]
-        for sid in story_ids:
-            mark = "✔" if (f"prd:{pid}", f"story:{sid}") in covered else ""
-            row.append(mark)
-        lines1.append("| " + " | ".join(row) + " |")
-    write_file(DOCS_DIR / "coverage" / "prd_stories.md", "\n".join(lines1) + "\n")
-
-    # Flow ↔ CtxUX matrix
+    prd_stories = CoverageMatrix.from_edges(prd_ids, story_ids, graph, "prd:", "story:")
+    write_coverage_matrix(prd_stories, "prd_stories", "PRD ↔ Stories", "PRD", "prd:{}", mode)
+
     flow_nodes = [n.get("id").split(":",2)[2] for n in graph.get("nodes", []) if n.get("type") == "FLOW_NODE"]
     ctx_screens = [n.get("id").split(":",2)[2] for n in graph.get("nodes", []) if n.get("type") == "CTXUX"]
-    lines2: List[str] = []
-    lines2.append("# Flow ↔ Contextual UX\n")
-    header2 = "| Flow Node "+ " | ".join(ctx_screens) + " |\n"
-    sep2 = "|" + "---|" * (1 + len(ctx_screens)) + "\n"
-    lines2.append(header2)
-    lines2.append(sep2)
-    for fn in flow_nodes:
-        row = [fn]
-        for scr in ctx_screens:
-            mark = "✔" if (f"flow:node:{fn}", f"ctxux:screen:{scr}") in covered else ""
-            row.append(mark)
-        lines2.append("| " + " | ".join(row) + " |")
-    write_file(DOCS_DIR / "coverage" / "flow_ctxux.md", "\n".join(lines2) + "\n")
+    flow_ctxux = CoverageMatrix.from_edges(flow_nodes, ctx_screens, graph, "flow:node:", "ctxux:screen:")
+    write_coverage_matrix(flow_ctxux, "flow_ctxux", "Flow ↔ Contextual UX", "Flow Node", mode=mode)
 
 
 # ---------- mkdocs nav ----------
@@ -712,6 +1203,13 @@ def build_nav() -> str:
         lines.append("      - Overview: flow/overview.md")
         if (DOCS_DIR / "flow" / "index.md").exists():
             lines.append("      - Index: flow/index.md")
+        # Diagram shards
+        for label, sub in (("Domains", "domains"), ("Stages", "stages")):
+            shard_files = list_md(DOCS_DIR / "flow" / sub)
+            if shard_files:
+                lines.append(f"      - {label}:")
+                for fname in shard_files:
+                    lines.append(f"          - {os.path.splitext(fname)[0]}: flow/{sub}/{fname}")
         # Nodes subgroup
         node_files = list_md(DOCS_DIR / "flow" / "nodes")
         if node_files:
@@ -755,10 +1253,9 @@ def build_nav() -> str:
     return "\n".join(lines) + "\n"
 
 
-def write_mkdocs_yaml() -> None:
+def write_mkdocs_yaml(ctx: RunContext) -> None:
     mkdocs_path = ROOT / "mkdocs.yml"
-    bi = get_build_info()
-    cache_bust = bi.get("git_sha", "dev")
+    cache_bust = ctx.git_sha or "dev"
     base = f"""
 site_name: SpecHub
 site_url: https://alexivengo.github.io/dailylogs-specs/
@@ -800,21 +1297,198 @@ extra_css:
     write_file(mkdocs_path, base)
 
 
-# ---------- Index pages ----------
+# ---------- Graph adjacency ----------
 
 def _edges(graph: Dict[str, Any]) -> List[Dict[str, Any]]:
     return graph.get("edges", []) or []
 
+
+class CompactGraph:
+    """graph.bin (see build.py:write_compact_graph) held as typed arrays.
+
+    Node i is strings[i]; nodes from `declared` on are edge endpoints without a node entry.
+    Edges are parallel columns (edge_from/edge_to node indices, edge_type codes, edge_count,
+    edge_sources assembler bitmasks) with CSR adjacency in both directions; provenance tags are
+    CSR lists of string indices. Loading creates no per-edge objects.
+    """
+
+    def __init__(self, header: Dict[str, Any], columns: Dict[str, array.array]):
+        self.strings: List[str] = header["strings"]
+        self.declared: int = header["declared"]
+        self.node_types: List[str] = header["node_types"]
+        self.edge_types: List[str] = header["edge_types"]
+        self.sources: List[str] = header["sources"]
+        self.data: Dict[int, Any] = {int(k): v for k, v in header.get("data", {}).items()}
+        self.graph_sha256: Optional[str] = header.get("graph_sha256")
+        self.columns = columns
+        self._pos: Optional[Dict[str, int]] = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.columns["node_type"])
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.columns["edge_from"])
+
+    def index(self, node_id: str) -> Optional[int]:
+        if self._pos is None:
+            self._pos = {self.strings[i]: i for i in range(self.node_count)}
+        return self._pos.get(node_id)
+
+    def outgoing(self, node: int) -> array.array:
+        """Indices of the edges leaving node."""
+        indptr = self.columns["out_indptr"]
+        return self.columns["out_edges"][indptr[node]:indptr[node + 1]]
+
+    def incoming(self, node: int) -> array.array:
+        """Indices of the edges entering node."""
+        indptr = self.columns["in_indptr"]
+        return self.columns["in_edges"][indptr[node]:indptr[node + 1]]
+
+    def triples(self) -> Iterator[Tuple[str, str, str]]:
+        """(from id, to id, type) of every edge, in graph.json order."""
+        strings, types = self.strings, self.edge_types
+        for f, t, k in zip(self.columns["edge_from"], self.columns["edge_to"], self.columns["edge_type"]):
+            yield strings[f], strings[t], types[k]
+
+    def describes(self, graph_json: bytes) -> bool:
+        """True when this was written from exactly these graph.json bytes (sha256 stored by build.py)."""
+        return self.graph_sha256 is not None and self.graph_sha256 == hashlib.sha256(graph_json).hexdigest()
+
+    def to_graph(self) -> Dict[str, Any]:
+        """The graph.json interchange form (allocates one dict per node and edge)."""
+        cols = self.columns
+
+        node_ptr, node_prov = cols["node_prov_indptr"], cols["node_prov"]
+        edge_ptr, edge_prov, edge_prov_count = cols["edge_prov_indptr"], cols["edge_prov"], cols["edge_prov_count"]
+        nodes = []
+        for i in range(self.declared):
+            node = {"id": self.strings[i], "type": self.node_types[cols["node_type"][i]],
+                    "title": self.strings[cols["node_title"][i]]}
+            if i in self.data:
+                node["data"] = self.data[i]
+            node["sources"] = [self.strings[k] for k in node_prov[node_ptr[i]:node_ptr[i + 1]]]
+            nodes.append(node)
+        edges = [{"from": f, "to": t, "type": k, "count": cols["edge_count"][i],
+                  "sources": {self.strings[p]: c for p, c in zip(edge_prov[edge_ptr[i]:edge_ptr[i + 1]],
+                                                                 edge_prov_count[edge_ptr[i]:edge_ptr[i + 1]])}}
+                 for i, (f, t, k) in enumerate(self.triples())]
+        return {"nodes": nodes, "edges": edges}
+
+
+def load_compact_graph(path: Path = COMPACT_GRAPH_FILE) -> Optional[CompactGraph]:
+    """Read graph.bin; None when it is missing, truncated, of another version or built for other C type sizes."""
+    try:
+        raw = memoryview(path.read_bytes())
+        if raw[:4] != COMPACT_GRAPH_MAGIC:
+            return None
+        version, head_len = struct.unpack_from("<II", raw, 4)
+        if version != COMPACT_GRAPH_VERSION:
+            return None
+        offset = 12 + head_len
+        header = json.loads(bytes(raw[12:offset]).decode("utf-8"))
+        columns: Dict[str, array.array] = {}
+        for name, typecode, itemsize, length in header["columns"]:
+            col = array.array(typecode)
+            end = offset + itemsize * length
+            if col.itemsize != itemsize or end > len(raw):
+                return None
+            col.frombytes(raw[offset:end])
+            if sys.byteorder != "little":
+                col.byteswap()
+            columns[name] = col
+            offset = end
+        return CompactGraph(header, columns)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def _edge_triples(graph: Union[Dict[str, Any], CompactGraph]) -> Iterator[Tuple[str, str, str]]:
+    """(from, to, type) of every edge of a graph.json dict or a CompactGraph."""
+    if isinstance(graph, CompactGraph):
+        return graph.triples()
+    return ((e.get("from"), e.get("to"), e.get("type")) for e in _edges(graph))
+
+
+class GraphIndex:
+    """Bidirectional adjacency of graph.json: node id -> type prefix ("story", "flow", ...) -> neighbours.
+
+    Built in one pass over the edges; neighbour lookups are constant time instead of an edge scan.
+    """
+
+    def __init__(self, graph: Union[Dict[str, Any], CompactGraph]):
+        self.adj: Dict[str, Dict[str, set]] = {}
+        for f, t, _ in _edge_triples(graph):
+            if not f or not t: continue
+            self.adj.setdefault(f, {}).setdefault(t.split(":", 1)[0], set()).add(t)
+            self.adj.setdefault(t, {}).setdefault(f.split(":", 1)[0], set()).add(f)
+        self._sorted: Dict[Tuple[str, str], List[str]] = {}
+
+    def connected(self, node_id: str, prefix: str) -> List[str]:
+        """Sorted neighbours of node_id (either edge direction) whose id starts with prefix."""
+        key = (node_id, prefix)
+        hit = self._sorted.get(key)
+        if hit is None:
+            bucket = self.adj.get(node_id, {}).get(prefix.split(":", 1)[0], ())
+            hit = self._sorted[key] = sorted(n for n in bucket if n.startswith(prefix))
+        return list(hit)
+
+
+class DegreeIndex:
+    """Typed degrees of graph.json: node id -> edge type -> count, for incoming and outgoing edges.
+
+    One pass over the edges; degree() answers "how many edges of these types" without scanning them.
+    """
+
+    def __init__(self, graph: Union[Dict[str, Any], CompactGraph]):
+        self.incoming: Dict[str, Dict[str, int]] = {}
+        self.outgoing: Dict[str, Dict[str, int]] = {}
+        for f, t, etype in _edge_triples(graph):
+            etype = etype or ""
+            if f:
+                bucket = self.outgoing.setdefault(f, {})
+                bucket[etype] = bucket.get(etype, 0) + 1
+            if t:
+                bucket = self.incoming.setdefault(t, {})
+                bucket[etype] = bucket.get(etype, 0) + 1
+
+    def degree(self, node_id: str, direction: str = "any", edge_types: Optional[List[str]] = None) -> int:
+        """Edges of edge_types (None: all) entering ("in"), leaving ("out") or touching ("any") node_id."""
+        total = 0
+        sides = (self.incoming, self.outgoing) if direction == "any" else (self.incoming if direction == "in" else self.outgoing,)
+        for side in sides:
+            counts = side.get(node_id, {})
+            if edge_types is None:
+                total += sum(counts.values())
+            else:
+                total += sum(counts.get(t, 0) for t in edge_types)
+        return total
+
+
+# One index for the graph currently being rendered; the graph itself is kept so its id() stays unique
+_GRAPH_INDEX: Tuple[Optional[Dict[str, Any]], Optional[GraphIndex]] = (None, None)
+
+
+def graph_index(graph: Dict[str, Any], compact: Optional[CompactGraph] = None) -> GraphIndex:
+    """GraphIndex for graph, built once and reused until a different graph object is passed.
+
+    compact, when given, must hold the same graph (CompactGraph.describes); the index is then
+    built from its columns instead of the edge dicts.
+    """
+    global _GRAPH_INDEX
+    cached, index = _GRAPH_INDEX
+    if cached is not graph or index is None:
+        index = GraphIndex(compact if compact is not None else graph)
+        _GRAPH_INDEX = (graph, index)
+    return index
+
+
 def _connected(graph: Dict[str, Any], node_id: str, prefix: str) -> List[str]:
-    out: set[str] = set()
-    for e in _edges(graph):
-        f = e.get("from"); t = e.get("to")
-        if not f or not t: continue
-        if f == node_id and t.startswith(prefix):
-            out.add(t)
-        if t == node_id and f.startswith(prefix):
-            out.add(f)
-    return sorted(out)
+    return graph_index(graph).connected(node_id, prefix)
+
+
+# ---------- Index pages ----------
 
 def render_stories_index(env: Environment, artifacts: Dict[str, Any], graph: Dict[str, Any]) -> None:
     data = artifacts.get("stories", {})
@@ -833,7 +1507,7 @@ def render_stories_index(env: Environment, artifacts: Dict[str, Any], graph: Dic
         flow_nodes = [n.split(":",2)[2] for n in _connected(graph, story_nid, "flow:node:")]
         ctx_screens = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ctxux:screen:")]
         ux_principles = [n.split(":",2)[2] for n in _connected(graph, story_nid, "ux:principle:")]
-        hig_exists = (DOCS_DIR/"hig"/f"{slugify(sid)}.md").exists()
+        hig_exists = page_exists(f"hig/{slugify(sid)}.md")
         met = s.get("metrics", {}) or {}
         leading = len(met.get("leading", []) or [])
         lagging = len(met.get("lagging", []) or [])
@@ -1124,35 +1798,93 @@ def render_ux_index(env: Environment, artifacts: Dict[str, Any], graph: Dict[str
     write_file(DOCS_DIR/"ux"/"index.md", html)
 
 
-def main() -> int:
-    ensure_dirs()
-    env = jinja_env()
-    artifacts = load_build_artifacts()
-    graph = load_graph()
+# Entity page groups (keys of load_build_artifacts()); watch mode re-renders only affected ones
+PAGE_GROUPS = ("prd", "cjm", "flow", "stories", "ux", "ctxux", "hig")
 
-    render_index(env, artifacts, graph)
-    render_prd(env, artifacts.get("prd", {}), graph)
-    render_cjm(env, artifacts.get("cjm", {}), graph)
-    render_flow(env, artifacts.get("flow", {}), graph)
-    render_stories(env, artifacts.get("stories", {}), graph)
-    render_ux(env, artifacts.get("ux", {}), graph)
-    render_ctxux(env, artifacts.get("ctxux", {}), graph)
-    render_hig(env, artifacts.get("hig", {}), graph)
 
-    # Diagrams
-    try:
-        render_userflow_svg(artifacts.get("flow", {}))
-    except Exception as e:
-        print(f"[WARN] userflow.svg generation failed: {e}")
-    try:
-        render_coverage_svg(graph)
-    except Exception as e:
-        print(f"[WARN] coverage.svg generation failed: {e}")
+def render_site(env: Environment, artifacts: Dict[str, Any], graph: Dict[str, Any],
+                groups: Optional[set] = None, graph_changed: bool = True, jobs: int = 1,
+                ctx: Optional[RunContext] = None, diagram_cache: bool = True,
+                coverage_mode: str = "auto", compact: Optional[CompactGraph] = None) -> Dict[str, int]:
+    """Render pages, diagrams, extras, index pages and mkdocs.yml.
+
+    groups limits per-entity pages to the given PAGE_GROUPS keys (None renders all of them);
+    coverage.svg is skipped when graph_changed is False. Aggregate pages are always refreshed.
+    jobs > 1 renders per-entity pages in a process pool; the Graphviz diagrams run alongside
+    the page renders in either case, reusing cached SVGs unless diagram_cache is False.
+    coverage_mode selects the dense or sparse coverage matrix pages (see COVERAGE_MODES).
+    compact is graph in columnar form (load_compact_graph); the adjacency index is built from it when given.
+    ctx carries the run's timestamp, git SHA, repo links and schema status (created here when None).
+    Identical files are not rewritten and pages of removed entities are deleted (see OutputManifest);
+    returns the created/updated/unchanged/deleted counts.
+    """
+    global _PAGES, _OUTPUT
+
+    def want(group: str) -> bool:
+        return groups is None or group in groups
+
+    ctx = ctx or RunContext.create()
+    # Adjacency is built once per graph; every render_* below looks neighbours up in it
+    graph_index(graph, compact)
+    _OUTPUT = OutputManifest()
+    page_list = page_jobs(artifacts, groups)
+    planned = {rel for _, rel, _, _ in page_list}
+    shards: List[FlowShard] = []
+    if want("flow") and artifacts.get("flow"):
+        shards = flow_shards(artifacts["flow"], artifacts.get("cjm", {}), graph)
+        planned.add("flow/overview.md")
+        planned.update(shard.page for shard in shards)
+    wanted = {g for g in PAGE_GROUPS if want(g)}
+    # Existing pages, without the ones prune() is about to delete, plus everything this run writes
+    _PAGES = PageRegistry(PageRegistry.scan(DOCS_DIR).pages - (_OUTPUT.owned(wanted) - planned) | planned)
+
+    render_index(env, ctx, artifacts, graph)
+    if want("flow") and artifacts.get("flow"):
+        render_flow_overview(shards)
+        for shard in shards:
+            render_flow_shard_page(shard)
+
+    # Diagrams run in threads (Graphviz is a subprocess) while the pages render; each one is cached separately
+    from concurrent.futures import ThreadPoolExecutor
+    sources: Dict[str, str] = {}
+    if want("flow") and artifacts.get("flow"):
+        sources.update(flow_diagrams(artifacts["flow"], shards))
+    if graph_changed:
+        sources["coverage.svg"] = coverage_dot(graph)
+    # One job per distinct DOT source (identical shards share a cache key); it writes every path
+    by_key: Dict[str, List[str]] = {}
+    for name, source in sources.items():
+        by_key.setdefault(diagram_key(source), []).append(name)
+    diagrams = {}
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(by_key)))) as pool:
+        for key, names in by_key.items():
+            diagrams[key] = pool.submit(write_svg, sources[names[0]], [MEDIA_DIR / n for n in names], diagram_cache)
+        render_pages(env, ctx, graph, page_list, workers=jobs)
+    failed: Dict[str, List[str]] = {}
+    for key, future in diagrams.items():
+        try:
+            future.result()
+        except Exception as e:
+            failed.setdefault(str(e), []).extend(by_key[key])
+    # Evict once, after every worker is done, never touching this run's entries
+    if diagram_cache and DIAGRAM_CACHE_DIR.exists():
+        evict_diagram_cache(set(by_key))
+    for error, names in failed.items():
+        shown = ", ".join(names[:3]) + (f" and {len(names) - 3} more" if len(names) > 3 else "")
+        print(f"[WARN] {shown} generation failed: {error}")
+    if want("flow"):
+        # Shard diagrams of domains/stages that no longer exist
+        keep = {MEDIA_DIR / name for name in sources}
+        for svg in (MEDIA_DIR / "flow").glob("*.svg"):
+            if svg not in keep:
+                svg.unlink()
+    # Before the index pages and nav, which list what is on disk
+    _OUTPUT.prune(wanted)
 
     # Orphans and matrices
     try:
         render_orphans(env, graph)
-        render_coverage_matrices(artifacts, graph)
+        render_coverage_matrices(artifacts, graph, coverage_mode)
     except Exception as e:
         print(f"[WARN] extras generation failed: {e}")
 
@@ -1168,7 +1900,36 @@ def main() -> int:
         print(f"[WARN] indexes generation failed: {e}")
 
     # mkdocs.yml
-    write_mkdocs_yaml()
+    write_mkdocs_yaml(ctx)
+
+    output, _OUTPUT, _PAGES = _OUTPUT, None, None
+    output.save()
+    return output.counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate SpecHub docs from specs/_build.")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="processes used to render per-entity pages (default: %(default)s; 1 renders in-process)")
+    parser.add_argument("--no-diagram-cache", action="store_true",
+                        help=f"always run Graphviz instead of reusing SVGs from {DIAGRAM_CACHE_DIR.relative_to(ROOT)}/")
+    parser.add_argument("--coverage", choices=COVERAGE_MODES, default="auto",
+                        help=f"coverage matrix pages: dense tables, sparse paginated listings, or dense up to "
+                             f"{COVERAGE_DENSE_MAX_CELLS} cells (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    ensure_dirs()
+    env = jinja_env()
+    artifacts = load_build_artifacts()
+    graph = load_graph()
+    compact = load_compact_graph()
+    if compact is not None and not (GRAPH_FILE.exists() and compact.describes(GRAPH_FILE.read_bytes())):
+        compact = None  # graph.bin left over from another graph.json (e.g. after git pull/checkout)
+
+    counts = render_site(env, artifacts, graph, jobs=args.jobs, ctx=RunContext.create(),
+                         diagram_cache=not args.no_diagram_cache, coverage_mode=args.coverage, compact=compact)
+    print("Docs: " + ", ".join(f"{n} {k}" for k, n in counts.items()))
 
     print("SpecHub generation complete.")
     return 0
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+SpecHub developer entry point.
+
+Subcommands:
+  watch   keep specs, graph and the docs Jinja environment warm in one process and
+          re-run the affected assembly, validation and page renders on every edit under specs/**
+  query   neighbours, typed reachability and shortest paths over specs/_build/graph.json
+  impact  entities and docs pages affected by the spec changes since the last build (or a git revision)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "specs" / "_build"))
+sys.path.insert(0, str(ROOT / "docs"))
+
+import build  # noqa: E402
+import graph_impact  # noqa: E402
+import graph_query  # noqa: E402
+import trace_validator  # noqa: E402
+
+# Build assembler name -> docs page group (also the generate_docs artifact key)
+DOCS_GROUPS = {
+    "prd": "prd",
+    "cjm": "cjm",
+    "userflow": "flow",
+    "ctxux": "ctxux",
+    "ux": "ux",
+    "userstories": "stories",
+    "hig": "hig",
+}
+
+# Graph node id prefix -> docs page group whose pages list that node's neighbours
+NODE_GROUPS = {
+    "prd": "prd",
+    "cjm": "cjm",
+    "flow": "flow",
+    "analytics": "flow",
+    "dd": "flow",
+    "ctxux": "ctxux",
+    "ux": "ux",
+    "story": "stories",
+    "hig": "hig",
+}
+
+ANSI = re.compile(r"\033\[[0-9;]*m")
+
+
+# -------------------- Change detection --------------------
+
+def source_stamps() -> Dict[str, Tuple[int, int]]:
+    """(size, mtime_ns) for every file the build reads; one stat per file."""
+    stamps: Dict[str, Tuple[int, int]] = {}
+    for patterns in build.ASSEMBLY_SOURCES.values():
+        for pattern in patterns:
+            for path in build.ROOT.parent.glob(pattern):
+                if path.is_file():
+                    st = path.stat()
+                    stamps[path.relative_to(ROOT).as_posix()] = (st.st_size, st.st_mtime_ns)
+    return stamps
+
+
+def wait_for_change(stamps: Dict[str, Tuple[int, int]], interval: float, debounce: float) -> Dict[str, Tuple[int, int]]:
+    """Block until the source tree differs from stamps and has settled for one debounce period."""
+    while True:
+        time.sleep(interval)
+        current = source_stamps()
+        if current == stamps:
+            continue
+        # Editors often write in several steps (truncate, write, rename): wait until stable
+        while True:
+            time.sleep(debounce)
+            settled = source_stamps()
+            if settled == current:
+                return settled
+            current = settled
+
+
+def graph_groups(old: Optional[dict], new: dict) -> Set[str]:
+    """Page groups whose nodes gained or lost nodes/edges between two graph exports."""
+    if not old:
+        return set(DOCS_GROUPS.values())
+
+    def nodes(g):
+        return {(n.get("id"), n.get("type"), n.get("title")) for n in g.get("nodes", [])}
+
+    def edges(g):
+        return {(e.get("from"), e.get("to"), e.get("type")) for e in g.get("edges", [])}
+
+    touched: Set[str] = set()
+    for node in nodes(old) ^ nodes(new):
+        touched.add(str(node[0]))
+    for edge in edges(old) ^ edges(new):
+        touched.add(str(edge[0]))
+        touched.add(str(edge[1]))
+    return {NODE_GROUPS[t.split(":", 1)[0]] for t in touched if t.split(":", 1)[0] in NODE_GROUPS}
+
+
+# -------------------- Watch session --------------------
+
+class WatchSession:
+    """Warm state shared by consecutive watch cycles."""
+
+    def __init__(self, jobs: int, validate: bool, docs: bool):
+        self.jobs = jobs
+        self.validate = validate
+        self.docs = docs
+        self.monoliths: Dict[str, object] = {}
+        self.graph: Optional[dict] = None
+        self.builder = None  # build.GraphBuilder patched in place by each incremental build
+        self.rule_issues: Dict[str, list] = {}  # trace_validator rule cache; rules on clean inputs are replayed
+        self.gen = None
+        self.env = None
+        if docs:
+            import generate_docs  # Jinja2 is only needed when docs are rendered
+            self.gen = generate_docs
+            self.gen.ensure_dirs()
+            self.env = self.gen.jinja_env()
+
+    def cycle(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            result = build.run_build(incremental=True, jobs=self.jobs, monoliths=self.monoliths, builder=self.builder)
+        except Exception as e:
+            print(f"[watch] build failed: {e}")
+            return
+        t_build = time.perf_counter()
+
+        graph = result["graph"]
+        if graph is None and self.graph is None:
+            # First cycle against an up-to-date build: warm up from disk and render everything
+            for name in build.ASSEMBLY_ORDER:
+                if not isinstance(self.monoliths.get(name), dict):
+                    self.monoliths[name] = build.load_upstream(self.monoliths, name) or {}
+            graph = build.safe_read(build.OUT / "graph.json") or {"nodes": [], "edges": []}
+            dirty = list(build.ASSEMBLY_ORDER)
+            old_graph = None
+        elif graph is None:
+            print("[watch] up to date")
+            return
+        else:
+            self.monoliths = result["monoliths"]
+            self.builder = result["builder"]
+            dirty = result["dirty"]
+            old_graph = self.graph
+        self.graph = graph
+
+        summary = ""
+        if self.validate:
+            out = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(out):
+                    code = trace_validator.main(self.monoliths, cache=self.rule_issues, dirty=dirty)
+            except Exception as e:
+                self.rule_issues.clear()
+                code, summary = 1, f"validator failed: {e}"
+            else:
+                lines = [ANSI.sub("", line) for line in out.getvalue().splitlines()]
+                summary = next((line for line in lines if line.startswith(("Total:", "✔ No issues"))), "")
+            summary = f"validate={'ok' if code == 0 else 'FAIL'} {summary}".rstrip()
+        t_validate = time.perf_counter()
+
+        pages = ""
+        if self.docs:
+            groups = {DOCS_GROUPS[name] for name in dirty} | graph_groups(old_graph, graph)
+            artifacts = {DOCS_GROUPS[name]: self.monoliths.get(name) or {} for name in build.ASSEMBLY_ORDER}
+            written = ""
+            try:
+                counts = self.gen.render_site(self.env, artifacts, graph, groups=groups,
+                                              graph_changed=old_graph is None or old_graph != graph)
+                written = " (" + ", ".join(f"{n} {k}" for k, n in counts.items() if n and k != "unchanged") + ")"
+            except Exception as e:
+                print(f"[watch] docs failed: {e}")
+            pages = f"pages={','.join(g for g in self.gen.PAGE_GROUPS if g in groups) or '-'}{written}"
+        t_docs = time.perf_counter()
+
+        print(f"[watch] rebuilt {', '.join(dirty)} | {summary} {pages}".rstrip())
+        print(f"[watch] build {1000 * (t_build - t0):.0f}ms, validate {1000 * (t_validate - t_build):.0f}ms, "
+              f"docs {1000 * (t_docs - t_validate):.0f}ms, total {1000 * (t_docs - t0):.0f}ms")
+
+
+def cmd_watch(args) -> int:
+    session = WatchSession(jobs=args.jobs, validate=not args.no_validate, docs=not args.no_docs)
+    stamps = source_stamps()
+    session.cycle()
+    if args.once:
+        return 0
+    print(f"[watch] watching specs/** (interval {args.interval}s), Ctrl+C to stop")
+    try:
+        while True:
+            stamps = wait_for_change(stamps, args.interval, args.debounce)
+            session.cycle()
+    except KeyboardInterrupt:
+        return 0
+
+
+# -------------------- Graph queries --------------------
+
+def _edge_types(values) -> Optional[list]:
+    # --type may be repeated and/or comma separated
+    if not values:
+        return None
+    return [t for v in values for t in v.split(",") if t]
+
+
+def cmd_query(args) -> int:
+    path = Path(args.graph) if args.graph else graph_query.GRAPH_PATH
+    if not path.exists():
+        print(f"[query] {path} not found; run specs/_build/build.py first", file=sys.stderr)
+        return 2
+    q = graph_query.GraphQuery.load(path)
+    try:
+        nodes = [q.resolve(ref) for ref in args.nodes]
+    except KeyError as e:
+        print(f"[query] {e.args[0]}", file=sys.stderr)
+        return 2
+    types = _edge_types(args.type)
+
+    if args.op == "node":
+        nid = nodes[0]
+        result = {"node": q.node(nid) or {"id": nid}, "edges": [list(e) for e in q.edges(nid, args.direction or "both")]}
+        lines = [f"{nid} [{result['node'].get('type', '?')}] {result['node'].get('title', '')}".rstrip()]
+        lines += [f"  {f} -{t}-> {to}" for f, t, to in q.edges(nid, args.direction or "both")]
+    elif args.op == "neighbors":
+        result = q.neighbors(nodes[0], args.direction or "both", types, args.prefix)
+        lines = result
+    elif args.op == "reach":
+        result = q.reach(nodes[0], args.direction or "out", types, args.depth, args.prefix)
+        lines = [f"{d}  {nid}" for nid, d in result.items()]
+    else:
+        result = q.path(nodes[0], nodes[1], args.direction or "both", types)
+        if result is None:
+            lines = [f"no path from {nodes[0]} to {nodes[1]}"]
+        else:
+            lines = [result[0][0]] + [f"  -{etype}- {nid}" for nid, etype in result[1:]]
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print("\n".join(lines))
+    return 1 if args.op == "path" and result is None else 0
+
+
+# -------------------- Impact analysis --------------------
+
+def _git_json(rev: str, path: Path):
+    rel = path.relative_to(ROOT).as_posix()
+    try:
+        out = subprocess.check_output(["git", "show", f"{rev}:{rel}"], cwd=str(ROOT), stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return json.loads(out.decode("utf-8"))
+
+
+def _disk_monoliths() -> Dict[str, dict]:
+    return {name: build.safe_read(build.OUT / build.ASSEMBLY_OUTPUTS[name]) for name in build.ASSEMBLY_ORDER}
+
+
+def cmd_impact(args) -> int:
+    graph_path = build.OUT / "graph.json"
+    # Old snapshot: a graph file, a git revision, or the build currently on disk
+    old_monoliths: Optional[Dict[str, dict]] = None
+    if args.old:
+        old_graph = build.safe_read(Path(args.old))
+    elif args.base:
+        old_graph = _git_json(args.base, graph_path)
+        if old_graph is None:
+            print(f"[impact] {graph_path.relative_to(ROOT)} not found at {args.base}", file=sys.stderr)
+            return 2
+        old_monoliths = {name: _git_json(args.base, build.OUT / build.ASSEMBLY_OUTPUTS[name]) or {}
+                         for name in build.ASSEMBLY_ORDER}
+    else:
+        old_graph = build.safe_read(graph_path)
+        old_monoliths = _disk_monoliths()
+
+    # New snapshot: a graph file, or an in-memory incremental build of the current sources
+    # (write=False: specs/_build is left as is, so the diff is not consumed by the analysis)
+    new_monoliths: Optional[Dict[str, dict]] = None
+    if args.new:
+        new_graph = build.safe_read(Path(args.new))
+    else:
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                result = build.run_build(incremental=True, write=False)
+        except Exception as e:
+            print(f"[impact] build failed: {e}", file=sys.stderr)
+            return 1
+        if result["graph"] is None:
+            # Nothing to rebuild: the build on disk is current
+            new_graph, new_monoliths = build.safe_read(graph_path), _disk_monoliths()
+        else:
+            new_graph, new_monoliths = result["graph"], result["monoliths"]
+
+    impact = graph_impact.analyze(old_graph, new_graph, old_monoliths, new_monoliths,
+                                  _edge_types(args.type) or graph_impact.IMPACT_EDGE_TYPES, args.depth)
+    groups = sorted({NODE_GROUPS[nid.split(":", 1)[0]] for nid in impact.affected if nid.split(":", 1)[0] in NODE_GROUPS})
+
+    if args.json:
+        print(json.dumps({"diff": impact.diff._asdict(), "seeds": impact.seeds, "affected": impact.affected,
+                          "pages": impact.pages, "groups": groups}, ensure_ascii=False, indent=2))
+        return 0
+    d = impact.diff
+    print(f"[impact] nodes +{len(d.added_nodes)} -{len(d.removed_nodes)} ~{len(d.changed_nodes)}, "
+          f"edges +{len(d.added_edges)} -{len(d.removed_edges)}; {len(impact.seeds)} changed, "
+          f"{len(impact.affected)} affected")
+    by_layer: Dict[str, list] = {}
+    for nid, hops in impact.affected.items():
+        by_layer.setdefault(nid.split(":", 1)[0], []).append((nid, hops))
+    for layer in sorted(by_layer):
+        print(f"{layer}:")
+        for nid, hops in sorted(by_layer[layer]):
+            print(f"  {nid}" + (f"  (+{hops})" if hops else ""))
+    if impact.pages:
+        print(f"docs pages ({len(impact.pages)}):")
+        for page in impact.pages:
+            print(f"  docs/{page}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SpecHub developer tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("watch", help="rebuild, validate and regenerate docs on every change under specs/**")
+    p.add_argument("--interval", type=float, default=0.1, help="polling interval in seconds (default: %(default)s)")
+    p.add_argument("--debounce", type=float, default=0.03,
+                   help="quiet period before a change is processed (default: %(default)s)")
+    p.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                   help="number of assemblers run concurrently (default: %(default)s)")
+    p.add_argument("--no-validate", action="store_true", help="skip trace_validator.py")
+    p.add_argument("--no-docs", action="store_true", help="skip docs/ regeneration")
+    p.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("query", help="query the spec graph (neighbours, reachability, paths)",
+                       description="Node arguments take a full id (story:us-10) or a unique suffix (us-10, screen:gallery).")
+    p.add_argument("op", choices=["node", "neighbors", "reach", "path"],
+                   help="node: node and its edges; neighbors: one hop; reach: BFS; path: shortest path between two nodes")
+    p.add_argument("nodes", nargs="+", metavar="NODE")
+    p.add_argument("--direction", choices=graph_query.DIRECTIONS,
+                   help="edge direction to follow (default: out for reach, both otherwise)")
+    p.add_argument("--type", action="append", metavar="EDGE_TYPE",
+                   help="only follow these edge types (repeatable or comma separated), e.g. covered_by,maps_to")
+    p.add_argument("--depth", type=int, help="reach: maximum number of hops")
+    p.add_argument("--prefix", default="", help="neighbors/reach: only list ids starting with this prefix")
+    p.add_argument("--graph", help="graph.json to query (default: specs/_build/graph.json)")
+    p.add_argument("--json", action="store_true", help="print the result as JSON")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("impact", help="entities and docs pages affected by spec changes",
+                       description="Diff two graph snapshots and follow covered_by/maps_to/applies_to/selects edges "
+                                   "from every changed entity. By default the old snapshot is the build on disk and "
+                                   "the new one an incremental build of the current specs/**.")
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--base", metavar="REV", help="old snapshot: specs/_build at this git revision")
+    src.add_argument("--old", metavar="GRAPH", help="old snapshot: this graph.json (graph diff only)")
+    p.add_argument("--new", metavar="GRAPH", help="new snapshot: this graph.json instead of building the current specs")
+    p.add_argument("--type", action="append", metavar="EDGE_TYPE",
+                   help="edge types to propagate along (default: " + ",".join(graph_impact.IMPACT_EDGE_TYPES) + ")")
+    p.add_argument("--depth", type=int, help="maximum number of hops from a changed entity")
+    p.add_argument("--json", action="store_true", help="print the result as JSON")
+    p.set_defaults(func=cmd_impact)
+
+    args = parser.parse_args(argv)
+    if args.command == "query" and len(args.nodes) != (2 if args.op == "path" else 1):
+        parser.error(f"query {args.op} takes {'two nodes' if args.op == 'path' else 'one node'}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,69 @@
 #!/usr/bin/env python3
+import argparse
+import copy
+import array
+import hashlib
 import json
+import os
 import shutil
+import struct
+import sys
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 import re
 
+# Shared registries read by several assemblers (and by trace_validator.py) through SPEC_CACHE
+from spec_cache import DATA_DICTIONARY_PATH, EVENTS_REGISTRY_PATH, SPEC_CACHE
+
 ROOT = Path(__file__).resolve().parents[1]
 OUT = ROOT / "_build"
 
 # No legacy pass-through: specs/_build is the only artifact location
 LEGACY_SOURCES: list = []
 
+# Incremental build manifest: per-source content hashes and the assemblers they feed
+MANIFEST_PATH = OUT / ".build_manifest.json"
+MANIFEST_VERSION = 1
+
+# Columnar encoding of graph.json written alongside it (read by docs/generate_docs.py:load_compact_graph)
+COMPACT_GRAPH_PATH = OUT / "graph.bin"
+COMPACT_GRAPH_MAGIC = b"SPHG"
+COMPACT_GRAPH_VERSION = 3
+
+# Assembly DAG. Order is the serial build order (IDs lock append order depends on it).
+ASSEMBLY_ORDER = ["prd", "cjm", "userflow", "ctxux", "ux", "userstories", "hig"]
+ASSEMBLY_OUTPUTS = {
+    "prd": "00_PRD_v1.json",
+    "cjm": "01_CJM_v1.json",
+    "userflow": "02_UserFlow_v1.json",
+    "ctxux": "06_Contextual_UX_Guidelines_v1.json",
+    "ux": "03_Global_UX_Principles_v1.json",
+    "userstories": "04_UserStories_v1.json",
+    "hig": "05_HIG_Pattern_selection_v1.json",
+}
+# userflow validates PRD/CJM refs against ids locked by the prd/cjm assemblers
+ASSEMBLY_DEPS = {
+    "prd": [],
+    "cjm": [],
+    "userflow": ["prd", "cjm"],
+    "ctxux": ["userflow"],
+    "ux": [],
+    "userstories": ["userflow"],
+    "hig": ["userflow", "userstories"],
+}
+# Source globs (relative to repository root) read by each assembler
+ASSEMBLY_SOURCES = {
+    "prd": ["specs/00_prd/**/*.json", "00_PRD_v1.json"],
+    "cjm": ["specs/01_cjm/**/*.json", "01_CJM_v1.json"],
+    "userflow": ["specs/02_userflow/**/*.json", "02_UserFlow_v1.json"],
+    "ctxux": ["specs/06_ctxux/**/*.json"],
+    "ux": ["specs/03_ux_principles/**/*.json", "03_Global_UX_Principles_v1.json"],
+    "userstories": ["specs/04_userstories/**/*.json", "04_UserStories_v1.json"],
+    "hig": ["specs/05_hig/**/*.json", "specs/04_userstories/index.json", "05_HIG_Pattern_selection_v1.json"],
+}
+
 
 def ensure_out():
     OUT.mkdir(parents=True, exist_ok=True)
@@ -30,15 +83,81 @@ def copy_legacy():
     return []
 
 
+# --------------------------
+# Spec registry cache (spec_cache.SPEC_CACHE)
+# --------------------------
+def _validated_events(reg) -> FrozenSet[str]:
+    validate_userflow_events(reg)
+    return frozenset(reg.get("events", []) or [])
+
+
+def registry_events() -> FrozenSet[str]:
+    """Event names from the validated analytics registry (validated once per cached registry)."""
+    return SPEC_CACHE.derived(EVENTS_REGISTRY_PATH, "events", _validated_events)
+
+
 # --------------------------
 # IDs LOCK (machine-readable)
 # --------------------------
-def read_ids_lock() -> dict:
+class IdsLock:
+    """IDs_LOCK.json with a set index next to each append-only id list.
+
+    Membership checks are O(1); `dirty` is set only when an id or status entry is appended,
+    so write_ids_lock() can skip rewriting an unchanged lock.
+    """
+
+    def __init__(self, data: dict, dirty: bool = False):
+        self.data = data
+        self.dirty = dirty
+        self.journal: Optional[List[Tuple[str, str, str]]] = None
+        self._index: Dict[Tuple[str, str], Tuple[List[str], Set[str]]] = {}
+        self._status: Optional[dict] = None
+
+    def ids(self, category: str, kind: str) -> List[str]:
+        return self.data.get("ids", {}).get(category, {}).get(kind, [])
+
+    def ensure(self, category: str, kind: str, _id: str):
+        entry = self._index.get((category, kind))
+        if entry is None:
+            lst = self.data.setdefault("ids", {}).setdefault(category, {}).setdefault(kind, [])
+            entry = self._index[(category, kind)] = (lst, set(lst))
+        lst, index = entry
+        changed = False
+        if _id not in index:
+            lst.append(_id)
+            index.add(_id)
+            changed = True
+        # Track status per ID (append-only policy); namespaced key prevents collisions
+        if self._status is None:
+            self._status = self.data.setdefault("status", {})
+        status_key = f"{category}:{kind}:{_id}"
+        if status_key not in self._status:
+            self._status[status_key] = {"status": "active"}
+            changed = True
+        if changed:
+            self.dirty = True
+            if self.journal is not None:
+                self.journal.append((category, kind, _id))
+
+    def replay(self, journal: List[Tuple[str, str, str]]):
+        for category, kind, _id in journal:
+            self.ensure(category, kind, _id)
+
+    def fork(self, *journals: List[Tuple[str, str, str]]) -> "IdsLock":
+        """Private copy for a parallel assembler: upstream journals applied, own appends journaled."""
+        child = IdsLock(copy.deepcopy(self.data))
+        for journal in journals:
+            child.replay(journal)
+        child.journal = []
+        return child
+
+
+def read_ids_lock() -> IdsLock:
     lock_json = ROOT.parent / "IDs_LOCK.json"
     if lock_json.exists():
-        return read_json(lock_json)
+        return IdsLock(read_json(lock_json))
     # fallback: empty structure
-    return {
+    return IdsLock({
         "policy": {"append_only": True},
         "ids": {
             "prd": {"sections": []},
@@ -48,23 +167,96 @@ def read_ids_lock() -> dict:
             "ux": {"principles": []}
         },
         "status": {}
-    }
+    }, dirty=True)
 
 
-def ensure_in_ids(lock: dict, category: str, kind: str, _id: str):
-    lock.setdefault("ids", {}).setdefault(category, {}).setdefault(kind, [])
-    if _id not in lock["ids"][category][kind]:
-        lock["ids"][category][kind].append(_id)
-    # Track status per ID (append-only policy); namespaced key prevents collisions
-    status_key = f"{category}:{kind}:{_id}"
-    lock.setdefault("status", {})
-    if status_key not in lock["status"]:
-        lock["status"][status_key] = {"status": "active"}
+def ensure_in_ids(lock: IdsLock, category: str, kind: str, _id: str):
+    lock.ensure(category, kind, _id)
 
 
-def write_ids_lock(lock: dict):
+def write_ids_lock(lock: IdsLock) -> bool:
+    if not lock.dirty:
+        return False
     path = ROOT.parent / "IDs_LOCK.json"
-    write_json(path, lock)
+    write_json(path, lock.data)
+    lock.dirty = False
+    return True
+
+
+# --------------------------
+# Incremental build manifest
+# --------------------------
+def read_manifest() -> dict:
+    try:
+        return read_json(MANIFEST_PATH)
+    except Exception:
+        return {}
+
+
+def tool_digest() -> str:
+    # Any change to the build script invalidates every assembler
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def scan_sources(prev: dict) -> Dict[str, dict]:
+    """Hash every source file and record the assemblers it feeds.
+
+    Content hashes are reused from the previous manifest when size and mtime are unchanged,
+    so a no-op scan only costs one stat per file.
+    """
+    old = prev.get("sources", {}) if prev.get("version") == MANIFEST_VERSION else {}
+    sources: Dict[str, dict] = {}
+    for name in ASSEMBLY_ORDER:
+        for pattern in ASSEMBLY_SOURCES[name]:
+            for path in sorted(ROOT.parent.glob(pattern)):
+                if not path.is_file():
+                    continue
+                rel = path.relative_to(ROOT.parent).as_posix()
+                entry = sources.get(rel)
+                if entry is None:
+                    st = path.stat()
+                    cached = old.get(rel) or {}
+                    if cached.get("size") == st.st_size and cached.get("mtime_ns") == st.st_mtime_ns:
+                        digest = cached.get("sha256")
+                    else:
+                        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                    entry = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "feeds": []}
+                    sources[rel] = entry
+                if name not in entry["feeds"]:
+                    entry["feeds"].append(name)
+    return sources
+
+
+def with_dependents(names: Set[str]) -> Set[str]:
+    out = set(names)
+    for name in ASSEMBLY_ORDER:
+        if any(dep in out for dep in ASSEMBLY_DEPS[name]):
+            out.add(name)
+    return out
+
+
+def changed_assemblers(prev: dict, sources: Dict[str, dict], tool: str) -> Set[str]:
+    """Return assemblers whose inputs changed since the manifest was written, plus their dependents."""
+    if prev.get("version") != MANIFEST_VERSION or prev.get("tool") != tool:
+        return set(ASSEMBLY_ORDER)
+    if not (ROOT.parent / "IDs_LOCK.json").exists():
+        return set(ASSEMBLY_ORDER)
+    old = prev.get("sources", {}) or {}
+    dirty: Set[str] = set()
+    for rel in set(old) | set(sources):
+        before = old.get(rel) or {}
+        after = sources.get(rel) or {}
+        if before.get("sha256") != after.get("sha256"):
+            dirty.update(before.get("feeds", []))
+            dirty.update(after.get("feeds", []))
+    for name, fname in ASSEMBLY_OUTPUTS.items():
+        if not (OUT / fname).exists():
+            dirty.add(name)
+    return with_dependents(dirty)
+
+
+def write_manifest(sources: Dict[str, dict], tool: str):
+    write_json(MANIFEST_PATH, {"version": MANIFEST_VERSION, "tool": tool, "sources": sources})
 
 
 # --------------------------
@@ -124,12 +316,11 @@ def validate_cjm_stage(st: dict, sid: str):
 # --------------------------
 # 02 UserFlow assembly
 # --------------------------
-def assemble_userflow(lock: dict) -> dict:
+def assemble_userflow(lock: IdsLock) -> dict:
     idx = read_json(ROOT / "02_userflow" / "index.json")
-    # Load registry files
-    events_reg = read_json(ROOT / "02_userflow" / "analytics" / "events.json")
-    validate_userflow_events(events_reg)
-    data_dict = read_json(ROOT / "02_userflow" / "data_dictionary.json")
+    # Load registry files (shared, read-only views)
+    events_set: FrozenSet[str] = registry_events()
+    data_dict = SPEC_CACHE.load(DATA_DICTIONARY_PATH)
     nodes_dir = ROOT / "02_userflow" / "nodes"
 
     # Collect nodes from domain files
@@ -143,7 +334,6 @@ def assemble_userflow(lock: dict) -> dict:
     # Validations
     node_ids: Set[str] = set()
     edge_ids: Set[str] = set()
-    events_set: Set[str] = set(events_reg.get("events", []))
 
     def dd_has(key: str) -> bool:
         if not key:
@@ -163,8 +353,8 @@ def assemble_userflow(lock: dict) -> dict:
     all_outputs: Set[str] = set()
 
     # Collect PRD/CJM ids from IDs lock for cross-refs
-    prd_ids = set(lock.get("ids", {}).get("prd", {}).get("sections", []))
-    cjm_ids = set(lock.get("ids", {}).get("cjm", {}).get("stages", []))
+    prd_ids = set(lock.ids("prd", "sections"))
+    cjm_ids = set(lock.ids("cjm", "stages"))
 
     # Node uniqueness and collect
     for n in node_objs:
@@ -224,7 +414,7 @@ def assemble_userflow(lock: dict) -> dict:
     # data dictionary coverage hard check: each REQUIRED io key from extracted_keys should appear in outputs somewhere
     required_dd_keys: Set[str] = set()
     for item in data_dict.get("extracted_keys", []) or []:
-        if isinstance(item, dict):
+        if isinstance(item, Mapping):
             name = item.get("name")
             cov = (item.get("coverage") or "required").lower()
             if name and cov == "required":
@@ -247,7 +437,7 @@ def assemble_userflow(lock: dict) -> dict:
     dd_array: List[dict] = []
     # include extracted_keys first for explicit IO
     for item in data_dict.get("extracted_keys", []) or []:
-        if isinstance(item, dict):
+        if isinstance(item, Mapping):
             name = item.get("name")
             if not name:
                 continue
@@ -274,34 +464,27 @@ def assemble_userflow(lock: dict) -> dict:
     return assembled
 
 
-def write_userflow_monolith(lock: dict):
-    assembled = assemble_userflow(lock)
-    write_json(OUT / "02_UserFlow_v1.json", assembled)
-    return assembled
-
-
 # --------------------------
 # 06 Contextual UX assembly
 # --------------------------
-def assemble_ctxux(lock: dict, userflow_ctx: dict) -> dict:
+def assemble_ctxux(lock: IdsLock, userflow_ctx: dict) -> dict:
     idx = read_json(ROOT / "06_ctxux" / "index.json")
     screens_dir = ROOT / "06_ctxux" / "screens"
     screens: List[dict] = []
     # Build validation context from userflow
     uf_nodes: Set[str] = set()
-    uf_events: Set[str] = set()
+    uf_events: FrozenSet[str] = frozenset()
     if userflow_ctx:
         for n in userflow_ctx.get("user_flow", []):
             nid = n.get("id")
             if nid:
                 uf_nodes.add(nid)
         # try to get events from the registry file
-        events_reg_path = ROOT / "02_userflow" / "analytics" / "events.json"
-        if events_reg_path.exists():
+        if EVENTS_REGISTRY_PATH.exists():
             try:
-                uf_events = set(read_json(events_reg_path).get("events", []))
+                uf_events = registry_events()
             except Exception:
-                uf_events = set()
+                uf_events = frozenset()
     if screens_dir.exists():
         for path in sorted(screens_dir.glob("*.json")):
             s = read_json(path)
@@ -373,18 +556,12 @@ def assemble_ctxux(lock: dict, userflow_ctx: dict) -> dict:
     return assembled
 
 
-def write_ctxux_monolith(lock: dict, userflow_ctx: dict):
-    assembled = assemble_ctxux(lock, userflow_ctx)
-    write_json(OUT / "06_Contextual_UX_Guidelines_v1.json", assembled)
-    return True
-
-
 """
 ---------------------------
  03 Global UX Principles
 ---------------------------
 """
-def assemble_ux_principles(lock: dict) -> dict:
+def assemble_ux_principles(lock: IdsLock) -> dict:
     ux_root = ROOT / "03_ux_principles"
     index_path = ux_root / "index.json"
     idx = read_json(index_path) if index_path.exists() else {}
@@ -460,12 +637,6 @@ def assemble_ux_principles(lock: dict) -> dict:
     return assembled
 
 
-def write_ux_principles_monolith(lock: dict):
-    assembled = assemble_ux_principles(lock)
-    write_json(OUT / "03_Global_UX_Principles_v1.json", assembled)
-    return True
-
-
 """
 ---------------------------
  04 User Stories assembly
@@ -478,18 +649,17 @@ def assemble_userstories(userflow_ctx: dict) -> dict:
 
     # Build validation context from userflow
     uf_nodes: Set[str] = set()
-    uf_events: Set[str] = set()
+    uf_events: FrozenSet[str] = frozenset()
     if userflow_ctx:
         for n in userflow_ctx.get("user_flow", []):
             nid = n.get("id")
             if nid:
                 uf_nodes.add(nid)
-        events_reg_path = ROOT / "02_userflow" / "analytics" / "events.json"
-        if events_reg_path.exists():
+        if EVENTS_REGISTRY_PATH.exists():
             try:
-                uf_events = set(read_json(events_reg_path).get("events", []))
+                uf_events = registry_events()
             except Exception:
-                uf_events = set()
+                uf_events = frozenset()
 
     # Load stories
     stories_dir = us_root / "us"
@@ -548,12 +718,6 @@ def assemble_userstories(userflow_ctx: dict) -> dict:
     return assembled
 
 
-def write_userstories_monolith(userflow_ctx: dict):
-    assembled = assemble_userstories(userflow_ctx)
-    write_json(OUT / "04_UserStories_v1.json", assembled)
-    return True
-
-
 """
 ---------------------------
  05 HIG Pattern Selection
@@ -628,18 +792,12 @@ def assemble_hig(userflow_ctx: dict, userstories_ctx: dict) -> dict:
     return assembled
 
 
-def write_hig_monolith(userflow_ctx: dict, userstories_ctx: dict):
-    assembled = assemble_hig(userflow_ctx, userstories_ctx)
-    write_json(OUT / "05_HIG_Pattern_selection_v1.json", assembled)
-    return True
-
-
 """
 ---------------------------
  00 PRD assembly
 ---------------------------
 """
-def assemble_prd(lock: dict) -> dict:
+def assemble_prd(lock: IdsLock) -> dict:
     prd_root = ROOT / "00_prd"
     idx = read_json(prd_root / "index.json")
     section_ids = idx.get("sections", [])
@@ -671,18 +829,12 @@ def assemble_prd(lock: dict) -> dict:
     }
 
 
-def write_prd_monolith(lock: dict):
-    assembled = assemble_prd(lock)
-    write_json(OUT / "00_PRD_v1.json", assembled)
-    return True
-
-
 """
 ---------------------------
  01 CJM assembly
 ---------------------------
 """
-def assemble_cjm(lock: dict) -> dict:
+def assemble_cjm(lock: IdsLock) -> dict:
     cjm_root = ROOT / "01_cjm"
     idx = read_json(cjm_root / "index.json")
     stage_ids = idx.get("stages", [])
@@ -714,58 +866,60 @@ def assemble_cjm(lock: dict) -> dict:
     }
 
 
-def write_cjm_monolith(lock: dict):
-    assembled = assemble_cjm(lock)
-    write_json(OUT / "01_CJM_v1.json", assembled)
-    return True
+def load_monolith(monoliths: Optional[Dict[str, object]], name: str) -> dict:
+    """Return an assembled monolith from memory, falling back to its file in specs/_build."""
+    doc = (monoliths or {}).get(name)
+    if isinstance(doc, dict) and doc:
+        return doc
+    return read_json(OUT / ASSEMBLY_OUTPUTS[name])
 
 
-def summarize_status():
+def summarize_status(monoliths: Optional[Dict[str, object]] = None):
     msgs = []
     # PRD
     try:
-        prd = read_json(OUT / "00_PRD_v1.json")
+        prd = load_monolith(monoliths, "prd")
         msgs.append(f"Assembled: 00_PRD_v1.json (sections: {len(prd.get('prd', []))})")
     except Exception:
         pass
     # CJM
     try:
-        cjm = read_json(OUT / "01_CJM_v1.json")
+        cjm = load_monolith(monoliths, "cjm")
         msgs.append(f"Assembled: 01_CJM_v1.json (stages: {len(cjm.get('cjm', []))})")
     except Exception:
         pass
     # UserFlow
     try:
-        uf = read_json(OUT / "02_UserFlow_v1.json")
+        uf = load_monolith(monoliths, "userflow")
         nodes = uf.get('user_flow', [])
         edges = sum(len(n.get('edges', []) or []) for n in nodes)
         # events count from registry
-        ev_reg = read_json(ROOT / "02_userflow" / "analytics" / "events.json")
+        ev_reg = SPEC_CACHE.load(EVENTS_REGISTRY_PATH)
         msgs.append(f"Assembled: 02_UserFlow_v1.json (nodes: {len(nodes)}, edges: {edges}, events: {len(ev_reg.get('events', []))})")
     except Exception:
         pass
     # UX Principles
     try:
-        ux = read_json(OUT / "03_Global_UX_Principles_v1.json")
+        ux = load_monolith(monoliths, "ux")
         msgs.append(f"Assembled: 03_Global_UX_Principles_v1.json (principles: {len(ux.get('principles', []))}, antipatterns: {len(ux.get('antipatterns_registry', []))}, aliases: {len(ux.get('aliases', []))})")
     except Exception:
         pass
     # User Stories
     try:
-        us = read_json(OUT / "04_UserStories_v1.json")
+        us = load_monolith(monoliths, "userstories")
         msgs.append(f"Assembled: 04_UserStories_v1.json (epics: {len(us.get('epics', []))}, stories: {len(us.get('stories', []))})")
     except Exception:
         pass
     # HIG
     try:
-        hig = read_json(OUT / "05_HIG_Pattern_selection_v1.json")
+        hig = load_monolith(monoliths, "hig")
         cand = sum(len(s.get('candidates', []) or []) for s in hig.get('stories', []) or [])
         msgs.append(f"Assembled: 05_HIG_Pattern_selection_v1.json (stories: {len(hig.get('stories', []))}, candidates: {cand})")
     except Exception:
         pass
     # CtxUX
     try:
-        cx = read_json(OUT / "06_Contextual_UX_Guidelines_v1.json")
+        cx = load_monolith(monoliths, "ctxux")
         lps = sum(len(s.get('local_principles', []) or []) for s in cx.get('screens', []) or [])
         msgs.append(f"Assembled: 06_Contextual_UX_Guidelines_v1.json (screens: {len(cx.get('screens', []))}, local_principles: {lps})")
     except Exception:
@@ -783,170 +937,573 @@ def safe_read(path: Path) -> dict:
         return {}
 
 
-def write_graph():
-    """Export a consolidated graph to specs/_build/graph.json.
+# Graph contributors: assembler -> (list keys, id field). Each entity tags what it adds to the
+# graph with "<assembler>:<entity id>", so an incremental build can swap one entity's share.
+GRAPH_ENTITIES = {
+    "prd": (("prd", "sections"), "id"),
+    "cjm": (("cjm", "stages"), "id"),
+    "userflow": (("user_flow",), "id"),
+    "ctxux": (("screens",), "id"),
+    "ux": (("principles",), "id"),
+    "userstories": (("stories",), "story_id"),
+    "hig": (("stories",), "story_id"),
+}
+
+
+def graph_entities(name: str, doc: Optional[dict]) -> List[dict]:
+    """Entity dicts of one assembled monolith, in document order."""
+    keys, _ = GRAPH_ENTITIES[name]
+    for key in keys:
+        items = (doc or {}).get(key) or []
+        if items:
+            return [item for item in items if isinstance(item, dict)]
+    return []
 
-    Node types: PRD, CJM, FLOW_NODE, FLOW_EDGE, STORY, HIG, UX, CTXUX, ANALYTICS, DD
-    Edges (type): influences, maps_to, covered_by, selects, applies_to, emits, used_in
+
+def changed_entities(old: Dict[str, object], new: Dict[str, object], names: Optional[Iterable[str]] = None) -> Dict[str, Set]:
+    """Assembler -> ids of entities added, removed or edited between two monolith sets (names limits the assemblers)."""
+    changed: Dict[str, Set] = {}
+    for name in (names if names is not None else GRAPH_ENTITIES):
+        _, field = GRAPH_ENTITIES[name]
+        before: Dict[object, List[str]] = {}
+        after: Dict[object, List[str]] = {}
+        for side, doc in ((before, old.get(name)), (after, new.get(name))):
+            for item in graph_entities(name, doc if isinstance(doc, dict) else None):
+                side.setdefault(item.get(field), []).append(json.dumps(item, sort_keys=True, ensure_ascii=False))
+        ids = {eid for eid in set(before) | set(after) if before.get(eid) != after.get(eid)}
+        if ids:
+            changed[name] = ids
+    return changed
+
+
+class GraphBuilder:
+    """Interning node/edge tables for graph.json, with per-entity provenance.
+
+    Nodes are keyed by id (the first title/data wins), edges by (from, to, type). Nodes list the
+    provenance tags that produced them ("sources"); edges map each tag to how often it produced
+    them ("sources"), "count" being the total. drop(tag) withdraws one entity's contribution, so
+    write_graph() can patch a graph instead of rebuilding it. graph() returns fresh, sorted tables.
     """
-    prd = safe_read(OUT / "00_PRD_v1.json")
-    cjm = safe_read(OUT / "01_CJM_v1.json")
-    uf = safe_read(OUT / "02_UserFlow_v1.json")
-    ux = safe_read(OUT / "03_Global_UX_Principles_v1.json")
-    us = safe_read(OUT / "04_UserStories_v1.json")
-    hig = safe_read(OUT / "05_HIG_Pattern_selection_v1.json")
-    ctx = safe_read(OUT / "06_Contextual_UX_Guidelines_v1.json")
-
-    nodes: List[dict] = []
-    edges: List[dict] = []
-
-    # PRD nodes
-    prd_titles: Dict[str, str] = {}
-    for sec in (prd.get("prd", []) or prd.get("sections", []) or []):
-        sid = sec.get("id")
-        if not sid:
-            continue
-        prd_titles[sid] = sec.get("title") or f"PRD {sid}"
-        nodes.append({"id": f"prd:{sid}", "type": "PRD", "title": prd_titles[sid]})
-
-    # CJM nodes
-    cjm_titles: Dict[str, str] = {}
-    for st in (cjm.get("cjm", []) or cjm.get("stages", []) or []):
-        cid = st.get("id")
-        if not cid:
-            continue
-        cjm_titles[cid] = st.get("title") or cid
-        nodes.append({"id": f"cjm:{cid}", "type": "CJM", "title": cjm_titles[cid]})
 
-    # UserFlow nodes and edges
-    flow_nodes: Dict[str, dict] = {}
-    for n in uf.get("user_flow", []) or []:
-        nid = n.get("id")
-        if not nid:
+    def __init__(self):
+        self.nodes: Dict[str, dict] = {}
+        self.node_tags: Dict[str, Set[str]] = {}
+        self.edges: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        # tag -> (node ids, edge keys) it contributed
+        self.contrib: Dict[str, Tuple[Set[str], Set[Tuple[str, str, str]]]] = {}
+
+    @classmethod
+    def from_graph(cls, graph: Optional[dict]) -> Optional["GraphBuilder"]:
+        """Builder holding an exported graph; None when graph has no per-entity provenance (older export)."""
+        if not graph or not isinstance(graph.get("nodes"), list):
+            return None
+        g = cls()
+        for n in graph["nodes"]:
+            tags = n.get("sources")
+            if not isinstance(tags, list) or not all(isinstance(t, str) and ":" in t for t in tags):
+                return None
+            g.nodes[n["id"]] = {k: v for k, v in n.items() if k != "sources"}
+            g.node_tags[n["id"]] = set(tags)
+            for tag in tags:
+                g.contrib.setdefault(tag, (set(), set()))[0].add(n["id"])
+        for e in graph.get("edges", []) or []:
+            tags = e.get("sources")
+            if not isinstance(tags, dict):
+                return None
+            key = (e["from"], e["to"], e["type"])
+            g.edges[key] = dict(tags)
+            for tag in tags:
+                g.contrib.setdefault(tag, (set(), set()))[1].add(key)
+        return g
+
+    def node(self, tag: str, nid: str, ntype: str, title: str, data: Optional[dict] = None):
+        if nid not in self.nodes:
+            node = self.nodes[nid] = {"id": nid, "type": ntype, "title": title}
+            if data is not None:
+                node["data"] = data
+            self.node_tags[nid] = set()
+        self.node_tags[nid].add(tag)
+        self.contrib.setdefault(tag, (set(), set()))[0].add(nid)
+
+    def edge(self, tag: str, src: str, dst: str, etype: str):
+        key = (src, dst, etype)
+        tags = self.edges.setdefault(key, {})
+        tags[tag] = tags.get(tag, 0) + 1
+        self.contrib.setdefault(tag, (set(), set()))[1].add(key)
+
+    def drop(self, tag: str):
+        """Remove everything tag contributed; nodes and edges other tags still produce stay."""
+        node_ids, edge_keys = self.contrib.pop(tag, (set(), set()))
+        for nid in node_ids:
+            tags = self.node_tags[nid]
+            tags.discard(tag)
+            if not tags:
+                del self.node_tags[nid]
+                del self.nodes[nid]
+        for key in edge_keys:
+            tags = self.edges[key]
+            tags.pop(tag, None)
+            if not tags:
+                del self.edges[key]
+
+    def tags(self, name: str) -> Set[str]:
+        """Entity ids of assembler name that currently contribute to the graph."""
+        prefix = name + ":"
+        return {tag[len(prefix):] for tag in self.contrib if tag.startswith(prefix)}
+
+    def graph(self) -> dict:
+        nodes = []
+        for nid in sorted(self.nodes):
+            node = dict(self.nodes[nid])
+            node["sources"] = sorted(self.node_tags[nid])
+            nodes.append(node)
+        edges = []
+        for key in sorted(self.edges):
+            tags = self.edges[key]
+            edges.append({"from": key[0], "to": key[1], "type": key[2], "count": sum(tags.values()),
+                          "sources": {tag: tags[tag] for tag in sorted(tags)}})
+        return {"nodes": nodes, "edges": edges}
+
+
+def write_compact_graph(graph: dict, path: Path = COMPACT_GRAPH_PATH, source: Optional[bytes] = None) -> None:
+    """Write graph in the compact columnar format; graph.json stays the interchange format.
+
+    Layout: MAGIC, u32 version, u32 header length, a UTF-8 JSON header (string table, type and
+    source names, column directory), then every column as little-endian array bytes in directory
+    order. Node i is strings[i]; nodes from header["declared"] on are edge endpoints that have no
+    node entry. Columns: node_type/node_title/node_sources, edge_from/edge_to/edge_type/edge_count/
+    edge_sources (assembler bitmasks), CSR adjacency out_indptr/out_edges and in_indptr/in_edges
+    (edge indices), and CSR provenance node_prov_indptr/node_prov and edge_prov_indptr/edge_prov/
+    edge_prov_count (tags as string indices).
+    source is the graph.json text this encodes; its sha256 goes into the header so readers can
+    tell a stale graph.bin (gitignored) from one matching the tracked graph.json.
+    """
+    nodes = graph.get("nodes", []) or []
+    edges = graph.get("edges", []) or []
+    strings: List[str] = [n["id"] for n in nodes]
+    pos: Dict[str, int] = {s: i for i, s in enumerate(strings)}
+    declared = len(strings)
+    for e in edges:
+        for end in (e["from"], e["to"]):
+            if end not in pos:
+                pos[end] = len(strings)
+                strings.append(end)
+    node_count = len(strings)
+
+    def intern(text: str) -> int:
+        i = pos.get(text)
+        if i is None:
+            i = pos[text] = len(strings)
+            strings.append(text)
+        return i
+
+    node_types = sorted({n["type"] for n in nodes})
+    edge_types = sorted({e["type"] for e in edges})
+    ntype = {t: i for i, t in enumerate(node_types)}
+    etype = {t: i for i, t in enumerate(edge_types)}
+    source_bit = {name: 1 << i for i, name in enumerate(ASSEMBLY_ORDER)}
+
+    def sources(item: dict) -> int:
+        return sum({source_bit.get(tag.split(":", 1)[0], 0) for tag in item.get("sources", [])})
+
+    def prov(items: List[dict], counts: bool):
+        indptr = array.array("I", [0])
+        tags = array.array("I")
+        per_tag = array.array("I")
+        for item in items:
+            for tag in item.get("sources", []):
+                tags.append(intern(tag))
+                if counts:
+                    per_tag.append(item["sources"][tag])
+            indptr.append(len(tags))
+        return indptr, tags, per_tag
+
+    cols: Dict[str, array.array] = {
+        "node_type": array.array("B", [ntype[n["type"]] for n in nodes] + [255] * (node_count - declared)),
+        "node_title": array.array("I", [intern(n.get("title") or n["id"]) for n in nodes] + list(range(declared, node_count))),
+        "node_sources": array.array("H", [sources(n) for n in nodes] + [0] * (node_count - declared)),
+        "edge_from": array.array("I", [pos[e["from"]] for e in edges]),
+        "edge_to": array.array("I", [pos[e["to"]] for e in edges]),
+        "edge_type": array.array("B", [etype[e["type"]] for e in edges]),
+        "edge_count": array.array("I", [e.get("count", 1) for e in edges]),
+        "edge_sources": array.array("H", [sources(e) for e in edges]),
+    }
+    # CSR per direction: edges of node i are <dir>_edges[<dir>_indptr[i]:<dir>_indptr[i + 1]]
+    for direction, ends in (("out", cols["edge_from"]), ("in", cols["edge_to"])):
+        indptr = array.array("I", [0] * (node_count + 1))
+        for i in ends:
+            indptr[i + 1] += 1
+        for i in range(node_count):
+            indptr[i + 1] += indptr[i]
+        fill = array.array("I", indptr[:-1])
+        order = array.array("I", [0] * len(ends))
+        for k, i in enumerate(ends):
+            order[fill[i]] = k
+            fill[i] += 1
+        cols[f"{direction}_indptr"] = indptr
+        cols[f"{direction}_edges"] = order
+    cols["node_prov_indptr"], cols["node_prov"], _ = prov(nodes, counts=False)
+    cols["edge_prov_indptr"], cols["edge_prov"], cols["edge_prov_count"] = prov(edges, counts=True)
+
+    header = {
+        "strings": strings,
+        "declared": declared,
+        "node_types": node_types,
+        "edge_types": edge_types,
+        "sources": ASSEMBLY_ORDER,
+        "data": {str(i): n["data"] for i, n in enumerate(nodes) if "data" in n},
+        "columns": [[name, col.typecode, col.itemsize, len(col)] for name, col in cols.items()],
+        "graph_sha256": hashlib.sha256(source).hexdigest() if source is not None else None,
+    }
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    chunks = [COMPACT_GRAPH_MAGIC, struct.pack("<II", COMPACT_GRAPH_VERSION, len(head)), head]
+    for col in cols.values():
+        if sys.byteorder != "little":
+            col = array.array(col.typecode, col)
+            col.byteswap()
+        chunks.append(col.tobytes())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"".join(chunks))
+
+
+# -------------------- Graph emitters (one entity each) --------------------
+
+def _emit_prd(g: GraphBuilder, sec: dict, ctx: dict):
+    sid = sec.get("id")
+    if sid:
+        g.node(f"prd:{sid}", f"prd:{sid}", "PRD", sec.get("title") or f"PRD {sid}")
+
+
+def _emit_cjm(g: GraphBuilder, st: dict, ctx: dict):
+    cid = st.get("id")
+    if cid:
+        g.node(f"cjm:{cid}", f"cjm:{cid}", "CJM", st.get("title") or cid)
+
+
+def _emit_flow_node(g: GraphBuilder, n: dict, ctx: dict):
+    nid = n.get("id")
+    if not nid:
+        return
+    tag = f"userflow:{nid}"
+    g.node(tag, f"flow:node:{nid}", "FLOW_NODE", nid)
+    # analytics at node level
+    for ev in n.get("analytics", []) or []:
+        g.node(tag, f"analytics:event:{ev}", "ANALYTICS", ev)
+        g.edge(tag, f"flow:node:{nid}", f"analytics:event:{ev}", "emits")
+    # refs PRD/CJM influence/maps_to
+    for ref in n.get("refs", []) or []:
+        if isinstance(ref, str) and ref.startswith("PRD:#"):
+            rid = ref.split("PRD:#", 1)[1]
+            g.edge(tag, f"prd:{rid}", f"cjm:{rid}", "influences")  # will fix via CJM ref below
+        if isinstance(ref, str) and ref.startswith("CJM:#"):
+            cid = ref.split("CJM:#", 1)[1]
+            g.edge(tag, f"cjm:{cid}", f"flow:node:{nid}", "maps_to")
+    # node outputs → DD used_in
+    for outk in n.get("outputs", []) or []:
+        if isinstance(outk, str):
+            g.node(tag, f"dd:{outk}", "DD", outk)
+            g.edge(tag, f"dd:{outk}", f"flow:node:{nid}", "used_in")
+    # edges from node
+    for e in n.get("edges", []) or []:
+        eid = e.get("id") or f"{nid}->{e.get('target')}"
+        tgt = e.get("target")
+        g.node(tag, f"flow:edge:{nid}:{eid}", "FLOW_EDGE", eid, {"from_node": nid, "to_node": tgt})
+        if tgt:
+            g.edge(tag, f"flow:node:{nid}", f"flow:node:{tgt}", "maps_to")
+        for ev in e.get("analytics", []) or []:
+            g.node(tag, f"analytics:event:{ev}", "ANALYTICS", ev)
+            g.edge(tag, f"flow:node:{nid}", f"analytics:event:{ev}", "emits")
+    # PRD→CJM influences via co-occurrence in the node refs
+    prds = [ref.split("PRD:#", 1)[1] for ref in (n.get("refs", []) or []) if isinstance(ref, str) and ref.startswith("PRD:#")]
+    cjms = [ref.split("CJM:#", 1)[1] for ref in (n.get("refs", []) or []) if isinstance(ref, str) and ref.startswith("CJM:#")]
+    for rid in prds:
+        for cid in cjms:
+            g.edge(tag, f"prd:{rid}", f"cjm:{cid}", "influences")
+
+
+def _emit_screen(g: GraphBuilder, screen: dict, ctx: dict):
+    sid = screen.get("id")
+    if not sid:
+        return
+    tag = f"ctxux:{sid}"
+    g.node(tag, f"ctxux:screen:{sid}", "CTXUX", screen.get("title") or sid)
+    # UX principles mapped via local_principles
+    for lp in screen.get("local_principles", []) or []:
+        for gp in lp.get("global_principle_ids", []) or []:
+            if gp in ctx["ux_ids"]:
+                g.node(tag, f"ux:principle:{gp}", "UX", gp)
+                g.edge(tag, f"ux:principle:{gp}", f"ctxux:screen:{sid}", "applies_to")
+    # Map UserFlow refs to CTXUX screen
+    for fn in (screen.get("refs", {}).get("UserFlow", []) or []):
+        if fn in ctx["flow_ids"]:
+            g.edge(tag, f"flow:node:{fn}", f"ctxux:screen:{sid}", "maps_to")
+
+
+def _emit_story(g: GraphBuilder, s: dict, ctx: dict):
+    sid = s.get("story_id")
+    if not sid:
+        return
+    tag = f"userstories:{sid}"
+    g.node(tag, f"story:{sid}", "STORY", s.get("capability") or s.get("title") or sid)
+    # refs/AC FLOW:#node → covered_by
+    texts: List[str] = []
+    texts.extend(s.get("refs", []) or [])
+    texts.extend(s.get("acceptance_criteria", []) or [])
+    for text in texts:
+        if not isinstance(text, str):
             continue
-        flow_nodes[nid] = n
-        nodes.append({"id": f"flow:node:{nid}", "type": "FLOW_NODE", "title": nid})
-        # analytics at node level
-        for ev in n.get("analytics", []) or []:
-            nodes.append({"id": f"analytics:event:{ev}", "type": "ANALYTICS", "title": ev})
-            edges.append({"from": f"flow:node:{nid}", "to": f"analytics:event:{ev}", "type": "emits"})
-        # refs PRD/CJM influence/maps_to
-        for ref in n.get("refs", []) or []:
-            if isinstance(ref, str) and ref.startswith("PRD:#"):
-                rid = ref.split("PRD:#", 1)[1]
-                edges.append({"from": f"prd:{rid}", "to": f"cjm:{rid}", "type": "influences"})  # will fix via CJM ref below
-            if isinstance(ref, str) and ref.startswith("CJM:#"):
-                cid = ref.split("CJM:#", 1)[1]
-                edges.append({"from": f"cjm:{cid}", "to": f"flow:node:{nid}", "type": "maps_to"})
-        # node outputs → DD used_in
-        for outk in n.get("outputs", []) or []:
-            if isinstance(outk, str):
-                nodes.append({"id": f"dd:{outk}", "type": "DD", "title": outk})
-                edges.append({"from": f"dd:{outk}", "to": f"flow:node:{nid}", "type": "used_in"})
-        # edges from node
-        for e in n.get("edges", []) or []:
-            eid = e.get("id") or f"{nid}->{e.get('target')}"
-            tgt = e.get("target")
-            nodes.append({"id": f"flow:edge:{nid}:{eid}", "type": "FLOW_EDGE", "title": eid,
-                          "data": {"from_node": nid, "to_node": tgt}})
-            if tgt:
-                edges.append({"from": f"flow:node:{nid}", "to": f"flow:node:{tgt}", "type": "maps_to"})
-            for ev in e.get("analytics", []) or []:
-                nodes.append({"id": f"analytics:event:{ev}", "type": "ANALYTICS", "title": ev})
-                edges.append({"from": f"flow:node:{nid}", "to": f"analytics:event:{ev}", "type": "emits"})
-
-    # PRD→CJM influences via co-occurrence in flow node refs
-    # Build co-occurrence map
-    for n in uf.get("user_flow", []) or []:
-        prds = [ref.split("PRD:#", 1)[1] for ref in (n.get("refs", []) or []) if isinstance(ref, str) and ref.startswith("PRD:#")]
-        cjms = [ref.split("CJM:#", 1)[1] for ref in (n.get("refs", []) or []) if isinstance(ref, str) and ref.startswith("CJM:#")]
-        for rid in prds:
-            for cid in cjms:
-                edges.append({"from": f"prd:{rid}", "to": f"cjm:{cid}", "type": "influences"})
+        tokens = [t for t in text.replace(";", " ").replace(",", " ").split() if t.startswith("FLOW:#")]
+        for t in tokens:
+            node = t.split("FLOW:#", 1)[1].strip().strip(")].")
+            if node:
+                g.edge(tag, f"flow:node:{node}", f"story:{sid}", "covered_by")
 
-    # User Stories
-    us_titles: Dict[str, str] = {}
-    for s in us.get("stories", []) or []:
-        sid = s.get("story_id")
-        if not sid:
-            continue
-        title = s.get("capability") or s.get("title") or sid
-        us_titles[sid] = title
-        nodes.append({"id": f"story:{sid}", "type": "STORY", "title": title})
-        # refs/AC FLOW:#node → covered_by
-        texts: List[str] = []
-        texts.extend(s.get("refs", []) or [])
-        texts.extend(s.get("acceptance_criteria", []) or [])
-        for text in texts:
-            if not isinstance(text, str):
-                continue
-            tokens = [t for t in text.replace(";", " ").replace(",", " ").split() if t.startswith("FLOW:#")]
-            for t in tokens:
-                node = t.split("FLOW:#", 1)[1].strip().strip(")].")
-                if node:
-                    edges.append({"from": f"flow:node:{node}", "to": f"story:{sid}", "type": "covered_by"})
 
+def _emit_hig(g: GraphBuilder, hs: dict, ctx: dict):
     # HIG candidates per story
-    for hs in hig.get("stories", []) or []:
-        sid = hs.get("story_id")
-        for c in hs.get("candidates", []) or []:
-            pid = c.get("pattern_id")
-            if not pid:
-                continue
-            hid = f"hig:{sid}:candidate:{pid}"
-            nodes.append({"id": hid, "type": "HIG", "title": c.get("title") or pid})
-            edges.append({"from": f"story:{sid}", "to": hid, "type": "selects"})
-
-    # UX principles and CtxUX screens mapping via local_principles
-    ux_ids: Set[str] = set(p.get("id") for p in ux.get("principles", []) or [])
-    for screen in ctx.get("screens", []) or []:
-        sid = screen.get("id")
-        if not sid:
+    sid = hs.get("story_id")
+    tag = f"hig:{sid}"
+    for c in hs.get("candidates", []) or []:
+        pid = c.get("pattern_id")
+        if not pid:
             continue
-        nodes.append({"id": f"ctxux:screen:{sid}", "type": "CTXUX", "title": screen.get("title") or sid})
-        for lp in screen.get("local_principles", []) or []:
-            for gp in lp.get("global_principle_ids", []) or []:
-                if gp in ux_ids:
-                    nodes.append({"id": f"ux:principle:{gp}", "type": "UX", "title": gp})
-                    edges.append({"from": f"ux:principle:{gp}", "to": f"ctxux:screen:{sid}", "type": "applies_to"})
-        # Map UserFlow refs to CTXUX screen
-        for fn in (screen.get("refs", {}).get("UserFlow", []) or []):
-            if fn in flow_nodes:
-                edges.append({"from": f"flow:node:{fn}", "to": f"ctxux:screen:{sid}", "type": "maps_to"})
-
-    write_json(OUT / "graph.json", {"nodes": nodes, "edges": edges})
-
-
-def main():
-    ensure_out()
-    lock = read_ids_lock()
+        hid = f"hig:{sid}:candidate:{pid}"
+        g.node(tag, hid, "HIG", c.get("title") or pid)
+        g.edge(tag, f"story:{sid}", hid, "selects")
+
 
-    # Assemble selected modules first
-    wrote = []
-    if write_prd_monolith(lock):
-        wrote.append("00_PRD_v1.json")
-    if write_cjm_monolith(lock):
-        wrote.append("01_CJM_v1.json")
-    uf_assembled = write_userflow_monolith(lock)
-    wrote.append("02_UserFlow_v1.json")
-    if write_ctxux_monolith(lock, uf_assembled):
-        wrote.append("06_Contextual_UX_Guidelines_v1.json")
-    if write_ux_principles_monolith(lock):
-        wrote.append("03_Global_UX_Principles_v1.json")
-    if write_userstories_monolith(uf_assembled):
-        wrote.append("04_UserStories_v1.json")
-    # Load assembled user stories for HIG validation
-    us_assembled = read_json(OUT / "04_UserStories_v1.json") if (OUT / "04_UserStories_v1.json").exists() else None
-    if write_hig_monolith(uf_assembled, us_assembled):
-        wrote.append("05_HIG_Pattern_selection_v1.json")
-
-    # Export consolidated graph for SpecHub diagrams
-    write_graph()
-
-    # Persist updated IDs lock
-    write_ids_lock(lock)
-
-    for line in summarize_status():
+# Assembler -> emitter for one of its entities; "ux" only feeds the ctxux emitter (ctx["ux_ids"])
+GRAPH_EMITTERS = {
+    "prd": _emit_prd,
+    "cjm": _emit_cjm,
+    "userflow": _emit_flow_node,
+    "userstories": _emit_story,
+    "hig": _emit_hig,
+    "ctxux": _emit_screen,
+}
+
+
+def write_graph(monoliths: Optional[Dict[str, object]] = None, builder: Optional[GraphBuilder] = None,
+                changed: Optional[Dict[str, Set]] = None, write: bool = True) -> dict:
+    """Export a consolidated graph to specs/_build/graph.json.
+
+    Node types: PRD, CJM, FLOW_NODE, FLOW_EDGE, STORY, HIG, UX, CTXUX, ANALYTICS, DD
+    Edges (type): influences, maps_to, covered_by, selects, applies_to, emits, used_in
+
+    Nodes are unique by id and edges by (from, to, type), both sorted; nodes carry the
+    "<assembler>:<entity id>" tags that produced them and edges a tag -> count map plus the total
+    "count" (see GraphBuilder). The same graph is also written to graph.bin (write_compact_graph).
+
+    monoliths maps assembler name -> assembled dict as returned by run_assembler;
+    only missing entries are read from specs/_build (standalone export).
+    builder is filled from scratch, or, when changed (assembler -> entity ids, see
+    changed_entities) is given, patched: each changed entity's contribution is dropped and
+    re-emitted from monoliths, so the work follows the size of the change.
+    write=False only builds and returns the graph.
+    """
+    def mono(name: str) -> dict:
+        doc = (monoliths or {}).get(name)
+        return doc if isinstance(doc, dict) else safe_read(OUT / ASSEMBLY_OUTPUTS[name])
+
+    docs = {name: mono(name) for name in ASSEMBLY_ORDER}
+    ctx = {
+        "flow_ids": {n.get("id") for n in graph_entities("userflow", docs["userflow"]) if n.get("id")},
+        "ux_ids": {p.get("id") for p in graph_entities("ux", docs["ux"])},
+    }
+    g = builder if builder is not None else GraphBuilder()
+    if changed is not None:
+        changed = {name: set(ids) for name, ids in changed.items()}
+        # Screens link to principles and flow nodes only if those exist: re-emit all of them
+        # when the principles change or flow nodes appear or disappear
+        flow_moved = any((eid in ctx["flow_ids"]) != (f"userflow:{eid}" in g.contrib) for eid in changed.get("userflow", ()))
+        if changed.get("ux") or flow_moved:
+            changed["ctxux"] = set(changed.get("ctxux", set())) | g.tags("ctxux") | \
+                {s.get("id") for s in graph_entities("ctxux", docs["ctxux"])}
+
+    for name, emit in GRAPH_EMITTERS.items():
+        items = graph_entities(name, docs[name])
+        if changed is not None:
+            ids = changed.get(name)
+            if not ids:
+                continue
+            for eid in ids:
+                g.drop(f"{name}:{eid}")
+            _, field = GRAPH_ENTITIES[name]
+            items = [item for item in items if item.get(field) in ids]
+        for item in items:
+            emit(g, item, ctx)
+
+    graph = g.graph()
+    if write:
+        write_json(OUT / "graph.json", graph)
+        write_compact_graph(graph, source=(OUT / "graph.json").read_bytes())
+    return graph
+
+
+def load_upstream(assembled: Dict[str, object], name: str):
+    # Freshly assembled monoliths are handed over in memory; skipped ones come from disk
+    result = assembled.get(name)
+    if isinstance(result, dict):
+        return result
+    path = OUT / ASSEMBLY_OUTPUTS[name]
+    return read_json(path) if path.exists() else None
+
+
+def run_assembler(name: str, lock: IdsLock, assembled: Dict[str, object], write: bool = True):
+    """Assemble one monolith and write it unless write is False; upstream monoliths are looked up in assembled."""
+    if name == "prd":
+        result = assemble_prd(lock)
+    elif name == "cjm":
+        result = assemble_cjm(lock)
+    elif name == "userflow":
+        result = assemble_userflow(lock)
+    elif name == "ctxux":
+        result = assemble_ctxux(lock, load_upstream(assembled, "userflow"))
+    elif name == "ux":
+        result = assemble_ux_principles(lock)
+    elif name == "userstories":
+        result = assemble_userstories(load_upstream(assembled, "userflow"))
+    elif name == "hig":
+        result = assemble_hig(load_upstream(assembled, "userflow"), load_upstream(assembled, "userstories"))
+    else:
+        raise ValueError(f"unknown assembler: {name}")
+    if write:
+        write_json(OUT / ASSEMBLY_OUTPUTS[name], result)
+    return result
+
+
+def upstream_closure(name: str) -> Set[str]:
+    out: Set[str] = set()
+    stack = list(ASSEMBLY_DEPS[name])
+    while stack:
+        dep = stack.pop()
+        if dep not in out:
+            out.add(dep)
+            stack.extend(ASSEMBLY_DEPS[dep])
+    return out
+
+
+def schedule_assemblers(names: Set[str], lock: IdsLock, assembled: Dict[str, object], jobs: int,
+                        write: bool = True):
+    """Run the selected assemblers over the dependency DAG in a thread pool.
+
+    Each task appends to a fork of the IDs lock that already contains its upstream appends;
+    the per-task journals are replayed in ASSEMBLY_ORDER afterwards, so IDs_LOCK.json
+    is byte-identical to a serial run.
+    """
+    pending = [n for n in ASSEMBLY_ORDER if n in names]
+    journals: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    def task(name: str, task_lock: IdsLock):
+        result = run_assembler(name, task_lock, assembled, write)
+        return result, task_lock.journal
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                if any(dep in names and dep not in journals for dep in ASSEMBLY_DEPS[name]):
+                    continue
+                upstream = upstream_closure(name)
+                task_lock = lock.fork(*(journals[dep] for dep in ASSEMBLY_ORDER if dep in upstream and dep in journals))
+                running[pool.submit(task, name, task_lock)] = name
+                pending.remove(name)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                assembled[name], journals[name] = fut.result()
+
+    for name in ASSEMBLY_ORDER:
+        if name in journals:
+            lock.replay(journals[name])
+
+
+def run_build(incremental: bool = False, jobs: int = 1, monoliths: Optional[Dict[str, object]] = None,
+              builder: Optional[GraphBuilder] = None, write: bool = True) -> dict:
+    """Assemble monoliths, export the graph and persist the IDs lock and manifest.
+
+    Returns {"dirty": [assembler names], "monoliths": {name: dict}, "graph": dict or None,
+    "builder": GraphBuilder or None}; graph is None when an incremental run found nothing to do.
+    monoliths and builder may carry warm state from a previous run (watch mode), used instead
+    of re-reading skipped monoliths and graph.json. Incremental runs patch the graph with the
+    entities that changed in the rebuilt monoliths instead of re-exporting it.
+    write=False assembles and builds the graph in memory only: no monolith, graph, IDs lock or
+    manifest is written, so the same changes are seen again by the next run (spechub impact).
+    """
+    if write:
+        ensure_out()
+    tool = tool_digest()
+    prev_manifest = read_manifest()
+    sources = scan_sources(prev_manifest)
+    if incremental:
+        dirty = changed_assemblers(prev_manifest, sources, tool)
+        if not dirty and (OUT / "graph.json").exists():
+            if write:
+                write_manifest(sources, tool)
+            return {"dirty": [], "monoliths": dict(monoliths or {}), "graph": None, "builder": builder}
+    else:
+        dirty = set(ASSEMBLY_ORDER)
+
+    lock = read_ids_lock()
+    assembled: Dict[str, object] = dict(monoliths or {})
+
+    # Graph to patch: the warm builder or the previous graph.json (None when it predates provenance tags)
+    if incremental and builder is None:
+        builder = GraphBuilder.from_graph(safe_read(OUT / "graph.json"))
+    previous: Dict[str, object] = {}
+    if incremental and builder is not None:
+        previous = {name: load_upstream(assembled, name) or {} for name in dirty}
+    elif not incremental:
+        builder = None
+
+    # Assemble modules; independent assemblers run concurrently
+    schedule_assemblers(dirty, lock, assembled, jobs, write)
+
+    # Monoliths skipped by an incremental run are loaded once from disk
+    for name in ASSEMBLY_ORDER:
+        if not isinstance(assembled.get(name), dict):
+            assembled[name] = load_upstream(assembled, name) or {}
+
+    # Export consolidated graph for SpecHub diagrams from the in-memory monoliths
+    if builder is not None:
+        graph = write_graph(assembled, builder, changed_entities(previous, assembled, dirty), write)
+    else:
+        builder = GraphBuilder()
+        graph = write_graph(assembled, builder, write=write)
+
+    if write:
+        # Persist updated IDs lock
+        write_ids_lock(lock)
+        write_manifest(sources, tool)
+    return {"dirty": [n for n in ASSEMBLY_ORDER if n in dirty], "monoliths": assembled, "graph": graph,
+            "builder": builder}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Assemble modular specs/** into specs/_build monoliths.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-run only assemblers whose sources changed since the last build (and their dependents)")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="number of assemblers run concurrently (default: %(default)s)")
+    parser.add_argument("--graph-only", action="store_true",
+                        help="re-export graph.json from the existing monoliths without assembling")
+    args = parser.parse_args(argv)
+
+    if args.graph_only:
+        ensure_out()
+        write_graph()
+        print("Exported: graph.json")
+        return
+
+    result = run_build(incremental=args.incremental, jobs=args.jobs)
+    if result["graph"] is None:
+        print("Up to date: no spec sources changed since the last build.")
+        return
+    if args.incremental:
+        dirty = result["dirty"]
+        print(f"Incremental build: re-assembled {', '.join(dirty)} ({len(dirty)}/{len(ASSEMBLY_ORDER)})")
+
+    for line in summarize_status(result["monoliths"]):
         print(line)
 
 
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Change impact between two revisions of the SpecHub graph.
+
+    from graph_impact import analyze
+    impact = analyze(old_graph, new_graph, old_monoliths, new_monoliths)
+    impact.affected   # node id -> hops from the nearest changed entity
+    impact.pages      # docs/ pages that render one of them
+
+Seeds are the nodes and edges that differ between the two graphs plus, when the monoliths are
+given, the entities whose assembled content changed without touching the graph (a reworded
+acceptance criterion, a new screen description). The change is then propagated forward along
+IMPACT_EDGE_TYPES across layers: flow node -> covered_by -> story -> selects -> HIG,
+flow node -> maps_to -> screen, principle -> applies_to -> screen, CJM -> maps_to -> flow node.
+Edges inside one layer (flow transitions) are not followed: a node does not change the nodes it leads to.
+`spechub.py impact` is the command-line front end.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import json
+
+from build import changed_entities
+from graph_query import GraphQuery
+
+IMPACT_EDGE_TYPES = ("covered_by", "maps_to", "applies_to", "selects")
+
+# Assembler -> node id template of its entities (build.GRAPH_ENTITIES); a template ending in ":"
+# is a prefix (a HIG entry covers every candidate node of its story)
+ENTITY_NODES = {
+    "prd": "prd:{}",
+    "cjm": "cjm:{}",
+    "userflow": "flow:node:{}",
+    "ctxux": "ctxux:screen:{}",
+    "ux": "ux:principle:{}",
+    "userstories": "story:{}",
+    "hig": "hig:{}:",
+}
+
+
+class GraphDiff(NamedTuple):
+    added_nodes: List[str]
+    removed_nodes: List[str]
+    changed_nodes: List[str]
+    added_edges: List[Tuple[str, str, str]]
+    removed_edges: List[Tuple[str, str, str]]
+
+    @property
+    def empty(self) -> bool:
+        return not any(self)
+
+
+class Impact(NamedTuple):
+    diff: GraphDiff
+    seeds: List[str]
+    affected: Dict[str, int]
+    pages: List[str]
+
+
+def diff_graphs(old: dict, new: dict) -> GraphDiff:
+    """Node (id, type, title, data) and edge (from, to, type) differences; counts and sources are ignored."""
+    def nodes(g):
+        return {n.get("id"): (n.get("type"), n.get("title"), json.dumps(n.get("data"), sort_keys=True))
+                for n in (g or {}).get("nodes", []) or []}
+
+    def edges(g):
+        return {(e.get("from"), e.get("to"), e.get("type")) for e in (g or {}).get("edges", []) or []}
+
+    a, b = nodes(old), nodes(new)
+    ea, eb = edges(old), edges(new)
+    return GraphDiff(
+        added_nodes=sorted(set(b) - set(a)),
+        removed_nodes=sorted(set(a) - set(b)),
+        changed_nodes=sorted(nid for nid in set(a) & set(b) if a[nid] != b[nid]),
+        added_edges=sorted(eb - ea),
+        removed_edges=sorted(ea - eb),
+    )
+
+
+def entity_changes(old_monoliths: Dict[str, dict], new_monoliths: Dict[str, dict]) -> Set[str]:
+    """Node ids (or id prefixes ending in ":") of entities added, removed or edited between two monolith sets."""
+    return {ENTITY_NODES[name].format(eid)
+            for name, ids in changed_entities(old_monoliths, new_monoliths).items() for eid in ids}
+
+
+def _slug(s: str) -> str:
+    # Same as docs/generate_docs.py:slugify
+    return s.strip().lower().replace(" ", "-").replace("/", "-").replace(":", "-")
+
+
+def docs_pages(nid: str) -> List[str]:
+    """docs/-relative pages that render node nid (analytics and DD nodes have none of their own)."""
+    parts = nid.split(":")
+    prefix = parts[0]
+    if prefix in ("prd", "cjm") and len(parts) > 1:
+        return [f"{prefix}/{_slug(nid.split(':', 1)[1])}.md"]
+    if prefix == "flow" and len(parts) > 2:
+        # flow:node:<id> and flow:edge:<node>:<edge> both live on the node page
+        return [f"flow/nodes/{_slug(parts[2])}.md"]
+    if prefix == "story" and len(parts) > 1:
+        sid = _slug(nid.split(":", 1)[1])
+        return [f"stories/{sid}.md", f"hig/{sid}.md"]
+    if prefix == "hig" and len(parts) > 1:
+        return [f"hig/{_slug(parts[1])}.md"]
+    if prefix == "ctxux" and len(parts) > 2:
+        return [f"ctxux/{_slug(nid.split(':', 2)[2])}.md"]
+    if prefix == "ux" and len(parts) > 2:
+        return [f"ux/{_slug(nid.split(':', 2)[2])}.md"]
+    return []
+
+
+def propagate(queries: Iterable[GraphQuery], seeds: Iterable[str], edge_types: Iterable[str] = IMPACT_EDGE_TYPES,
+              max_depth: Optional[int] = None) -> Dict[str, int]:
+    """BFS from seeds over outgoing edge_types edges of every graph in queries, skipping same-layer edges."""
+    queries = list(queries)
+    edge_types = list(edge_types)
+    depth: Dict[str, int] = {}
+    queue: deque = deque()
+    for nid in sorted(set(seeds)):
+        depth[nid] = 0
+        queue.append(nid)
+    while queue:
+        nid = queue.popleft()
+        d = depth[nid]
+        if max_depth is not None and d >= max_depth:
+            continue
+        layer = nid.split(":", 1)[0]
+        for q in queries:
+            for nxt in q.neighbors(nid, "out", edge_types):
+                if nxt not in depth and nxt.split(":", 1)[0] != layer:
+                    depth[nxt] = d + 1
+                    queue.append(nxt)
+    return depth
+
+
+def analyze(old_graph: dict, new_graph: dict, old_monoliths: Optional[Dict[str, dict]] = None,
+            new_monoliths: Optional[Dict[str, dict]] = None, edge_types: Iterable[str] = IMPACT_EDGE_TYPES,
+            max_depth: Optional[int] = None) -> Impact:
+    """Diff two graph snapshots (and optionally their monoliths) and collect everything the change reaches."""
+    diff = diff_graphs(old_graph, new_graph)
+    old_q, new_q = GraphQuery(old_graph or {}), GraphQuery(new_graph or {})
+    seeds: Set[str] = set(diff.added_nodes) | set(diff.removed_nodes) | set(diff.changed_nodes)
+    for f, t, _ in diff.added_edges + diff.removed_edges:
+        seeds.update((f, t))
+    if old_monoliths is not None and new_monoliths is not None:
+        for ref in entity_changes(old_monoliths, new_monoliths):
+            if ref.endswith(":"):
+                seeds.update(nid for q in (old_q, new_q) for nid in q.ids if nid.startswith(ref))
+            else:
+                seeds.add(ref)
+    affected = propagate((old_q, new_q), seeds, edge_types, max_depth)
+    pages = sorted({page for nid in affected for page in docs_pages(nid)})
+    return Impact(diff=diff, seeds=sorted(seeds), affected=affected, pages=pages)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Queries over the SpecHub graph exported by build.py (specs/_build/graph.json).
+
+    from graph_query import GraphQuery
+    q = GraphQuery.load()
+    q.neighbors("flow:node:export-decision", direction="out", edge_types=["covered_by"])
+    q.reach("prd:4_2", edge_types=["influences", "maps_to"])
+    q.path("story:us-10", "ctxux:screen:export-decision")
+
+Node ids are interned to integers once; every lookup walks per-node adjacency lists instead of
+scanning the edge list, so neighbours are O(degree) and traversals O(visited nodes + edges).
+`spechub.py query` is the command-line front end.
+"""
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+
+GRAPH_PATH = Path(__file__).resolve().parent / "graph.json"
+
+DIRECTIONS = ("out", "in", "both")
+
+
+class GraphQuery:
+    """Indexed view of a graph.json dict: neighbours, typed BFS and shortest paths."""
+
+    def __init__(self, graph: dict):
+        self.nodes: Dict[str, dict] = {n["id"]: n for n in graph.get("nodes", []) or [] if n.get("id")}
+        self.ids: List[str] = list(self.nodes)
+        self.pos: Dict[str, int] = {nid: i for i, nid in enumerate(self.ids)}
+        self.edge_types: List[str] = []
+        type_code: Dict[str, int] = {}
+        # adjacency per direction: node index -> [(neighbour index, edge type code)]
+        self.out_adj: List[List[Tuple[int, int]]] = [[] for _ in self.ids]
+        self.in_adj: List[List[Tuple[int, int]]] = [[] for _ in self.ids]
+        for e in graph.get("edges", []) or []:
+            f = self._intern(e.get("from")); t = self._intern(e.get("to"))
+            if f is None or t is None:
+                continue
+            etype = e.get("type") or ""
+            code = type_code.get(etype)
+            if code is None:
+                code = type_code[etype] = len(self.edge_types)
+                self.edge_types.append(etype)
+            self.out_adj[f].append((t, code))
+            self.in_adj[t].append((f, code))
+        self._type_code = type_code
+
+    @classmethod
+    def load(cls, path: Path = GRAPH_PATH) -> "GraphQuery":
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def _intern(self, nid: Optional[str]) -> Optional[int]:
+        # Edge end points without a node entry (dangling refs) still take part in traversals
+        if not nid:
+            return None
+        i = self.pos.get(nid)
+        if i is None:
+            i = self.pos[nid] = len(self.ids)
+            self.ids.append(nid)
+            self.out_adj.append([])
+            self.in_adj.append([])
+        return i
+
+    # -------------------- Lookups --------------------
+
+    def resolve(self, ref: str) -> str:
+        """Full node id for ref: an exact id, or a unique id ending in ":<ref>" (e.g. "us-10", "screen:gallery")."""
+        if ref in self.pos:
+            return ref
+        hits = [nid for nid in self.ids if nid.endswith(":" + ref)]
+        if len(hits) == 1:
+            return hits[0]
+        if not hits:
+            raise KeyError(f"unknown node: {ref}")
+        raise KeyError(f"ambiguous node {ref!r}: {', '.join(sorted(hits)[:5])}{' …' if len(hits) > 5 else ''}")
+
+    def node(self, nid: str) -> Optional[dict]:
+        return self.nodes.get(nid)
+
+    def _codes(self, edge_types: Optional[Iterable[str]]) -> Optional[set]:
+        if edge_types is None:
+            return None
+        return {self._type_code[t] for t in edge_types if t in self._type_code}
+
+    def _steps(self, i: int, direction: str, codes: Optional[set]):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)} (got {direction!r})")
+        sides = (self.out_adj, self.in_adj) if direction == "both" else (self.out_adj if direction == "out" else self.in_adj,)
+        for side in sides:
+            for j, code in side[i]:
+                if codes is None or code in codes:
+                    yield j, code
+
+    def neighbors(self, nid: str, direction: str = "both", edge_types: Optional[Iterable[str]] = None,
+                  prefix: str = "") -> List[str]:
+        """Sorted ids one edge away from nid, optionally limited to edge types and an id prefix."""
+        i = self.pos.get(nid)
+        if i is None:
+            return []
+        found = {self.ids[j] for j, _ in self._steps(i, direction, self._codes(edge_types))}
+        return sorted(n for n in found if n.startswith(prefix))
+
+    def edges(self, nid: str, direction: str = "both") -> List[Tuple[str, str, str]]:
+        """(from, type, to) of the edges touching nid."""
+        i = self.pos.get(nid)
+        if i is None:
+            return []
+        out: List[Tuple[str, str, str]] = []
+        if direction in ("out", "both"):
+            out.extend((nid, self.edge_types[c], self.ids[j]) for j, c in self.out_adj[i])
+        if direction in ("in", "both"):
+            out.extend((self.ids[j], self.edge_types[c], nid) for j, c in self.in_adj[i])
+        return sorted(set(out))
+
+    # -------------------- Traversal --------------------
+
+    def reach(self, nid: str, direction: str = "out", edge_types: Optional[Iterable[str]] = None,
+              max_depth: Optional[int] = None, prefix: str = "") -> Dict[str, int]:
+        """Nodes reachable from nid (BFS over the given edge types) -> hop distance; nid itself is excluded."""
+        start = self.pos.get(nid)
+        if start is None:
+            return {}
+        codes = self._codes(edge_types)
+        depth = {start: 0}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            d = depth[i]
+            if max_depth is not None and d >= max_depth:
+                continue
+            for j, _ in self._steps(i, direction, codes):
+                if j not in depth:
+                    depth[j] = d + 1
+                    queue.append(j)
+        return {self.ids[i]: d for i, d in sorted(depth.items(), key=lambda kv: (kv[1], self.ids[kv[0]]))
+                if i != start and self.ids[i].startswith(prefix)}
+
+    def path(self, src: str, dst: str, direction: str = "both",
+             edge_types: Optional[Iterable[str]] = None) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """Shortest path src -> dst as [(node id, edge type used to reach it)], or None when unreachable.
+
+        Bidirectional BFS: both frontiers grow one level at a time, smaller side first.
+        """
+        s = self.pos.get(src); t = self.pos.get(dst)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return [(src, None)]
+        codes = self._codes(edge_types)
+        back = {"out": "in", "in": "out", "both": "both"}[direction] if direction in DIRECTIONS else direction
+        # parent maps: node -> (previous node towards the frontier's root, edge type code)
+        fwd: Dict[int, Tuple[int, int]] = {s: (-1, -1)}
+        bwd: Dict[int, Tuple[int, int]] = {t: (-1, -1)}
+        fwd_front, bwd_front = [s], [t]
+        meet = None
+        while fwd_front and bwd_front and meet is None:
+            grow_fwd = len(fwd_front) <= len(bwd_front)
+            front, seen, other, way = (fwd_front, fwd, bwd, direction) if grow_fwd else (bwd_front, bwd, fwd, back)
+            nxt: List[int] = []
+            for i in front:
+                for j, code in self._steps(i, way, codes):
+                    if j in seen:
+                        continue
+                    seen[j] = (i, code)
+                    if j in other:
+                        meet = j
+                        break
+                    nxt.append(j)
+                if meet is not None:
+                    break
+            if grow_fwd:
+                fwd_front = nxt
+            else:
+                bwd_front = nxt
+        if meet is None:
+            return None
+        head: List[Tuple[str, Optional[str]]] = []
+        i = meet
+        while i != -1:
+            prev, code = fwd[i]
+            head.append((self.ids[i], self.edge_types[code] if code >= 0 else None))
+            i = prev
+        head.reverse()
+        i, (prev, code) = meet, bwd[meet]
+        while prev != -1:
+            head.append((self.ids[prev], self.edge_types[code]))
+            i = prev
+            prev, code = bwd[i]
+        return head
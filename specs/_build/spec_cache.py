@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Process-wide cache of parsed spec sources, shared by build.py and trace_validator.py.
+
+    from spec_cache import SPEC_CACHE, EVENTS_REGISTRY_PATH
+    reg = SPEC_CACHE.load(EVENTS_REGISTRY_PATH)  # read-only view, parsed once per (size, mtime)
+
+Kept apart from build.py so the validator does not have to import the builder.
+"""
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Tuple
+import json
+import threading
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Shared registries read by several assemblers and by the validator
+EVENTS_REGISTRY_PATH = ROOT / "02_userflow" / "analytics" / "events.json"
+DATA_DICTIONARY_PATH = ROOT / "02_userflow" / "data_dictionary.json"
+
+
+def freeze(obj):
+    """Return a read-only view of parsed JSON (mappings become proxies, lists become tuples)."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+class SpecCache:
+    """Cache of parsed spec sources.
+
+    Each file is parsed at most once per (size, mtime) and handed out as an immutable view,
+    so assemblers running in parallel (and the validator in the same process) share it safely.
+    Values derived from a view (e.g. build.registry_events) are memoized next to its entry and
+    dropped together with it when the file changes.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[Tuple[int, int], object, Dict[str, object]]] = {}
+        self._mutex = threading.Lock()
+
+    def load(self, path: Path):
+        st = path.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._mutex:
+            hit = self._entries.get(path)
+            if hit is not None and hit[0] == stamp:
+                return hit[1]
+            view = freeze(json.loads(path.read_text(encoding="utf-8")))
+            self._entries[path] = (stamp, view, {})
+            return view
+
+    def derived(self, path: Path, key: str, fn):
+        """fn(view) for the current view of path, computed once per cache entry.
+
+        A failing fn (validation error) is not memoized, so it raises again on the next call.
+        """
+        view = self.load(path)
+        with self._mutex:
+            hit = self._entries.get(path)
+            memo = hit[2] if hit is not None and hit[1] is view else None
+            if memo is not None and key in memo:
+                return memo[key]
+        value = fn(view)
+        if memo is not None:
+            with self._mutex:
+                memo.setdefault(key, value)
+        return value
+
+    def clear(self):
+        with self._mutex:
+            self._entries.clear()
+
+
+SPEC_CACHE = SpecCache()
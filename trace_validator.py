@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
+import argparse
+import cProfile
 import json
+import re
 import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, Set, Dict, List
+from typing import Any, FrozenSet, Iterable, NamedTuple, Optional, Tuple, Set, Dict, List
 
 ROOT = Path(__file__).parent
 BUILD = ROOT / "specs" / "_build"
@@ -15,6 +22,10 @@ HIG_PATH = BUILD / "05_HIG_Pattern_selection_v1.json"
 CTX_UX_PATH = BUILD / "06_Contextual_UX_Guidelines_v1.json"
 ANALYTICS_SCHEMA_PATH = ROOT / "analytics_schema.json"
 
+# Registry files are parsed through the process-wide spec cache (shared with build.py in one process)
+sys.path.insert(0, str(BUILD))
+from spec_cache import EVENTS_REGISTRY_PATH, SPEC_CACHE  # noqa: E402
+
 
 def load_json(p: Path):
     if not p.exists():
@@ -23,6 +34,33 @@ def load_json(p: Path):
         return json.load(f)
 
 
+class Issue(NamedTuple):
+    kind: str  # rule id; "warn-*" kinds are warnings, everything else is fatal
+    detail: str
+    ptr: Optional[str] = None  # monolith pointer, e.g. 02_UserFlow_v1.json#/user_flow/3/edges/0
+
+
+def severity(kind: str) -> str:
+    return "warning" if str(kind).startswith("warn-") else "error"
+
+
+def json_pointer(*parts) -> str:
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+def mptr(path: Path, *parts) -> str:
+    """Pointer into a build monolith: <file name>#<JSON pointer>."""
+    return f"{path.name}#{json_pointer(*parts)}"
+
+
+def dotted_ptr(path: Path, dotted: str) -> str:
+    """mptr() for report paths like user_flow[3].edges[0].id (a leading $/ux/ctxux alias is dropped)."""
+    parts = re.findall(r"[^.\[\]]+", dotted)
+    if parts and parts[0] in ("$", "ux", "ctxux"):
+        parts = parts[1:]
+    return mptr(path, *parts)
+
+
 def gather_cjm_stage_ids(cjm_doc: dict) -> set[str]:
     ids = set()
     for item in cjm_doc.get("cjm", []):
@@ -31,43 +69,321 @@ def gather_cjm_stage_ids(cjm_doc: dict) -> set[str]:
     return ids
 
 
-def has_cjm_ref(refs: list) -> bool:
-    return any(isinstance(r, str) and r.startswith("CJM:#") for r in refs or [])
+class Loc(NamedTuple):
+    """A place in the UserFlow monolith: a node, an edge or an analytics event."""
+    kind: str  # node | edge | analytics
+    node: Any  # node id (event name for analytics)
+    edge: Any = None
+    ptr: str = ""  # monolith pointer of the node/edge/event
+
+    def label(self) -> str:
+        """Coverage-map label, e.g. node:app-launch or edge:app-launch:e-start."""
+        if self.kind == "analytics":
+            return f"analytics:{self.node}"
+        nid = "<unknown>" if self.node is None else self.node
+        if self.kind == "edge":
+            eid = "<unknown>" if self.edge is None else self.edge
+            return f"edge:{nid}:{eid}"
+        return f"{self.kind}:{nid}"
+
+    def key(self) -> str:
+        """Issue detail prefix: node id, or node:edge for edges."""
+        return f"{self.node}:{self.edge}" if self.kind == "edge" else f"{self.node}"
 
 
-def has_prd_ref(refs: list) -> bool:
-    return any(isinstance(r, str) and r.startswith("PRD:#") for r in refs or [])
+class Ref(NamedTuple):
+    loc: Loc
+    kind: str  # prd | cjm | input | output | guard | event | param
+    target: Any
+
+
+class RefIndex:
+    """Typed references of a UserFlow monolith, collected in a single document-order walk.
+
+    Rules query the index instead of re-walking user_flow nodes/edges: refs(kind) returns
+    references in document order, sites lists every node/edge with the ref kinds it carries.
+    """
+
+    def __init__(self, userflow_doc: dict):
+        self.all: List[Ref] = []
+        self.sites: List[Tuple[Loc, Set[str]]] = []
+        self.node_ids: Set[str] = set()
+        self.edge_ids: Set[str] = set()
+        self.node_ptrs: Dict[str, str] = {}
+        self._by_kind: Dict[str, List[Ref]] = defaultdict(list)
+
+        for i, node in enumerate(userflow_doc.get("user_flow", []) or []):
+            if not isinstance(node, dict):
+                continue
+            nid = node.get("id")
+            loc = Loc("node", nid, None, mptr(UF_PATH, "user_flow", i))
+            if nid:
+                self.node_ids.add(nid)
+                self.node_ptrs.setdefault(nid, loc.ptr)
+            self._visit_refs(loc, node.get("refs"))
+            for name in node.get("inputs") or []:
+                self._add(loc, "input", name)
+            for name in node.get("outputs") or []:
+                self._add(loc, "output", name)
+            for ev in node.get("analytics") or []:
+                if isinstance(ev, str):
+                    self._add(loc, "event", ev)
+            for j, edge in enumerate(node.get("edges", []) or []):
+                if not isinstance(edge, dict):
+                    continue
+                eid = edge.get("id")
+                if eid:
+                    self.edge_ids.add(eid)
+                eloc = Loc("edge", nid, eid, f"{loc.ptr}/edges/{j}")
+                self._visit_refs(eloc, edge.get("refs"))
+                if edge.get("guard"):
+                    self._add(eloc, "guard", edge["guard"])
+                for ev in edge.get("analytics") or []:
+                    if isinstance(ev, str):
+                        self._add(eloc, "event", ev)
+
+        for k, ev in enumerate(userflow_doc.get("analytics_events", []) or []):
+            if not isinstance(ev, dict):
+                continue
+            loc = Loc("analytics", ev.get("event"), None, mptr(UF_PATH, "analytics_events", k))
+            kr = ev.get("kpi_ref")
+            if isinstance(kr, str) and kr.startswith("PRD:#"):
+                self._add(loc, "prd", kr.split("#", 1)[1])
+            for p in ev.get("params", []) or []:
+                if isinstance(p, dict) and isinstance(p.get("name"), str):
+                    self._add(loc, "param", p["name"])
+
+    def _add(self, loc: Loc, kind: str, target) -> None:
+        ref = Ref(loc, kind, target)
+        self.all.append(ref)
+        self._by_kind[kind].append(ref)
+
+    def _visit_refs(self, loc: Loc, refs) -> None:
+        kinds: Set[str] = set()
+        for r in refs or []:
+            if isinstance(r, str) and r.startswith("PRD:#"):
+                self._add(loc, "prd", r.split("#", 1)[1])
+                kinds.add("prd")
+            elif isinstance(r, str) and r.startswith("CJM:#"):
+                self._add(loc, "cjm", r.split("#", 1)[1])
+                kinds.add("cjm")
+        self.sites.append((loc, kinds))
 
+    def refs(self, *kinds: str) -> List[Ref]:
+        if len(kinds) == 1:
+            return self._by_kind.get(kinds[0], [])
+        return [r for r in self.all if r.kind in kinds]
 
-def check_userflow_refs(userflow_doc: dict):
+    def targets(self, *kinds: str) -> Set:
+        return {r.target for r in self.refs(*kinds)}
+
+
+# ------------------------
+# Guard expressions: tokenizer, parser to AST, memoized compile
+# ------------------------
+
+# AST nodes are tuples: ("num", v) | ("str", v) | ("const", v) | ("name", ident) | ("call", fname, [args])
+#                       | ("unary", op, operand) | ("binary", op, left, right)
+GUARD_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<num>\d+(?:\.\d+)?)
+    | (?P<str>"[^"]*"|'[^']*')
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<op>==|!=|<=|>=|&&|\|\||[^\sA-Za-z0-9_"'])
+    )""", re.VERBOSE)
+GUARD_KEYWORDS = {"and": "and", "or": "or", "not": "not"}
+GUARD_COMPARISONS = {"==", "!=", "<", ">", "<=", ">="}
+GUARD_ALLOWED_OPERATORS = GUARD_COMPARISONS | {"and", "or", "not", "!"}
+GUARD_FUNCTIONS = {"len"}
+GUARD_CONSTANTS = {"true", "false", "today"}
+# Binary operator precedence; anything else found in binary position binds tightest
+GUARD_PRECEDENCE = {"or": 1, "||": 1, "and": 2, "&&": 2, **{op: 3 for op in GUARD_COMPARISONS}}
+
+
+class GuardSyntaxError(ValueError):
+    pass
+
+
+class Guard(NamedTuple):
+    ast: Any
+    identifiers: Tuple[str, ...]  # bare names in document order (function names excluded)
+    operators: FrozenSet[str]
+    error: Optional[str]  # set when the expression is malformed; ast is None then
+
+
+def tokenize_guard(expr: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos, end = 0, len(expr.rstrip())
+    while pos < end:
+        m = GUARD_TOKEN.match(expr, pos)
+        if not m:
+            if expr[pos:].lstrip()[:1] in ('"', "'"):
+                raise GuardSyntaxError("unterminated string")
+            raise GuardSyntaxError(f"unexpected character at {pos}")
+        kind = m.lastgroup
+        text = m.group(kind)
+        if kind == "name" and text in GUARD_KEYWORDS:
+            kind = "op"
+        tokens.append((kind, text))
+        pos = m.end()
+    return tokens
+
+
+class _GuardParser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+        self.operators: Set[str] = set()
+
+    def peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self) -> Tuple[Optional[str], Optional[str]]:
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def expect(self, text: str) -> None:
+        kind, got = self.take()
+        if got != text:
+            raise GuardSyntaxError(f"expected '{text}', got {repr(got) if got else 'end of expression'}")
+
+    def parse(self):
+        if not self.tokens:
+            raise GuardSyntaxError("empty expression")
+        node = self.binary(1)
+        if self.pos < len(self.tokens):
+            raise GuardSyntaxError(f"unexpected '{self.peek()[1]}'")
+        return node
+
+    def binary(self, min_prec: int):
+        left = self.unary()
+        while True:
+            kind, op = self.peek()
+            if kind != "op" or op in ("(", ")", ","):
+                return left
+            prec = GUARD_PRECEDENCE.get(op, 4)
+            if op in ("!", "not") or prec < min_prec:
+                return left
+            self.take()
+            self.operators.add(op)
+            left = ("binary", op, left, self.binary(prec + 1))
+
+    def unary(self):
+        kind, text = self.take()
+        if kind is None:
+            raise GuardSyntaxError("unexpected end of expression")
+        if kind == "num":
+            return ("num", text)
+        if kind == "str":
+            return ("str", text[1:-1])
+        if kind == "name":
+            if self.peek()[1] == "(":
+                if text not in GUARD_FUNCTIONS:
+                    raise GuardSyntaxError(f"unknown function '{text}'")
+                self.take()
+                args = []
+                if self.peek()[1] != ")":
+                    args.append(self.binary(1))
+                    while self.peek()[1] == ",":
+                        self.take()
+                        args.append(self.binary(1))
+                self.expect(")")
+                return ("call", text, args)
+            return ("const", text) if text in GUARD_CONSTANTS else ("name", text)
+        if text == "(":
+            node = self.binary(1)
+            self.expect(")")
+            return node
+        if text in (")", ",") or text in GUARD_PRECEDENCE:
+            raise GuardSyntaxError(f"unexpected '{text}'")
+        # prefix operator: ! / not are allowed, anything else is reported as an invalid operator
+        self.operators.add(text)
+        return ("unary", text, self.unary())
+
+
+def guard_names(node) -> List[str]:
+    """Bare identifiers of a guard AST in document order."""
+    tag = node[0]
+    if tag == "name":
+        return [node[1]]
+    if tag == "call":
+        return [n for arg in node[2] for n in guard_names(arg)]
+    if tag == "unary":
+        return guard_names(node[2])
+    if tag == "binary":
+        return guard_names(node[2]) + guard_names(node[3])
+    return []
+
+
+def guard_comparisons(node) -> List[Tuple[Any, Any]]:
+    """(left, right) operand pairs of every comparison in a guard AST."""
+    tag = node[0]
+    if tag == "binary":
+        pairs = [(node[2], node[3])] if node[1] in GUARD_COMPARISONS else []
+        return pairs + guard_comparisons(node[2]) + guard_comparisons(node[3])
+    if tag == "unary":
+        return guard_comparisons(node[2])
+    if tag == "call":
+        return [p for arg in node[2] for p in guard_comparisons(arg)]
+    return []
+
+
+@lru_cache(maxsize=None)
+def compile_guard(expr: str) -> Guard:
+    """Tokenize and parse a guard expression once; later calls with the same string hit the memo."""
+    try:
+        parser = _GuardParser(tokenize_guard(expr))
+        ast = parser.parse()
+    except GuardSyntaxError as e:
+        return Guard(None, (), frozenset(), str(e))
+    return Guard(ast, tuple(dict.fromkeys(guard_names(ast))), frozenset(parser.operators), None)
+
+
+def classify_guard_names(guard: Guard, dd: Set[str], literals: Set[str]) -> Tuple[List[str], List[str]]:
+    """Split unresolved guard names into (unquoted literals, unknown variables).
+
+    A name is a literal when it is a known enum/symbolic literal; an unresolved name compared
+    against a data-dictionary identifier is an unquoted string literal, any other one is a
+    variable missing from the data dictionary.
+    """
+    unresolved = [n for n in guard.identifiers if n not in dd and n not in literals]
+    if not unresolved:
+        return [], []
+    compared: Set[str] = set()
+    for left, right in guard_comparisons(guard.ast):
+        for this, other in ((left, right), (right, left)):
+            if this[0] == "name" and other[0] == "name" and other[1] in dd:
+                compared.add(this[1])
+    unquoted = [n for n in unresolved if n in compared]
+    return unquoted, [n for n in unresolved if n not in compared]
+
+
+def check_userflow_refs(index: RefIndex):
     problems = []
-    nodes = userflow_doc.get("user_flow", [])
-    for node in nodes:
-        nid = node.get("id")
-        nrefs = node.get("refs", [])
-        if not has_prd_ref(nrefs):
-            problems.append(("node-missing-prd-ref", nid))
-        if not has_cjm_ref(nrefs):
-            problems.append(("node-missing-cjm-ref", nid))
-        for edge in node.get("edges", []) or []:
-            eid = edge.get("id")
-            erefs = edge.get("refs", [])
-            if not has_prd_ref(erefs):
-                problems.append(("edge-missing-prd-ref", f"{nid}:{eid}"))
+    for loc, kinds in index.sites:
+        if loc.kind == "node":
+            if "prd" not in kinds:
+                problems.append(Issue("node-missing-prd-ref", loc.node, loc.ptr))
+            if "cjm" not in kinds:
+                problems.append(Issue("node-missing-cjm-ref", loc.node, loc.ptr))
+        else:
+            if "prd" not in kinds:
+                problems.append(Issue("edge-missing-prd-ref", loc.key(), loc.ptr))
             # Edges may sometimes not map to a CJM stage directly; warn rather than error
-            if not has_cjm_ref(erefs):
-                problems.append(("edge-missing-cjm-ref", f"{nid}:{eid}"))
+            if "cjm" not in kinds:
+                problems.append(Issue("edge-missing-cjm-ref", loc.key(), loc.ptr))
     return problems
 
 
 def check_analytics_events(userflow_doc: dict):
     problems = []
-    for ev in userflow_doc.get("analytics_events", []) or []:
+    for k, ev in enumerate(userflow_doc.get("analytics_events", []) or []):
         name = ev.get("event")
         if not ev.get("owner"):
-            problems.append(("analytics-missing-owner", name))
+            problems.append(Issue("analytics-missing-owner", name, mptr(UF_PATH, "analytics_events", k)))
         if not ev.get("kpi_ref"):
-            problems.append(("analytics-missing-kpi_ref", name))
+            problems.append(Issue("analytics-missing-kpi_ref", name, mptr(UF_PATH, "analytics_events", k)))
     return problems
 
 
@@ -98,79 +414,61 @@ def build_enum_literals(userflow_doc: dict) -> set[str]:
     literals.update({"true","false","today","granted","denied","pdf_a_2u"})
     return literals
 
-def check_io_against_dd(userflow_doc: dict):
+def check_io_against_dd(userflow_doc: dict, index: RefIndex):
     problems = []
-    dd, coverage = build_dd_maps(userflow_doc)
-    enum_literals = build_enum_literals(userflow_doc)
-    def check_list(lst, kind, nid):
-        for name in lst or []:
-            if name not in dd:
-                # Unknown entirely → always fatal
-                problems.append((f"{kind}-not-in-data-dictionary", f"{nid}:{name}"))
-    for node in userflow_doc.get("user_flow", []) or []:
-        nid = node.get("id")
-        check_list(node.get("inputs"), "input", nid)
-        check_list(node.get("outputs"), "output", nid)
-        for edge in node.get("edges", []) or []:
-            # naive guard var extraction: split by non-alnum/underscore and check tokens against dd
-            guard = edge.get("guard")
-            if guard:
-                import re
-                # enforce allowed operators only
-                if not re.fullmatch(r"[A-Za-z0-9_\s\(\)\"'<>!=]+", guard or ""):
-                    problems.append(("guard-invalid-operator", f"{nid}:{edge.get('id')}:{guard}"))
-                tokens = [t for t in re.split(r"[^A-Za-z0-9_]+", guard) if t]
-                # classify
-                blacklist = {"len", "true", "false", "today"}
-                for t in tokens:
-                    if t.isdigit() or t in blacklist or t in enum_literals:
-                        continue
-                    # if token matches an identifier in dd, it's okay
-                    if t in dd:
-                        continue
-                    # token might be an unquoted string literal → error
-                    problems.append(("guard-unquoted-literal", f"{nid}:{edge.get('id')}:{t}"))
+    dd, _ = build_dd_maps(userflow_doc)
+    for ref in index.refs("input", "output"):
+        if ref.target not in dd:
+            # Unknown entirely → always fatal
+            problems.append(Issue(f"{ref.kind}-not-in-data-dictionary", f"{ref.loc.node}:{ref.target}",
+                                  f"{ref.loc.ptr}/{ref.kind}s"))
     return problems
 
 
-def check_cjm_coverage(userflow_doc: dict, cjm_ids: set[str]):
+def check_guards(userflow_doc: dict, index: RefIndex) -> Tuple[List[Issue], List[Tuple[Ref, Guard]]]:
+    """Guard syntax, operators and names against the data dictionary; also returns the compiled guards."""
+    problems = []
+    dd, _ = build_dd_maps(userflow_doc)
+    enum_literals = build_enum_literals(userflow_doc)
+    guards: List[Tuple[Ref, Guard]] = []
+    for ref in index.refs("guard"):
+        key, ptr = f"{ref.loc.key()}:{ref.target}", f"{ref.loc.ptr}/guard"
+        if not isinstance(ref.target, str):
+            problems.append(Issue("guard-malformed", f"{key}: not a string", ptr))
+            continue
+        guard = compile_guard(ref.target)
+        guards.append((ref, guard))
+        if guard.error:
+            problems.append(Issue("guard-malformed", f"{key}: {guard.error}", ptr))
+            continue
+        # enforce allowed operators only
+        if guard.operators - GUARD_ALLOWED_OPERATORS:
+            problems.append(Issue("guard-invalid-operator", key, ptr))
+        # a bare word compared against a data dictionary field → unquoted string literal;
+        # any other unknown name must be a data dictionary variable
+        unquoted, unknown = classify_guard_names(guard, dd, enum_literals)
+        for name in unquoted:
+            problems.append(Issue("guard-unquoted-literal", f"{ref.loc.key()}:{name}", ptr))
+        for ident in unknown:
+            problems.append(Issue("guard-var-not-in-data-dictionary", f"{ref.loc.key()}:{ident}", ptr))
+    return problems, guards
+
+
+def check_cjm_coverage(index: RefIndex, cjm_ids: set[str]):
     # Ensure each core in-app CJM stage has at least one mention in refs anywhere
-    refs_all = []
-    for node in userflow_doc.get("user_flow", []) or []:
-        refs_all.extend(node.get("refs", []) or [])
-        for edge in node.get("edges", []) or []:
-            refs_all.extend(edge.get("refs", []) or [])
-    present = {r.split("#",1)[1] for r in refs_all if isinstance(r, str) and r.startswith("CJM:#")}
+    present = index.targets("cjm")
     missing = sorted(list((cjm_ids - present)))
     return missing
 
-def cjm_coverage_map(userflow_doc: dict, cjm_ids: set[str]) -> dict[str, list[str]]:
+def cjm_coverage_map(index: RefIndex, cjm_ids: set[str]) -> dict[str, list[str]]:
     """Return mapping CJM stage -> list of UserFlow nodes/edges referencing it."""
     cov: dict[str, list[str]] = {cid: [] for cid in cjm_ids}
-    for node in userflow_doc.get("user_flow", []) or []:
-        nid = node.get("id", "<unknown>")
-        for r in node.get("refs", []) or []:
-            if isinstance(r, str) and r.startswith("CJM:#"):
-                stage = r.split("#", 1)[1]
-                if stage in cov:
-                    cov[stage].append(f"node:{nid}")
-        for edge in node.get("edges", []) or []:
-            eid = edge.get("id", "<unknown>")
-            for r in edge.get("refs", []) or []:
-                if isinstance(r, str) and r.startswith("CJM:#"):
-                    stage = r.split("#", 1)[1]
-                    if stage in cov:
-                        cov[stage].append(f"edge:{nid}:{eid}")
+    for ref in index.refs("cjm"):
+        if ref.target in cov:
+            cov[ref.target].append(ref.loc.label())
     # remove duplicates while preserving order
     for k, lst in cov.items():
-        seen = set()
-        uniq = []
-        for x in lst:
-            if x in seen:
-                continue
-            seen.add(x)
-            uniq.append(x)
-        cov[k] = uniq
+        cov[k] = list(dict.fromkeys(lst))
     return cov
 
 # ------------------------
@@ -180,95 +478,542 @@ def cjm_coverage_map(userflow_doc: dict, cjm_ids: set[str]) -> dict[str, list[st
 def _is_list_of_strings(v) -> bool:
     return isinstance(v, list) and all(isinstance(x, str) for x in v)
 
-def validate_cjm_schema(doc: dict) -> list[tuple[str, str]]:
-    issues: list[tuple[str, str]] = []
+def validate_cjm_schema(doc: dict) -> list[Issue]:
+    issues: list[Issue] = []
     if not isinstance(doc, dict):
-        return [("schema-violation", "CJM: root is not an object")] 
+        return [Issue("schema-violation", "CJM: root is not an object", mptr(CJM_PATH))]
     if not isinstance(doc.get("cjm"), list):
-        issues.append(("schema-violation", "CJM: 'cjm' must be an array"))
+        issues.append(Issue("schema-violation", "CJM: 'cjm' must be an array", mptr(CJM_PATH, "cjm")))
         return issues
     for i, stage in enumerate(doc.get("cjm", [])):
         path = f"cjm[{i}]"
         if not isinstance(stage, dict):
-            issues.append(("schema-violation", f"{path}: must be an object"))
+            issues.append(Issue("schema-violation", f"{path}: must be an object", dotted_ptr(CJM_PATH, path)))
             continue
         if not isinstance(stage.get("id"), str) or not stage["id"]:
-            issues.append(("schema-violation", f"{path}.id: required non-empty string"))
+            issues.append(Issue("schema-violation", f"{path}.id: required non-empty string", dotted_ptr(CJM_PATH, path + ".id")))
         if "refs" in stage and not _is_list_of_strings(stage.get("refs")):
-            issues.append(("schema-violation", f"{path}.refs: must be array of strings if present"))
+            issues.append(Issue("schema-violation", f"{path}.refs: must be array of strings if present", dotted_ptr(CJM_PATH, path + ".refs")))
     return issues
 
-def validate_userflow_schema(doc: dict) -> list[tuple[str, str]]:
-    issues: list[tuple[str, str]] = []
+def validate_userflow_schema(doc: dict) -> list[Issue]:
+    issues: list[Issue] = []
     if not isinstance(doc, dict):
-        return [("schema-violation", "UserFlow: root is not an object")]
+        return [Issue("schema-violation", "UserFlow: root is not an object", mptr(UF_PATH))]
     if not isinstance(doc.get("user_flow"), list):
-        issues.append(("schema-violation", "UserFlow: 'user_flow' must be an array"))
+        issues.append(Issue("schema-violation", "UserFlow: 'user_flow' must be an array", mptr(UF_PATH, "user_flow")))
         return issues
     for i, node in enumerate(doc.get("user_flow", [])):
         npath = f"user_flow[{i}]"
         if not isinstance(node, dict):
-            issues.append(("schema-violation", f"{npath}: must be an object"))
+            issues.append(Issue("schema-violation", f"{npath}: must be an object", dotted_ptr(UF_PATH, npath)))
             continue
         if not isinstance(node.get("id"), str) or not node["id"]:
-            issues.append(("schema-violation", f"{npath}.id: required non-empty string"))
+            issues.append(Issue("schema-violation", f"{npath}.id: required non-empty string", dotted_ptr(UF_PATH, npath + ".id")))
         if not isinstance(node.get("type"), str) or not node["type"]:
-            issues.append(("schema-violation", f"{npath}.type: required non-empty string"))
+            issues.append(Issue("schema-violation", f"{npath}.type: required non-empty string", dotted_ptr(UF_PATH, npath + ".type")))
         if "refs" in node and not _is_list_of_strings(node.get("refs")):
-            issues.append(("schema-violation", f"{npath}.refs: must be array of strings if present"))
+            issues.append(Issue("schema-violation", f"{npath}.refs: must be array of strings if present", dotted_ptr(UF_PATH, npath + ".refs")))
         edges = node.get("edges")
         if edges is not None:
             if not isinstance(edges, list):
-                issues.append(("schema-violation", f"{npath}.edges: must be an array if present"))
+                issues.append(Issue("schema-violation", f"{npath}.edges: must be an array if present", dotted_ptr(UF_PATH, npath + ".edges")))
             else:
                 for j, edge in enumerate(edges):
                     epath = f"{npath}.edges[{j}]"
                     if not isinstance(edge, dict):
-                        issues.append(("schema-violation", f"{epath}: must be an object"))
+                        issues.append(Issue("schema-violation", f"{epath}: must be an object", dotted_ptr(UF_PATH, epath)))
                         continue
                     if not isinstance(edge.get("id"), str) or not edge["id"]:
-                        issues.append(("schema-violation", f"{epath}.id: required non-empty string"))
+                        issues.append(Issue("schema-violation", f"{epath}.id: required non-empty string", dotted_ptr(UF_PATH, epath + ".id")))
                     if not isinstance(edge.get("target"), str) or not edge["target"]:
-                        issues.append(("schema-violation", f"{epath}.target: required non-empty string"))
+                        issues.append(Issue("schema-violation", f"{epath}.target: required non-empty string", dotted_ptr(UF_PATH, epath + ".target")))
                     if "refs" in edge and not _is_list_of_strings(edge.get("refs")):
-                        issues.append(("schema-violation", f"{epath}.refs: must be array of strings if present"))
+                        issues.append(Issue("schema-violation", f"{epath}.refs: must be array of strings if present", dotted_ptr(UF_PATH, epath + ".refs")))
     # analytics_events
     if "analytics_events" in doc:
         if not isinstance(doc.get("analytics_events"), list):
-            issues.append(("schema-violation", "analytics_events: must be an array if present"))
+            issues.append(Issue("schema-violation", "analytics_events: must be an array if present", mptr(UF_PATH, "analytics_events")))
         else:
             for i, ev in enumerate(doc.get("analytics_events", [])):
                 epath = f"analytics_events[{i}]"
                 if not isinstance(ev, dict):
-                    issues.append(("schema-violation", f"{epath}: must be an object"))
+                    issues.append(Issue("schema-violation", f"{epath}: must be an object", dotted_ptr(UF_PATH, epath)))
                     continue
                 if not isinstance(ev.get("event"), str) or not ev["event"]:
-                    issues.append(("schema-violation", f"{epath}.event: required non-empty string"))
+                    issues.append(Issue("schema-violation", f"{epath}.event: required non-empty string", dotted_ptr(UF_PATH, epath + ".event")))
                 if "owner" in ev and not isinstance(ev.get("owner"), str):
-                    issues.append(("schema-violation", f"{epath}.owner: must be a string if present"))
+                    issues.append(Issue("schema-violation", f"{epath}.owner: must be a string if present", dotted_ptr(UF_PATH, epath + ".owner")))
                 if "kpi_ref" in ev and not isinstance(ev.get("kpi_ref"), str):
-                    issues.append(("schema-violation", f"{epath}.kpi_ref: must be a string if present"))
+                    issues.append(Issue("schema-violation", f"{epath}.kpi_ref: must be a string if present", dotted_ptr(UF_PATH, epath + ".kpi_ref")))
     return issues
 
 
-def main():
-    cjm = load_json(CJM_PATH)
-    uf = load_json(UF_PATH)
-    prd = load_json(PRD_PATH)
+# ------------------------
+# Source map: monolith pointers -> specs/** files
+# ------------------------
+
+# monolith file -> (collection key, id field, source glob, item pointer inside the source file or None for whole file)
+MONOLITH_SOURCES = {
+    PRD_PATH.name: ("prd", "id", "specs/00_prd/sections/*.json", None),
+    CJM_PATH.name: ("cjm", "id", "specs/01_cjm/stages/*.json", None),
+    UF_PATH.name: ("user_flow", "id", "specs/02_userflow/nodes/*.json", "nodes"),
+    UX_PATH.name: ("principles", "id", "specs/03_ux_principles/principles/*.json", None),
+    STORIES_PATH.name: ("stories", "story_id", "specs/04_userstories/us/*.json", None),
+    HIG_PATH.name: ("stories", "story_id", "specs/05_hig/stories/*/candidates.json", None),
+    CTX_UX_PATH.name: ("local_principles", "id", "specs/06_ctxux/screens/*.json", "local_principles"),
+}
+
+
+class SourceMap:
+    """Translates monolith pointers (02_UserFlow_v1.json#/user_flow/3/edges/0) to (specs/** file, JSON pointer).
+
+    Items are matched by id; source files are read lazily, once per monolith. Pointers that do not
+    land on a collection item resolve to the monolith itself under specs/_build.
+    """
+
+    def __init__(self, docs: Dict[str, Any]):
+        self.docs = docs  # monolith file name -> parsed monolith
+        self._items: Dict[str, Dict[Any, Tuple[str, str]]] = {}
+
+    def _index(self, name: str) -> Dict[Any, Tuple[str, str]]:
+        if name not in self._items:
+            _, id_field, pattern, inner = MONOLITH_SOURCES[name]
+            items: Dict[Any, Tuple[str, str]] = {}
+            for path in sorted(ROOT.glob(pattern)):
+                try:
+                    data = load_json(path)
+                except (OSError, ValueError):
+                    continue
+                rel = path.relative_to(ROOT).as_posix()
+                if inner is None:
+                    items.setdefault(data.get(id_field), (rel, ""))
+                    continue
+                for i, item in enumerate(data.get(inner, []) or []):
+                    if isinstance(item, dict):
+                        # CtxUX local principles are only unique per screen
+                        key = (data.get("id"), item.get(id_field)) if name == CTX_UX_PATH.name else item.get(id_field)
+                        items.setdefault(key, (rel, json_pointer(inner, i)))
+            self._items[name] = items
+        return self._items[name]
+
+    def resolve(self, ptr: Optional[str]) -> Tuple[Optional[str], str]:
+        if not ptr:
+            return None, ""
+        name, _, pointer = ptr.partition("#")
+        fallback = (f"specs/_build/{name}", pointer)
+        parts = pointer.split("/")[1:]
+        if name == UF_PATH.name and parts[:1] == ["data_dictionary"]:
+            # flattened from extracted_keys and entity properties; only the file is known
+            return "specs/02_userflow/data_dictionary.json", ""
+        if name not in MONOLITH_SOURCES or len(parts) < 2 or not parts[1].isdigit():
+            return fallback
+        coll, id_field, _, _ = MONOLITH_SOURCES[name]
+        try:
+            item = (self.docs.get(name) or {}).get(coll, [])[int(parts[1])]
+        except (IndexError, TypeError, AttributeError):
+            return fallback
+        if not isinstance(item, dict) or parts[0] != coll:
+            return fallback
+        key = item.get(id_field)
+        if name == CTX_UX_PATH.name:
+            key = (item.get("screen_id"), key)
+        hit = self._index(name).get(key)
+        if hit is None:
+            return fallback
+        rel, base = hit
+        rest = "".join("/" + p for p in parts[2:])
+        # HIG stories are rebuilt from candidates.json, so only the file is known
+        return rel, base if name == HIG_PATH.name else base + rest
+
+
+# ------------------------
+# Reporters: text (default), json, ndjson, sarif
+# ------------------------
+
+class TextReporter:
+    """Human-readable colored report; issues are buffered to print the summary before the details."""
+
+    RED = "\033[31m"
+    GREEN = "\033[32m"
+    YELLOW = "\033[33m"
+    CYAN = "\033[36m"
+    BOLD = "\033[1m"
+    RESET = "\033[0m"
+
+    def __init__(self, out, source_map: SourceMap):
+        self.out = out
+        self.issues: List[Issue] = []
+
+    def print(self, line: str = "") -> None:
+        self.out.write(line + "\n")
+
+    def heading(self, title: str) -> None:
+        self.print(f"{self.BOLD}{self.CYAN}{title}{self.RESET}")
+
+    def ok(self, msg: str) -> None:
+        self.print(f"{self.GREEN}✔ {msg}{self.RESET}")
+
+    def warn(self, msg: str) -> None:
+        self.print(f"{self.YELLOW}• {msg}{self.RESET}")
+
+    def err(self, msg: str) -> None:
+        self.print(f"{self.RED}✖ {msg}{self.RESET}")
+
+    def coverage(self, title: str, rows: List[Tuple[str, List[str]]], empty: str = "(no references)") -> None:
+        self.heading(title)
+        for label, locs in rows:
+            if locs:
+                self.print(f"{self.BOLD}- {label}:{self.RESET}")
+                for loc in locs:
+                    self.print(f"    • {loc}")
+            else:
+                self.warn(f"{label}: {empty}")
+
+    def issue(self, issue: Issue) -> None:
+        self.issues.append(issue)
+
+    def profile(self, stats: List["RuleStat"]) -> None:
+        self.heading("Rule profile (slowest first)")
+        self.print(f"  {'rule':<24} {'ms':>9} {'peak KiB':>9} {'blocks':>8} {'issues':>6}")
+        for st in sorted(stats, key=lambda st: -st.seconds):
+            self.print(f"  {st.rule:<24} {1000 * st.seconds:>9.2f} {st.peak_kib:>9.1f} {st.blocks:>8} {st.issues:>6}")
+        self.print(f"  {'total':<24} {1000 * sum(st.seconds for st in stats):>9.2f}")
+
+    def finish(self, counts: Dict[str, int]) -> None:
+        if not self.issues:
+            self.ok("No issues found. Cross-spec trace looks consistent.")
+            return
+        self.heading("Issues found")
+        fatal = sum(c for k, c in counts.items() if severity(k) == "error")
+        warns = sum(c for k, c in counts.items() if severity(k) == "warning")
+        self.print(f"{self.RED}Total: {fatal} fatal{self.RESET}, {self.YELLOW}{warns} warning(s){self.RESET}")
+        for k, c in Counter(i.kind for i in self.issues).most_common():
+            self.err(f"{k}: {c}")
+        self.heading("Details")
+        for k, v, _ in self.issues:
+            color = self.YELLOW if severity(k) == "warning" else self.RED
+            self.print(f"  - {color}{k}{self.RESET}: {v}")
+
+
+class NdjsonReporter:
+    """One JSON record per line, written as soon as it is produced."""
+
+    def __init__(self, out, source_map: SourceMap):
+        self.out = out
+        self.source_map = source_map
+        self.section = ""
+
+    def record(self, rec: dict) -> None:
+        self.out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def heading(self, title: str) -> None:
+        self.section = title
+
+    def _message(self, level: str, msg: str) -> None:
+        self.record({"type": "message", "level": level, "section": self.section, "message": msg})
+
+    def ok(self, msg: str) -> None:
+        self._message("ok", msg)
+
+    def warn(self, msg: str) -> None:
+        self._message("warning", msg)
+
+    def err(self, msg: str) -> None:
+        self._message("error", msg)
+
+    def coverage(self, title: str, rows: List[Tuple[str, List[str]]], empty: str = "(no references)") -> None:
+        self.section = title
+        self.record({"type": "coverage", "title": title, "map": {label: locs for label, locs in rows}})
+
+    def issue_record(self, issue: Issue) -> dict:
+        path, pointer = self.source_map.resolve(issue.ptr)
+        return {"type": "issue", "rule": issue.kind, "severity": severity(issue.kind), "message": issue.detail,
+                "file": path, "pointer": pointer}
+
+    def issue(self, issue: Issue) -> None:
+        self.record(self.issue_record(issue))
+
+    def profile(self, stats: List["RuleStat"]) -> None:
+        self.record({"type": "profile", "rules": [st._asdict() for st in stats]})
+
+    def summary(self, counts: Dict[str, int]) -> dict:
+        return {"type": "summary",
+                "fatal": sum(c for k, c in counts.items() if severity(k) == "error"),
+                "warnings": sum(c for k, c in counts.items() if severity(k) == "warning"),
+                "rules": dict(sorted(counts.items()))}
+
+    def finish(self, counts: Dict[str, int]) -> None:
+        self.record(self.summary(counts))
+
+
+class JsonReporter(NdjsonReporter):
+    """A single JSON document {"records": [...], "summary": {...}}, streamed record by record."""
+
+    def __init__(self, out, source_map: SourceMap):
+        super().__init__(out, source_map)
+        self.count = 0
+        self.out.write('{"records": [\n')
+
+    def record(self, rec: dict) -> None:
+        self.out.write((",\n" if self.count else "") + json.dumps(rec, ensure_ascii=False))
+        self.count += 1
+
+    def finish(self, counts: Dict[str, int]) -> None:
+        self.out.write('\n], "summary": ' + json.dumps(self.summary(counts), ensure_ascii=False) + "}\n")
+
+
+class SarifReporter(NdjsonReporter):
+    """SARIF 2.1.0 log; results are streamed, rules and coverage maps are written at the end."""
+
+    def __init__(self, out, source_map: SourceMap):
+        super().__init__(out, source_map)
+        self.count = 0
+        self.coverage_maps: List[dict] = []
+        self.profile_rows: List[dict] = []
+        self.out.write('{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", '
+                       '"runs": [{"results": [\n')
+
+    def _message(self, level: str, msg: str) -> None:
+        pass
+
+    def coverage(self, title: str, rows: List[Tuple[str, List[str]]], empty: str = "(no references)") -> None:
+        self.coverage_maps.append({"title": title, "map": {label: locs for label, locs in rows}})
+
+    def profile(self, stats: List["RuleStat"]) -> None:
+        self.profile_rows = [st._asdict() for st in stats]
+
+    def issue(self, issue: Issue) -> None:
+        path, pointer = self.source_map.resolve(issue.ptr)
+        result = {"ruleId": issue.kind, "level": severity(issue.kind), "message": {"text": str(issue.detail)}}
+        if path:
+            result["locations"] = [{
+                "physicalLocation": {"artifactLocation": {"uri": path}},
+                "logicalLocations": [{"fullyQualifiedName": pointer or "/", "kind": "member"}],
+            }]
+        self.out.write((",\n" if self.count else "") + json.dumps(result, ensure_ascii=False))
+        self.count += 1
+
+    def finish(self, counts: Dict[str, int]) -> None:
+        driver = {"name": "trace_validator",
+                  "rules": [{"id": k, "defaultConfiguration": {"level": severity(k)}} for k in sorted(counts)]}
+        properties = {"coverage": self.coverage_maps}
+        if self.profile_rows:
+            properties["profile"] = self.profile_rows
+        tail = {"tool": {"driver": driver}, "properties": properties}
+        self.out.write("\n], " + json.dumps(tail, ensure_ascii=False)[1:] + "]}\n")
+
+
+REPORTERS = {"text": TextReporter, "json": JsonReporter, "ndjson": NdjsonReporter, "sarif": SarifReporter}
+
+
+class IssueSink:
+    """List-like issue collector that hands every issue to the reporter as soon as it is raised."""
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.counts: Counter = Counter()
+        self.rule: Optional[str] = None  # set by RuleProfiler.lap
+        self.by_rule: Dict[Optional[str], List[Issue]] = defaultdict(list)
+
+    def append(self, issue) -> None:
+        issue = issue if isinstance(issue, Issue) else Issue(*issue)
+        self.counts[issue.kind] += 1
+        self.by_rule[self.rule].append(issue)
+        self.reporter.issue(issue)
+
+    def __iadd__(self, items):
+        for issue in items:
+            self.append(issue)
+        return self
+
+    def fatal(self) -> int:
+        return sum(c for k, c in self.counts.items() if severity(k) == "error")
+
+
+# ------------------------
+# Rule registry and per-rule profiling
+# ------------------------
+
+# Checks run by main(), in execution order; each one is a lap of RuleProfiler
+RULES = {
+    "schema": "structural checks of every monolith",
+    "jsonschema": "formal JSON Schema validation (when jsonschema is installed)",
+    "ref-index": "single walk over UserFlow nodes/edges/analytics",
+    "userflow-refs": "UserFlow CJM refs",
+    "analytics-events": "analytics event owners and kpi refs",
+    "io-dd": "node inputs/outputs against the data dictionary",
+    "cjm-coverage": "CJM stage coverage in UserFlow",
+    "prd-refs": "PRD refs from CJM and UserFlow",
+    "prd-subids": "PRD sub-id base resolution",
+    "duplicate-ids": "duplicate UserFlow node ids",
+    "reachability": "UserFlow nodes unreachable from the entry",
+    "dead-ends": "UserFlow nodes without outgoing edges",
+    "decision-defaults": "exhaustive decisions without a default edge",
+    "guards": "guard parsing, operators, literals and data dictionary variables",
+    "dd-unused": "unused required data dictionary fields",
+    "analytics-integrity": "analytics owners, kpi refs and param types",
+    "stories-flow-prd": "story AC lines with FLOW refs but no PRD ref",
+    "report": "summary and CJM/PRD/DD coverage output",
+    "ux": "UX refs and coverage",
+    "stories-refs": "User Stories refs and coverage",
+    "hig": "HIG patterns schema, sources and story links",
+    "ctxux": "Contextual UX schema and cross-refs",
+}
+
+ALL_INPUTS = ("prd", "cjm", "userflow", "ux", "userstories", "hig", "ctxux")
+
+# Rules that only raise issues -> build assemblers whose monoliths they read. With a rule cache
+# (see main()), such a rule replays its previous issues when none of its inputs was rebuilt.
+# Unlisted rules feed later rules or the report and always run.
+RULE_INPUTS = {
+    "schema": ("prd", "cjm", "userflow", "ux", "userstories"),
+    "jsonschema": ("prd", "cjm", "userflow", "ux", "userstories", "hig"),
+    "userflow-refs": ("userflow",),
+    "analytics-events": ("userflow",),
+    "io-dd": ("userflow",),
+    "prd-subids": ("prd", "cjm", "userflow"),
+    "duplicate-ids": ("userflow",),
+    "dead-ends": ("userflow",),
+    "decision-defaults": ("userflow",),
+    "analytics-integrity": ("userflow",),
+    "stories-flow-prd": ("userstories",),
+    "hig": ("hig", "userstories"),
+}
+
+
+class RuleStat(NamedTuple):
+    rule: str
+    seconds: float
+    peak_kib: float  # tracemalloc peak above the memory held when the rule started
+    blocks: int  # net allocated memory blocks left behind by the rule
+    issues: int
+
+
+class RuleProfiler:
+    """Lap timer over the registered rules: lap(name) closes the running rule and starts the next.
+
+    Disabled, it only tracks the current rule name. Enabled, it records wall time, tracemalloc
+    peak, net allocated blocks and raised issues per rule; with dump set every rule also runs
+    under its own cProfile.Profile and the stats of the slowest one are written there.
+    lap() returns False when a RULE_INPUTS rule can be skipped: cache holds its issues from a
+    previous run and no assembler in dirty feeds it. Those issues are replayed instead.
+    """
+
+    def __init__(self, issues: IssueSink, enabled: bool = False, dump: Optional[Path] = None,
+                 cache: Optional[Dict[str, List[Issue]]] = None, dirty: Iterable[str] = ALL_INPUTS):
+        self.issues = issues
+        self.enabled = enabled or dump is not None
+        self.dump = dump
+        self.cache = cache
+        self.dirty = set(dirty)
+        self.stats: List[RuleStat] = []
+        self.current: Optional[str] = None
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._started_tracing = False
+
+    def lap(self, rule: Optional[str]) -> bool:
+        if rule is not None and rule not in RULES:
+            raise KeyError(f"unregistered rule: {rule}")
+        self._lap(rule)
+        self.issues.rule = rule
+        if self.cache is None or rule not in RULE_INPUTS or rule not in self.cache:
+            return True
+        if self.dirty.intersection(RULE_INPUTS[rule]):
+            return True
+        self.issues += self.cache[rule]
+        return False
+
+    def _lap(self, rule: Optional[str]) -> None:
+        if not self.enabled:
+            self.current = rule
+            return
+        now = time.perf_counter()
+        if self.current is not None:
+            self._prof.disable()
+            self.stats.append(RuleStat(
+                self.current, now - self._t0,
+                round((tracemalloc.get_traced_memory()[1] - self._base) / 1024, 1),
+                sys.getallocatedblocks() - self._blocks,
+                sum(self.issues.counts.values()) - self._issues,
+            ))
+        elif rule is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.current = rule
+        if rule is None:
+            if self._started_tracing:
+                tracemalloc.stop()
+            return
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        self._issues = sum(self.issues.counts.values())
+        self._blocks = sys.getallocatedblocks()
+        self._prof = self._profiles[rule] = cProfile.Profile() if self.dump else _NullProfile()
+        self._t0 = time.perf_counter()
+        self._prof.enable()
+
+    def stop(self) -> List[RuleStat]:
+        """Close the running rule, write the pstats dump if requested and return the table."""
+        self._lap(None)
+        self.issues.rule = None
+        if self.cache is not None:
+            self.cache.clear()
+            self.cache.update((rule, list(self.issues.by_rule.get(rule, ()))) for rule in RULE_INPUTS)
+        if self.dump and self.stats:
+            slowest = max(self.stats, key=lambda st: st.seconds)
+            self._profiles[slowest.rule].dump_stats(str(self.dump))
+            print(f"cProfile stats for slowest rule '{slowest.rule}' written to {self.dump}", file=sys.stderr)
+        return self.stats
+
+
+class _NullProfile:
+    def enable(self) -> None:
+        pass
+
+    def disable(self) -> None:
+        pass
+
+
+def main(docs: Optional[Dict[str, dict]] = None, fmt: str = "text", out=None,
+         profile: bool = False, profile_dump: Optional[Path] = None,
+         cache: Optional[Dict[str, List[Issue]]] = None, dirty: Iterable[str] = ALL_INPUTS) -> int:
+    """Validate the build artifacts and write the report; returns the process exit code.
+
+    docs optionally maps build assembler names (prd, cjm, userflow, ux, userstories, hig, ctxux)
+    to in-memory monoliths, e.g. from a warm watch process; missing ones are read from disk.
+    fmt selects the reporter (text, json, ndjson, sarif); out defaults to stdout.
+    profile adds a per-rule timing/allocation/issue table to the report; profile_dump writes
+    cProfile stats of the slowest rule to that path.
+    cache (rule -> issues) is refilled by every run. Given one from a previous run over the
+    same docs, RULE_INPUTS rules none of whose inputs is in dirty (assembler names rebuilt since)
+    replay their cached issues instead of running. Leave the cache out (or empty) for a full run.
+    """
+    docs = docs or {}
+
+    def load_doc(name: str, path: Path):
+        doc = docs.get(name)
+        if isinstance(doc, dict) and doc:
+            return doc
+        return load_json(path)
+
+    cjm = load_doc("cjm", CJM_PATH)
+    uf = load_doc("userflow", UF_PATH)
+    prd = load_doc("prd", PRD_PATH)
     try:
-        ux = load_json(UX_PATH)
+        ux = load_doc("ux", UX_PATH)
     except FileNotFoundError:
         ux = None
     try:
-        stories = load_json(STORIES_PATH)
+        stories = load_doc("userstories", STORIES_PATH)
     except FileNotFoundError:
         stories = None
     try:
-        hig = load_json(HIG_PATH)
+        hig = load_doc("hig", HIG_PATH)
     except FileNotFoundError:
         hig = None
     try:
-        ctxux = load_json(CTX_UX_PATH)
+        ctxux = load_doc("ctxux", CTX_UX_PATH)
     except FileNotFoundError:
         ctxux = None
     try:
@@ -279,199 +1024,203 @@ def main():
     cjm_ids = gather_cjm_stage_ids(cjm)
     prd_ids = {item.get("id") for item in prd.get("prd", []) if isinstance(item, dict) and item.get("id")}
 
-    issues = []
+    monoliths = {CJM_PATH.name: cjm, UF_PATH.name: uf, PRD_PATH.name: prd, UX_PATH.name: ux,
+                 STORIES_PATH.name: stories, HIG_PATH.name: hig, CTX_UX_PATH.name: ctxux}
+    reporter = REPORTERS[fmt](out or sys.stdout, SourceMap(monoliths))
+    # Issues stream to the reporter as they are raised
+    issues = IssueSink(reporter)
+    rules = RuleProfiler(issues, enabled=profile, dump=profile_dump, cache=cache, dirty=dirty)
     # Schema validation first
-    schema_issues = []
-    schema_issues += validate_cjm_schema(cjm)
-    schema_issues += validate_userflow_schema(uf)
-    # Basic PRD schema check
-    if not isinstance(prd, dict) or not isinstance(prd.get("prd"), list):
-        schema_issues.append(("schema-violation", "PRD: 'prd' must be an array"))
-    # Basic UX schema check
-    if ux is not None:
-        if not isinstance(ux, dict) or not isinstance(ux.get("principles"), list):
-            schema_issues.append(("schema-violation", "UX: 'principles' must be an array"))
-        else:
-            for i, p in enumerate(ux.get("principles", [])):
-                ppath = f"ux.principles[{i}]"
-                if not isinstance(p, dict):
-                    schema_issues.append(("schema-violation", f"{ppath}: must be an object"))
-                    continue
-                if not isinstance(p.get("id"), str) or not p["id"]:
-                    schema_issues.append(("schema-violation", f"{ppath}.id: required non-empty string"))
-                if not isinstance(p.get("title"), str) or not p["title"]:
-                    schema_issues.append(("schema-violation", f"{ppath}.title: required non-empty string"))
-                if "refs" in p and not _is_list_of_strings(p.get("refs")):
-                    schema_issues.append(("schema-violation", f"{ppath}.refs: must be array of strings if present"))
-                if "antipatterns" in p and not isinstance(p.get("antipatterns"), list):
-                    schema_issues.append(("schema-violation", f"{ppath}.antipatterns: must be an array if present"))
-                else:
-                    for j, a in enumerate(p.get("antipatterns", []) or []):
-                        apath = f"{ppath}.antipatterns[{j}]"
-                        if not isinstance(a, dict):
-                            schema_issues.append(("schema-violation", f"{apath}: must be an object"))
-                            continue
-                        if "refs" in a and not _is_list_of_strings(a.get("refs")):
-                            schema_issues.append(("schema-violation", f"{apath}.refs: must be array of strings if present"))
-    # Basic UserStories schema check
-    if stories is not None:
-        if not isinstance(stories, dict):
-            schema_issues.append(("schema-violation", "Stories: root must be an object"))
-        else:
-            if "stories" in stories and not isinstance(stories.get("stories"), list):
-                schema_issues.append(("schema-violation", "Stories: 'stories' must be an array"))
-            if "epics" in stories and not isinstance(stories.get("epics"), list):
-                schema_issues.append(("schema-violation", "Stories: 'epics' must be an array if present"))
-            for i, s in enumerate(stories.get("stories", []) or []):
-                spath = f"stories[{i}]"
-                if not isinstance(s, dict):
-                    schema_issues.append(("schema-violation", f"{spath}: must be an object"))
-                    continue
-                if not isinstance(s.get("story_id"), str) or not s["story_id"]:
-                    schema_issues.append(("schema-violation", f"{spath}.story_id: required non-empty string"))
-                if "acceptance_criteria" in s and not isinstance(s.get("acceptance_criteria"), list):
-                    schema_issues.append(("schema-violation", f"{spath}.acceptance_criteria: must be an array if present"))
-                if isinstance(s.get("acceptance_criteria"), list):
-                    for j, ac in enumerate(s.get("acceptance_criteria", [])):
-                        if not isinstance(ac, str):
-                            schema_issues.append(("schema-violation", f"{spath}.acceptance_criteria[{j}]: must be a string"))
-    if schema_issues:
-        issues += [(f"schema", msg) for _, msg in schema_issues]
-
-    # Optional: formal JSON Schema validation if jsonschema is installed
-    try:
-        import jsonschema  # type: ignore
-        def _try_schema(doc: dict, schema: dict, label: str):
-            try:
-                jsonschema.validate(instance=doc, schema=schema)
-            except Exception as e:
-                issues.append((f"schema-jsonschema-{label}", str(e)))
-
-        # Minimal illustrative schemas (can be extended later)
-        PRD_SCHEMA = {
-            "type": "object",
-            "properties": {
-                "prd": {
-                    "type": "array",
-                    "items": {"type": "object", "required": ["id", "title"],
-                               "properties": {"id": {"type": "string"}}}
-                }
-            },
-            "required": ["prd"]
-        }
-        CJM_SCHEMA = {"type": "object", "properties": {"cjm": {"type": "array"}}, "required": ["cjm"]}
-        UF_SCHEMA = {"type": "object", "properties": {"user_flow": {"type": "array"}}, "required": ["user_flow"]}
-        UX_SCHEMA = {"type": "object", "properties": {"principles": {"type": "array"}}}
-        STORIES_SCHEMA = {"type": "object", "properties": {"stories": {"type": "array"}}}
-        HIG_SCHEMA = {"type": "object", "properties": {"stories": {"type": "array"}}}
-
-        _try_schema(prd, PRD_SCHEMA, "prd")
-        _try_schema(cjm, CJM_SCHEMA, "cjm")
-        _try_schema(uf, UF_SCHEMA, "userflow")
+    if rules.lap("schema"):
+        schema_issues = []
+        schema_issues += validate_cjm_schema(cjm)
+        schema_issues += validate_userflow_schema(uf)
+        # Basic PRD schema check
+        if not isinstance(prd, dict) or not isinstance(prd.get("prd"), list):
+            schema_issues.append(Issue("schema-violation", "PRD: 'prd' must be an array", mptr(PRD_PATH, "prd")))
+        # Basic UX schema check
         if ux is not None:
-            _try_schema(ux, UX_SCHEMA, "ux")
+            if not isinstance(ux, dict) or not isinstance(ux.get("principles"), list):
+                schema_issues.append(Issue("schema-violation", "UX: 'principles' must be an array", mptr(UX_PATH, "principles")))
+            else:
+                for i, p in enumerate(ux.get("principles", [])):
+                    ppath = f"ux.principles[{i}]"
+                    if not isinstance(p, dict):
+                        schema_issues.append(Issue("schema-violation", f"{ppath}: must be an object", dotted_ptr(UX_PATH, ppath)))
+                        continue
+                    if not isinstance(p.get("id"), str) or not p["id"]:
+                        schema_issues.append(Issue("schema-violation", f"{ppath}.id: required non-empty string", dotted_ptr(UX_PATH, ppath + ".id")))
+                    if not isinstance(p.get("title"), str) or not p["title"]:
+                        schema_issues.append(Issue("schema-violation", f"{ppath}.title: required non-empty string", dotted_ptr(UX_PATH, ppath + ".title")))
+                    if "refs" in p and not _is_list_of_strings(p.get("refs")):
+                        schema_issues.append(Issue("schema-violation", f"{ppath}.refs: must be array of strings if present", dotted_ptr(UX_PATH, ppath + ".refs")))
+                    if "antipatterns" in p and not isinstance(p.get("antipatterns"), list):
+                        schema_issues.append(Issue("schema-violation", f"{ppath}.antipatterns: must be an array if present", dotted_ptr(UX_PATH, ppath + ".antipatterns")))
+                    else:
+                        for j, a in enumerate(p.get("antipatterns", []) or []):
+                            apath = f"{ppath}.antipatterns[{j}]"
+                            if not isinstance(a, dict):
+                                schema_issues.append(Issue("schema-violation", f"{apath}: must be an object", dotted_ptr(UX_PATH, apath)))
+                                continue
+                            if "refs" in a and not _is_list_of_strings(a.get("refs")):
+                                schema_issues.append(Issue("schema-violation", f"{apath}.refs: must be array of strings if present", dotted_ptr(UX_PATH, apath + ".refs")))
+        # Basic UserStories schema check
         if stories is not None:
-            _try_schema(stories, STORIES_SCHEMA, "stories")
-        if hig is not None:
-            _try_schema(hig, HIG_SCHEMA, "hig")
-    except Exception:
-        # jsonschema not available; skip without failing
-        pass
+            if not isinstance(stories, dict):
+                schema_issues.append(Issue("schema-violation", "Stories: root must be an object", mptr(STORIES_PATH)))
+            else:
+                if "stories" in stories and not isinstance(stories.get("stories"), list):
+                    schema_issues.append(Issue("schema-violation", "Stories: 'stories' must be an array", mptr(STORIES_PATH, "stories")))
+                if "epics" in stories and not isinstance(stories.get("epics"), list):
+                    schema_issues.append(Issue("schema-violation", "Stories: 'epics' must be an array if present", mptr(STORIES_PATH, "epics")))
+                for i, s in enumerate(stories.get("stories", []) or []):
+                    spath = f"stories[{i}]"
+                    if not isinstance(s, dict):
+                        schema_issues.append(Issue("schema-violation", f"{spath}: must be an object", dotted_ptr(STORIES_PATH, spath)))
+                        continue
+                    if not isinstance(s.get("story_id"), str) or not s["story_id"]:
+                        schema_issues.append(Issue("schema-violation", f"{spath}.story_id: required non-empty string", dotted_ptr(STORIES_PATH, spath + ".story_id")))
+                    if "acceptance_criteria" in s and not isinstance(s.get("acceptance_criteria"), list):
+                        schema_issues.append(Issue("schema-violation", f"{spath}.acceptance_criteria: must be an array if present", dotted_ptr(STORIES_PATH, spath + ".acceptance_criteria")))
+                    if isinstance(s.get("acceptance_criteria"), list):
+                        for j, ac in enumerate(s.get("acceptance_criteria", [])):
+                            if not isinstance(ac, str):
+                                schema_issues.append(Issue("schema-violation", f"{spath}.acceptance_criteria[{j}]: must be a string", dotted_ptr(STORIES_PATH, f"{spath}.acceptance_criteria[{j}]")))
+        if schema_issues:
+            issues += [Issue("schema", i.detail, i.ptr) for i in schema_issues]
+
+    # Optional: formal JSON Schema validation if jsonschema is installed
+    if rules.lap("jsonschema"):
+        try:
+            import jsonschema  # type: ignore
+            def _try_schema(doc: dict, schema: dict, label: str, path: Path):
+                try:
+                    jsonschema.validate(instance=doc, schema=schema)
+                except Exception as e:
+                    issues.append(Issue(f"schema-jsonschema-{label}", str(e), mptr(path, *getattr(e, "absolute_path", []))))
+
+            # Minimal illustrative schemas (can be extended later)
+            PRD_SCHEMA = {
+                "type": "object",
+                "properties": {
+                    "prd": {
+                        "type": "array",
+                        "items": {"type": "object", "required": ["id", "title"],
+                                   "properties": {"id": {"type": "string"}}}
+                    }
+                },
+                "required": ["prd"]
+            }
+            CJM_SCHEMA = {"type": "object", "properties": {"cjm": {"type": "array"}}, "required": ["cjm"]}
+            UF_SCHEMA = {"type": "object", "properties": {"user_flow": {"type": "array"}}, "required": ["user_flow"]}
+            UX_SCHEMA = {"type": "object", "properties": {"principles": {"type": "array"}}}
+            STORIES_SCHEMA = {"type": "object", "properties": {"stories": {"type": "array"}}}
+            HIG_SCHEMA = {"type": "object", "properties": {"stories": {"type": "array"}}}
+
+            _try_schema(prd, PRD_SCHEMA, "prd", PRD_PATH)
+            _try_schema(cjm, CJM_SCHEMA, "cjm", CJM_PATH)
+            _try_schema(uf, UF_SCHEMA, "userflow", UF_PATH)
+            if ux is not None:
+                _try_schema(ux, UX_SCHEMA, "ux", UX_PATH)
+            if stories is not None:
+                _try_schema(stories, STORIES_SCHEMA, "stories", STORIES_PATH)
+            if hig is not None:
+                _try_schema(hig, HIG_SCHEMA, "hig", HIG_PATH)
+        except Exception:
+            # jsonschema not available; skip without failing
+            pass
+
+    # Single walk over UserFlow nodes/edges/analytics; the rules below query this index
+    rules.lap("ref-index")
+    uf_index = RefIndex(uf)
 
     # Traceability validations
-    issues += check_userflow_refs(uf)
-    issues += check_analytics_events(uf)
-    issues += check_io_against_dd(uf)
+    if rules.lap("userflow-refs"):
+        issues += check_userflow_refs(uf_index)
+    if rules.lap("analytics-events"):
+        issues += check_analytics_events(uf)
+    if rules.lap("io-dd"):
+        issues += check_io_against_dd(uf, uf_index)
 
     # CJM coverage
-    missing_cjm = check_cjm_coverage(uf, cjm_ids)
-    cjm_cov = cjm_coverage_map(uf, cjm_ids)
+    rules.lap("cjm-coverage")
+    missing_cjm = check_cjm_coverage(uf_index, cjm_ids)
+    cjm_cov = cjm_coverage_map(uf_index, cjm_ids)
 
     # ---------------- PRD traceability ----------------
-    def _collect_prd_refs_in_cjm(obj, path="$"):
-        refs: list[tuple[str, str]] = []
+    rules.lap("prd-refs")
+    def _collect_prd_refs_in_cjm(obj, path="$", parts=()):
+        refs: list[tuple[str, str, str]] = []
         if isinstance(obj, dict):
             for k, v in obj.items():
                 if k == "refs" and isinstance(v, list):
-                    for s in v:
+                    for r, s in enumerate(v):
                         if isinstance(s, str) and s.startswith("PRD:#"):
-                            refs.append((path+".refs", s.split("#",1)[1]))
+                            refs.append((path+".refs", s.split("#",1)[1], mptr(CJM_PATH, *parts, "refs", r)))
                 else:
-                    refs.extend(_collect_prd_refs_in_cjm(v, path+f".{k}"))
+                    refs.extend(_collect_prd_refs_in_cjm(v, path+f".{k}", parts + (k,)))
         elif isinstance(obj, list):
             for i, it in enumerate(obj):
-                refs.extend(_collect_prd_refs_in_cjm(it, path+f"[{i}]"))
+                refs.extend(_collect_prd_refs_in_cjm(it, path+f"[{i}]", parts + (i,)))
         return refs
 
     cjm_prd_refs = _collect_prd_refs_in_cjm(cjm)
 
-    uf_prd_refs = []
-    # nodes and edges refs
-    for node in uf.get("user_flow", []) or []:
-        nid = node.get("id", "<unknown>")
-        for r in node.get("refs", []) or []:
-            if isinstance(r, str) and r.startswith("PRD:#"):
-                uf_prd_refs.append((f"node:{nid}", r.split("#",1)[1]))
-        for edge in node.get("edges", []) or []:
-            eid = edge.get("id", "<unknown>")
-            for r in edge.get("refs", []) or []:
-                if isinstance(r, str) and r.startswith("PRD:#"):
-                    uf_prd_refs.append((f"edge:{nid}:{eid}", r.split("#",1)[1]))
-    # analytics kpi_ref
-    for ev in uf.get("analytics_events", []) or []:
-        kr = ev.get("kpi_ref")
-        if isinstance(kr, str) and kr.startswith("PRD:#"):
-            uf_prd_refs.append((f"analytics:{ev.get('event')}", kr.split("#",1)[1]))
+    # nodes and edges refs, analytics kpi_ref
+    uf_prd_refs = [(ref.loc.label(), ref.target, ref.loc.ptr + ("/kpi_ref" if ref.loc.kind == "analytics" else "/refs"))
+                   for ref in uf_index.refs("prd")]
 
     # validate PRD refs exist
-    for loc, pid in cjm_prd_refs:
+    for loc, pid, ptr in cjm_prd_refs:
         if pid not in prd_ids:
-            issues.append(("cjm-prd-ref-missing", f"{loc} -> PRD:{pid}"))
-    for loc, pid in uf_prd_refs:
+            issues.append(Issue("cjm-prd-ref-missing", f"{loc} -> PRD:{pid}", ptr))
+    for loc, pid, ptr in uf_prd_refs:
         if pid not in prd_ids:
-            issues.append(("userflow-prd-ref-missing", f"{loc} -> PRD:{pid}"))
+            issues.append(Issue("userflow-prd-ref-missing", f"{loc} -> PRD:{pid}", ptr))
 
     # PRD coverage maps
-    from collections import defaultdict
     prd_cov_cjm: dict[str, list[str]] = defaultdict(list)
-    for loc, pid in cjm_prd_refs:
+    for loc, pid, _ in cjm_prd_refs:
         prd_cov_cjm[pid].append(loc)
     prd_cov_uf: dict[str, list[str]] = defaultdict(list)
-    for loc, pid in uf_prd_refs:
+    for loc, pid, _ in uf_prd_refs:
         prd_cov_uf[pid].append(loc)
 
     # ---------------- Additional Core Enhancements ----------------
     # 1) PRD sub-ID semantics: allow refs like PRD:#4_2.export to resolve to base PRD id 4_2
-    def _split_prd_ref(pr: str) -> Tuple[str, Optional[str]]:
-        # accepts '4_2' or '4_2.export'
-        base, *rest = pr.split('.', 1)
-        return base, (rest[0] if rest else None)
-
-    # Validate PRD sub-IDs across collected references
-    for (loc, pid) in cjm_prd_refs + uf_prd_refs:
-        base, sub = _split_prd_ref(pid)
-        if base not in prd_ids:
-            issues.append(("prd-subid-missing-base", f"{loc} -> PRD:{pid} (base {base} not found)"))
+    if rules.lap("prd-subids"):
+        def _split_prd_ref(pr: str) -> Tuple[str, Optional[str]]:
+            # accepts '4_2' or '4_2.export'
+            base, *rest = pr.split('.', 1)
+            return base, (rest[0] if rest else None)
+
+        # Validate PRD sub-IDs across collected references
+        for (loc, pid, ptr) in cjm_prd_refs + uf_prd_refs:
+            base, sub = _split_prd_ref(pid)
+            if base not in prd_ids:
+                issues.append(Issue("prd-subid-missing-base", f"{loc} -> PRD:{pid} (base {base} not found)", ptr))
 
     # 2) Duplicate ID detection
-    def _dupe_ids(objs: List[dict], field: str) -> List[str]:
-        seen, dup = set(), []
-        for o in objs or []:
-            vid = o.get(field)
-            if not isinstance(vid, str):
-                continue
-            if vid in seen:
-                dup.append(vid)
-            else:
-                seen.add(vid)
-        return dup
+    if rules.lap("duplicate-ids"):
+        def _dupe_ids(objs: List[dict], field: str) -> List[str]:
+            seen, dup = set(), []
+            for o in objs or []:
+                vid = o.get(field)
+                if not isinstance(vid, str):
+                    continue
+                if vid in seen:
+                    dup.append(vid)
+                else:
+                    seen.add(vid)
+            return dup
 
-    uf_node_dups = _dupe_ids(uf.get("user_flow", []) or [], "id")
-    if uf_node_dups:
-        issues.append(("userflow-duplicate-node-id", ", ".join(sorted(set(uf_node_dups)))))
+        uf_node_dups = _dupe_ids(uf.get("user_flow", []) or [], "id")
+        if uf_node_dups:
+            issues.append(Issue("userflow-duplicate-node-id", ", ".join(sorted(set(uf_node_dups))), mptr(UF_PATH, "user_flow")))
 
     # 3) Orphan detection and reachability graph checks in UserFlow
     # Build graph
+    rules.lap("reachability")
     node_by_id: Dict[str, dict] = {n.get("id"): n for n in uf.get("user_flow", []) or [] if isinstance(n, dict) and n.get("id")}
     adj: Dict[str, Set[str]] = {nid: set() for nid in node_by_id}
     for nid, n in node_by_id.items():
@@ -496,120 +1245,81 @@ def main():
         frontier.extend(adj.get(cur, []))
     unreachable = sorted([nid for nid in node_by_id if nid not in reachable])
     if unreachable:
-        issues.append(("userflow-unreachable-node", ", ".join(unreachable)))
+        issues.append(Issue("userflow-unreachable-node", ", ".join(unreachable), uf_index.node_ptrs.get(unreachable[0])))
 
     # dead-end detection: nodes with no outgoing edges and not terminal types
-    TERMINAL_TYPES = {"success", "error", "terminator"}
-    dead_ends = []
-    for nid, n in node_by_id.items():
-        if not (n.get("edges") or []) and n.get("type") not in TERMINAL_TYPES:
-            dead_ends.append(nid)
-    if dead_ends:
-        issues.append(("userflow-dead-end-node", ", ".join(sorted(dead_ends))))
+    if rules.lap("dead-ends"):
+        TERMINAL_TYPES = {"success", "error", "terminator"}
+        dead_ends = []
+        for nid, n in node_by_id.items():
+            if not (n.get("edges") or []) and n.get("type") not in TERMINAL_TYPES:
+                dead_ends.append(nid)
+        if dead_ends:
+            issues.append(Issue("userflow-dead-end-node", ", ".join(sorted(dead_ends)), uf_index.node_ptrs.get(min(dead_ends))))
 
     # decision default-edge checks
-    for nid, n in node_by_id.items():
-        edges = n.get("edges", []) or []
-        if not edges:
-            continue
-        has_guard = any(bool(e.get("guard")) for e in edges)
-        policy = n.get("decision_policy") or {}
-        if has_guard:
-            if policy.get("mutually_exclusive") and policy.get("exhaustive") and not policy.get("default_edge_id"):
-                issues.append(("userflow-decision-missing-default", nid))
-
-    # 4) Improved guard parser: extract identifiers robustly
-    def parse_guard_identifiers(expr: str) -> Set[str]:
-        import re
-        # tokens of interest: identifiers [A-Za-z_][A-Za-z0-9_]*
-        idents = set(re.findall(r"\b[A-Za-z_][A-Za-z0-9_]*\b", expr or ""))
-        # remove operators/keywords/booleans/common funcs
-        blacklist = {"and","or","not","true","false","len","today","if","else"}
-        return {t for t in idents if t not in blacklist}
-
-    # rebuild enum literal set
-    enum_literals = build_enum_literals(uf)
-
-    # ensure all identifiers used in guards come from data_dictionary
-    dd, dd_cov = build_dd_maps(uf)
-    for nid, n in node_by_id.items():
-        for e in n.get("edges", []) or []:
-            g = e.get("guard")
-            if not g:
+    if rules.lap("decision-defaults"):
+        for nid, n in node_by_id.items():
+            edges = n.get("edges", []) or []
+            if not edges:
                 continue
-            for ident in parse_guard_identifiers(g):
-                if ident.isdigit() or ident in enum_literals:
-                    continue
-                if ident not in dd:
-                    issues.append(("guard-var-not-in-data-dictionary", f"{nid}:{e.get('id')}:{ident}"))
-
-    # 5) Data dictionary unused fields
-    used_dd: Set[str] = set()
-    def mark_used(lst):
-        for x in lst or []:
-            if isinstance(x, str):
-                used_dd.add(x)
-    for n in uf.get("user_flow", []) or []:
-        mark_used(n.get("inputs"))
-        mark_used(n.get("outputs"))
-        for e in n.get("edges", []) or []:
-            g = e.get("guard")
-            if g:
-                for ident in parse_guard_identifiers(g):
-                    used_dd.add(ident)
+            has_guard = any(bool(e.get("guard")) for e in edges)
+            policy = n.get("decision_policy") or {}
+            if has_guard:
+                if policy.get("mutually_exclusive") and policy.get("exhaustive") and not policy.get("default_edge_id"):
+                    issues.append(Issue("userflow-decision-missing-default", nid, uf_index.node_ptrs.get(nid)))
+
+    # 4) Guard syntax/operators, and all variables used in guards come from data_dictionary
+    # (guards are compiled once, memoized)
+    rules.lap("guards")
+    guard_issues, guards = check_guards(uf, uf_index)
+    issues += guard_issues
+    dd, dd_cov = build_dd_maps(uf)
+
+    # 5) Data dictionary unused fields (node inputs/outputs and guard identifiers)
+    rules.lap("dd-unused")
+    flow_used_dd: Set[str] = {x for x in uf_index.targets("input", "output") if isinstance(x, str)}
+    for _, guard in guards:
+        flow_used_dd.update(guard.identifiers)
     # consider analytics_events params as DD usage too
-    for ev in uf.get("analytics_events", []) or []:
-        for p in ev.get("params", []) or []:
-            if isinstance(p, dict) and isinstance(p.get("name"), str):
-                used_dd.add(p["name"]) 
+    used_dd = flow_used_dd | uf_index.targets("param")
     unused_dd = sorted(list(dd - used_dd))
     # classify by coverage: fatal for required; skip optional warnings
+    dd_pos: Dict[str, int] = {}
+    for k, d in enumerate(uf.get("data_dictionary", []) or []):
+        if isinstance(d, dict) and isinstance(d.get("name"), str):
+            dd_pos.setdefault(d["name"], k)
     for name in unused_dd:
         if dd_cov.get(name, "required") == "required":
-            issues.append(("unused-required-data-dictionary", name))
+            issues.append(Issue("unused-required-data-dictionary", name, mptr(UF_PATH, "data_dictionary", dd_pos[name])))
 
     # 6) Analytics integrity checks
-    for ev in uf.get("analytics_events", []) or []:
-        event = ev.get("event")
-        if not ev.get("owner"):
-            issues.append(("analytics-missing-owner", event))
-        if not ev.get("kpi_ref"):
-            issues.append(("analytics-missing-kpi_ref", event))
-        # simple type validation for params
-        for p in ev.get("params", []) or []:
-            if not isinstance(p, dict) or not p.get("name") or not p.get("type"):
-                issues.append(("analytics-param-invalid", f"{event}:{p}"))
+    if rules.lap("analytics-integrity"):
+        for k, ev in enumerate(uf.get("analytics_events", []) or []):
+            event = ev.get("event")
+            if not ev.get("owner"):
+                issues.append(Issue("analytics-missing-owner", event, mptr(UF_PATH, "analytics_events", k)))
+            if not ev.get("kpi_ref"):
+                issues.append(Issue("analytics-missing-kpi_ref", event, mptr(UF_PATH, "analytics_events", k)))
+            # simple type validation for params
+            for q, p in enumerate(ev.get("params", []) or []):
+                if not isinstance(p, dict) or not p.get("name") or not p.get("type"):
+                    issues.append(Issue("analytics-param-invalid", f"{event}:{p}", mptr(UF_PATH, "analytics_events", k, "params", q)))
 
     # 7) Stories linkage strictness: each AC line with FLOW must include PRD
-    if stories is not None:
-        import re
-        for i, s in enumerate(stories.get("stories", []) or []):
-            for j, ac in enumerate(s.get("acceptance_criteria", []) or []):
-                has_flow = re.search(r"\b(FLOW|UserFlow):#", ac or "") is not None
-                has_prd = re.search(r"\bPRD:#", ac or "") is not None
-                if has_flow and not has_prd:
-                    issues.append(("stories-flow-without-prd", f"stories[{i}].acceptance_criteria[{j}]"))
-
-    # -------------- Pretty printing with colors --------------
-    class C:
-        RED = "\033[31m"
-        GREEN = "\033[32m"
-        YELLOW = "\033[33m"
-        CYAN = "\033[36m"
-        BOLD = "\033[1m"
-        RESET = "\033[0m"
-
-    def hdr(title: str):
-        print(f"{C.BOLD}{C.CYAN}{title}{C.RESET}")
-
-    def ok(msg: str):
-        print(f"{C.GREEN}✔ {msg}{C.RESET}")
-
-    def warn(msg: str):
-        print(f"{C.YELLOW}• {msg}{C.RESET}")
+    if rules.lap("stories-flow-prd"):
+        if stories is not None:
+            for i, s in enumerate(stories.get("stories", []) or []):
+                for j, ac in enumerate(s.get("acceptance_criteria", []) or []):
+                    has_flow = re.search(r"\b(FLOW|UserFlow):#", ac or "") is not None
+                    has_prd = re.search(r"\bPRD:#", ac or "") is not None
+                    if has_flow and not has_prd:
+                        issues.append(Issue("stories-flow-without-prd", f"stories[{i}].acceptance_criteria[{j}]",
+                                            mptr(STORIES_PATH, "stories", i, "acceptance_criteria", j)))
 
-    def err(msg: str):
-        print(f"{C.RED}✖ {msg}{C.RESET}")
+    # -------------- Report --------------
+    rules.lap("report")
+    hdr, ok, warn, err = reporter.heading, reporter.ok, reporter.warn, reporter.err
 
     hdr("Traceability validation report")
     ok(f"CJM stages: {', '.join(sorted(cjm_ids))}")
@@ -631,60 +1341,23 @@ def main():
         ok("All CJM stages referenced at least once in UserFlow refs.")
 
     # Coverage map
-    hdr("CJM coverage map (stage -> nodes/edges)")
-    for stage in sorted(cjm_cov.keys()):
-        items = cjm_cov[stage]
-        if items:
-            print(f"{C.BOLD}- {stage}:{C.RESET}")
-            for it in items:
-                print(f"    • {it}")
-        else:
-            warn(f"{stage}: (no references)")
+    reporter.coverage("CJM coverage map (stage -> nodes/edges)",
+                      [(stage, cjm_cov[stage]) for stage in sorted(cjm_cov.keys())])
 
     # PRD coverage maps
-    hdr("PRD coverage in CJM (PRD id -> locations)")
-    for pid in sorted(prd_ids):
-        locs = prd_cov_cjm.get(pid, [])
-        if locs:
-            print(f"{C.BOLD}- PRD:{pid}:{C.RESET}")
-            for l in locs:
-                print(f"    • {l}")
-        else:
-            warn(f"PRD:{pid}: (no references)")
-
-    hdr("PRD coverage in UserFlow (PRD id -> nodes/edges/analytics)")
-    for pid in sorted(prd_ids):
-        locs = prd_cov_uf.get(pid, [])
-        if locs:
-            print(f"{C.BOLD}- PRD:{pid}:{C.RESET}")
-            for l in locs:
-                print(f"    • {l}")
-        else:
-            warn(f"PRD:{pid}: (no references)")
+    reporter.coverage("PRD coverage in CJM (PRD id -> locations)",
+                      [(f"PRD:{pid}", prd_cov_cjm.get(pid, [])) for pid in sorted(prd_ids)])
+    reporter.coverage("PRD coverage in UserFlow (PRD id -> nodes/edges/analytics)",
+                      [(f"PRD:{pid}", prd_cov_uf.get(pid, [])) for pid in sorted(prd_ids)])
 
     # --------------- Data Dictionary coverage (summary) ---------------
     try:
-        dd_names, dd_cov = build_dd_maps(uf)
-        # Recompute used keys from previously computed used_dd if available; otherwise rebuild
-        used_dd: set[str] = set()
-        for n in uf.get("user_flow", []) or []:
-            for x in (n.get("inputs") or []):
-                if isinstance(x, str):
-                    used_dd.add(x)
-            for x in (n.get("outputs") or []):
-                if isinstance(x, str):
-                    used_dd.add(x)
-            for e in n.get("edges", []) or []:
-                g = e.get("guard")
-                if g:
-                    for ident in parse_guard_identifiers(g):
-                        used_dd.add(ident)
-        req = sorted([k for k in dd_names if dd_cov.get(k, "required") == "required"])
-        opt = sorted([k for k in dd_names if dd_cov.get(k, "required") == "optional"])
-        req_used = [k for k in req if k in used_dd]
-        req_unused = [k for k in req if k not in used_dd]
-        opt_used = [k for k in opt if k in used_dd]
-        opt_unused = [k for k in opt if k not in used_dd]
+        # Usage from node inputs/outputs and guards only (analytics params not counted here)
+        req = sorted([k for k in dd if dd_cov.get(k, "required") == "required"])
+        opt = sorted([k for k in dd if dd_cov.get(k, "required") == "optional"])
+        req_used = [k for k in req if k in flow_used_dd]
+        req_unused = [k for k in req if k not in flow_used_dd]
+        opt_used = [k for k in opt if k in flow_used_dd]
         hdr("Data Dictionary coverage (required/optional)")
         ok(f"Required used: {len(req_used)} / {len(req)} | Optional used: {len(opt_used)} / {len(opt)}")
         if req_unused:
@@ -695,91 +1368,71 @@ def main():
         pass
 
     # --------------- UX: check refs back to PRD/CJM and coverage ---------------
+    rules.lap("ux")
     if ux is not None:
-        from collections import defaultdict
         ux_prd_cov: dict[str, list[str]] = defaultdict(list)
         ux_cjm_cov: dict[str, list[str]] = defaultdict(list)
 
-        def collect_refs(obj, base):
+        def collect_refs(obj, base, parts=()):
             if isinstance(obj, dict):
                 if "refs" in obj and isinstance(obj.get("refs"), list):
-                    for s in obj["refs"]:
+                    for r, s in enumerate(obj["refs"]):
                         if isinstance(s, str) and s.startswith("PRD:#"):
                             pid = s.split("#",1)[1]
                             ux_prd_cov[pid].append(base)
                             if pid not in prd_ids:
-                                issues.append(("ux-prd-ref-missing", f"{base} -> PRD:{pid}"))
+                                issues.append(Issue("ux-prd-ref-missing", f"{base} -> PRD:{pid}", mptr(UX_PATH, *parts, "refs", r)))
                         if isinstance(s, str) and s.startswith("CJM:#"):
                             sid = s.split("#",1)[1]
                             ux_cjm_cov[sid].append(base)
                             if sid not in cjm_ids:
-                                issues.append(("ux-cjm-ref-missing", f"{base} -> CJM:{sid}"))
+                                issues.append(Issue("ux-cjm-ref-missing", f"{base} -> CJM:{sid}", mptr(UX_PATH, *parts, "refs", r)))
                 for k, v in obj.items():
-                    collect_refs(v, f"{base}.{k}")
+                    collect_refs(v, f"{base}.{k}", parts + (k,))
             elif isinstance(obj, list):
                 for i, it in enumerate(obj):
-                    collect_refs(it, f"{base}[{i}]")
+                    collect_refs(it, f"{base}[{i}]", parts + (i,))
 
         collect_refs(ux, "ux")
 
-        hdr("PRD coverage in UX Principles (PRD id -> locations)")
-        for pid in sorted(prd_ids):
-            locs = ux_prd_cov.get(pid, [])
-            if locs:
-                print(f"{C.BOLD}- PRD:{pid}:{C.RESET}")
-                for l in locs:
-                    print(f"    • {l}")
-            else:
-                warn(f"PRD:{pid}: (no references)")
-
-        hdr("CJM coverage in UX Principles (CJM id -> locations)")
-        for cid in sorted(cjm_ids):
-            locs = ux_cjm_cov.get(cid, [])
-            if locs:
-                print(f"{C.BOLD}- CJM:{cid}:{C.RESET}")
-                for l in locs:
-                    print(f"    • {l}")
-            else:
-                warn(f"CJM:{cid}: (no references)")
+        reporter.coverage("PRD coverage in UX Principles (PRD id -> locations)",
+                          [(f"PRD:{pid}", ux_prd_cov.get(pid, [])) for pid in sorted(prd_ids)])
+        reporter.coverage("CJM coverage in UX Principles (CJM id -> locations)",
+                          [(f"CJM:{cid}", ux_cjm_cov.get(cid, [])) for cid in sorted(cjm_ids)])
 
     # --------------- User Stories: validate refs and coverage ---------------
+    rules.lap("stories-refs")
     if stories is not None:
-        import re
-        # Build sets for FLOW validation (UserFlow ids)
-        node_ids = {n.get("id") for n in uf.get("user_flow", []) or [] if isinstance(n, dict) and n.get("id")}
-        edge_ids = set()
-        for n in uf.get("user_flow", []) or []:
-            for e in n.get("edges", []) or []:
-                if isinstance(e, dict) and e.get("id"):
-                    edge_ids.add(e.get("id"))
-
-        from collections import defaultdict
+        # Sets for FLOW validation (UserFlow ids)
+        node_ids, edge_ids = uf_index.node_ids, uf_index.edge_ids
+
         stories_prd_cov: dict[str, list[str]] = defaultdict(list)
         stories_cjm_cov: dict[str, list[str]] = defaultdict(list)
         stories_flow_cov: dict[str, list[str]] = defaultdict(list)
 
-        def check_line_for_refs(line: str, base: str):
+        def check_line_for_refs(line: str, base: str, ptr: str):
             # Supports patterns like PRD:#4_2, CJM:#daily-logging, FLOW:#node-id, UserFlow:#node-id
             for m in re.finditer(r"(PRD|CJM|FLOW|UserFlow):#([A-Za-z0-9_\-]+)", line):
                 kind, ident = m.group(1), m.group(2)
                 if kind == "PRD":
                     if ident not in prd_ids:
-                        issues.append(("stories-prd-ref-missing", f"{base} -> PRD:{ident}"))
+                        issues.append(Issue("stories-prd-ref-missing", f"{base} -> PRD:{ident}", ptr))
                     stories_prd_cov[ident].append(base)
                 elif kind == "CJM":
                     if ident not in cjm_ids:
-                        issues.append(("stories-cjm-ref-missing", f"{base} -> CJM:{ident}"))
+                        issues.append(Issue("stories-cjm-ref-missing", f"{base} -> CJM:{ident}", ptr))
                     stories_cjm_cov[ident].append(base)
                 else:  # FLOW/UserFlow
                     # accept if ident is a node id or an edge id
                     if ident not in node_ids and ident not in edge_ids:
-                        issues.append(("stories-flow-ref-missing", f"{base} -> FLOW:{ident}"))
+                        issues.append(Issue("stories-flow-ref-missing", f"{base} -> FLOW:{ident}", ptr))
                     stories_flow_cov[ident].append(base)
 
         for i, s in enumerate(stories.get("stories", []) or []):
             base = f"stories[{i}]"
             for j, ac in enumerate(s.get("acceptance_criteria", []) or []):
-                check_line_for_refs(ac, f"{base}.acceptance_criteria[{j}]")
+                check_line_for_refs(ac, f"{base}.acceptance_criteria[{j}]",
+                                    mptr(STORIES_PATH, "stories", i, "acceptance_criteria", j))
             # metrics
             metrics = s.get("metrics", {}) or {}
             for kind in ("leading", "lagging"):
@@ -791,96 +1444,82 @@ def main():
                             if kr.startswith("PRD:#"):
                                 pid = kr.split("#",1)[1]
                                 if pid not in prd_ids:
-                                    issues.append(("stories-kpi-prd-ref-missing", f"{base}.metrics.{kind}[{k}] -> PRD:{pid}"))
+                                    issues.append(Issue("stories-kpi-prd-ref-missing", f"{base}.metrics.{kind}[{k}] -> PRD:{pid}",
+                                                        mptr(STORIES_PATH, "stories", i, "metrics", kind, k, "kpi_ref")))
                                 stories_prd_cov[pid].append(f"{base}.metrics.{kind}[{k}]")
 
-        # Print coverage maps for stories
-        hdr("PRD coverage in User Stories (PRD id -> locations)")
-        for pid in sorted(prd_ids):
-            locs = stories_prd_cov.get(pid, [])
-            if locs:
-                print(f"{C.BOLD}- PRD:{pid}:{C.RESET}")
-                for l in locs:
-                    print(f"    • {l}")
-            else:
-                warn(f"PRD:{pid}: (no references)")
-
-        hdr("CJM coverage in User Stories (CJM id -> locations)")
-        for cid in sorted(cjm_ids):
-            locs = stories_cjm_cov.get(cid, [])
-            if locs:
-                print(f"{C.BOLD}- CJM:{cid}:{C.RESET}")
-                for l in locs:
-                    print(f"    • {l}")
-            else:
-                warn(f"CJM:{cid}: (no references)")
-
-        hdr("FLOW coverage in User Stories (UserFlow id -> story references)")
+        # Coverage maps for stories
+        reporter.coverage("PRD coverage in User Stories (PRD id -> locations)",
+                          [(f"PRD:{pid}", stories_prd_cov.get(pid, [])) for pid in sorted(prd_ids)])
+        reporter.coverage("CJM coverage in User Stories (CJM id -> locations)",
+                          [(f"CJM:{cid}", stories_cjm_cov.get(cid, [])) for cid in sorted(cjm_ids)])
         # Show only referenced ones to keep output shorter
-        for ident in sorted(stories_flow_cov.keys()):
-            locs = stories_flow_cov[ident]
-            print(f"{C.BOLD}- FLOW:{ident}:{C.RESET}")
-            for l in locs:
-                print(f"    • {l}")
+        reporter.coverage("FLOW coverage in User Stories (UserFlow id -> story references)",
+                          [(f"FLOW:{ident}", stories_flow_cov[ident]) for ident in sorted(stories_flow_cov.keys())])
 
     # --------------- HIG Patterns: validate schema, source links, governance, and story links ---------------
-    if hig is not None:
-        # source_files must point to existing files
-        sf = hig.get("source_files", {}) or {}
-        expected = {
-            "prd": PRD_PATH.name,
-            "cjm": CJM_PATH.name,
-            "user_flow": UF_PATH.name,
-            "user_stories": STORIES_PATH.name,
-            "ux_principles": UX_PATH.name,
-        }
-        for k, v in expected.items():
-            actual = sf.get(k)
-            if actual != v:
-                issues.append(("hig-source-file-mismatch", f"{k}: expected {v}, got {actual}"))
-
-        # governing rules
-        gr = hig.get("governing_rules", {}) or {}
-        # iOS min must be >= 18.0 (per user global rules)
-        ios_min = (gr.get("ios_min") or "").strip()
-        def _parse_ver(s):
-            try:
-                parts = s.split('.')
-                return tuple(int(x) for x in (parts + ['0','0'])[:2])
-            except Exception:
-                return (0,0)
-        if _parse_ver(ios_min) < _parse_ver("18.0"):
-            issues.append(("hig-ios-min-too-low", f"ios_min={ios_min}, require >= 18.0"))
-        if gr.get("swiftui_only") is not True:
-            issues.append(("hig-swiftui-only", "swiftui_only must be true"))
-
-        # cross-link story_id existence
-        story_ids = {s.get("story_id") for s in (stories or {}).get("stories", []) or [] if isinstance(s, dict)}
-        for i, st in enumerate(hig.get("stories", []) or []):
-            sid = st.get("story_id")
-            if sid and sid not in story_ids:
-                issues.append(("hig-story-not-found", f"stories[{i}].story_id={sid}"))
-
-        # stricter per-story checks: require at least one HIG section and SwiftUI primitive across candidates
-        for i, st in enumerate(hig.get("stories", []) or []):
-            cands = st.get("candidates", []) or []
-            has_hig = any(isinstance(c, dict) and c.get("hig_sections") for c in cands)
-            has_swiftui = any(isinstance(c, dict) and c.get("swiftui_primitives") for c in cands)
-            if not has_hig:
-                issues.append(("hig-story-missing-hig-section", f"stories[{i}].story_id={st.get('story_id')}"))
-            if not has_swiftui:
-                issues.append(("hig-story-missing-swiftui-primitive", f"stories[{i}].story_id={st.get('story_id')}"))
+    if rules.lap("hig"):
+        if hig is not None:
+            # source_files must point to existing files
+            sf = hig.get("source_files", {}) or {}
+            expected = {
+                "prd": PRD_PATH.name,
+                "cjm": CJM_PATH.name,
+                "user_flow": UF_PATH.name,
+                "user_stories": STORIES_PATH.name,
+                "ux_principles": UX_PATH.name,
+            }
+            for k, v in expected.items():
+                actual = sf.get(k)
+                if actual != v:
+                    issues.append(Issue("hig-source-file-mismatch", f"{k}: expected {v}, got {actual}", mptr(HIG_PATH, "source_files", k)))
+
+            # governing rules
+            gr = hig.get("governing_rules", {}) or {}
+            # iOS min must be >= 18.0 (per user global rules)
+            ios_min = (gr.get("ios_min") or "").strip()
+            def _parse_ver(s):
+                try:
+                    parts = s.split('.')
+                    return tuple(int(x) for x in (parts + ['0','0'])[:2])
+                except Exception:
+                    return (0,0)
+            if _parse_ver(ios_min) < _parse_ver("18.0"):
+                issues.append(Issue("hig-ios-min-too-low", f"ios_min={ios_min}, require >= 18.0", mptr(HIG_PATH, "governing_rules", "ios_min")))
+            if gr.get("swiftui_only") is not True:
+                issues.append(Issue("hig-swiftui-only", "swiftui_only must be true", mptr(HIG_PATH, "governing_rules", "swiftui_only")))
+
+            # cross-link story_id existence
+            story_ids = {s.get("story_id") for s in (stories or {}).get("stories", []) or [] if isinstance(s, dict)}
+            for i, st in enumerate(hig.get("stories", []) or []):
+                sid = st.get("story_id")
+                if sid and sid not in story_ids:
+                    issues.append(Issue("hig-story-not-found", f"stories[{i}].story_id={sid}", mptr(HIG_PATH, "stories", i, "story_id")))
+
+            # stricter per-story checks: require at least one HIG section and SwiftUI primitive across candidates
+            for i, st in enumerate(hig.get("stories", []) or []):
+                cands = st.get("candidates", []) or []
+                has_hig = any(isinstance(c, dict) and c.get("hig_sections") for c in cands)
+                has_swiftui = any(isinstance(c, dict) and c.get("swiftui_primitives") for c in cands)
+                if not has_hig:
+                    issues.append(Issue("hig-story-missing-hig-section", f"stories[{i}].story_id={st.get('story_id')}",
+                                        mptr(HIG_PATH, "stories", i, "candidates")))
+                if not has_swiftui:
+                    issues.append(Issue("hig-story-missing-swiftui-primitive", f"stories[{i}].story_id={st.get('story_id')}",
+                                        mptr(HIG_PATH, "stories", i, "candidates")))
 
     # --------------- Contextual UX Guidelines: validate schema and cross-refs ---------------
+    rules.lap("ctxux")
     if ctxux is not None:
         # schema basics
         if not isinstance(ctxux, dict):
-            issues.append(("schema", "ContextualUX: root must be object"))
+            issues.append(Issue("schema", "ContextualUX: root must be object", mptr(CTX_UX_PATH)))
         else:
             if "local_principles" in ctxux and not isinstance(ctxux.get("local_principles"), list):
-                issues.append(("schema", "ContextualUX: 'local_principles' must be array"))
+                issues.append(Issue("schema", "ContextualUX: 'local_principles' must be array", mptr(CTX_UX_PATH, "local_principles")))
             if "antipatterns_registry" in ctxux and not isinstance(ctxux.get("antipatterns_registry"), list):
-                issues.append(("schema", "ContextualUX: 'antipatterns_registry' must be array if present"))
+                issues.append(Issue("schema", "ContextualUX: 'antipatterns_registry' must be array if present",
+                                    mptr(CTX_UX_PATH, "antipatterns_registry")))
 
         # Build indices for cross-refs
         story_ids = {s.get("story_id") for s in (stories or {}).get("stories", []) or [] if isinstance(s, dict)}
@@ -891,21 +1530,14 @@ def main():
                 if isinstance(pid, str):
                     ux_principle_ids.add(pid)
 
-        node_ids = {n.get("id") for n in uf.get("user_flow", []) or [] if isinstance(n, dict) and n.get("id")}
+        node_ids = uf_index.node_ids
         # Known analytics events come from monolith analytics_events (if present),
         # all node/edge analytics arrays, and the source registry specs/02_userflow/analytics/events.json
         analytics_names = {a.get("event") for a in uf.get("analytics_events", []) or [] if isinstance(a, dict) and a.get("event")}
-        for n in uf.get("user_flow", []) or []:
-            for ev in (n.get("analytics") or []):
-                if isinstance(ev, str):
-                    analytics_names.add(ev)
-            for e in n.get("edges", []) or []:
-                for ev in (e.get("analytics") or []):
-                    if isinstance(ev, str):
-                        analytics_names.add(ev)
+        analytics_names |= uf_index.targets("event")
         # Add events from registry file if present
         try:
-            reg = json.load((ROOT / "specs" / "02_userflow" / "analytics" / "events.json").open("r", encoding="utf-8"))
+            reg = SPEC_CACHE.load(EVENTS_REGISTRY_PATH)
             for ev in reg.get("events", []) or []:
                 if isinstance(ev, str):
                     analytics_names.add(ev)
@@ -913,42 +1545,42 @@ def main():
             pass
 
         # Validate meta.context screen_id against UserFlow node ids (warn if missing)
-        for ctx in (ctxux.get("meta", {}) or {}).get("context", []) or []:
+        for c, ctx in enumerate((ctxux.get("meta", {}) or {}).get("context", []) or []):
             sid = None
             if isinstance(ctx, dict):
                 sid = ctx.get("screen_id")
             elif isinstance(ctx, str):
                 sid = ctx
             if sid and sid not in node_ids:
-                issues.append(("warn-ctxux-screen-not-in-userflow", sid))
+                issues.append(Issue("warn-ctxux-screen-not-in-userflow", sid, mptr(CTX_UX_PATH, "meta", "context", c)))
 
         # Validate local principles
-        from collections import defaultdict
         ctxux_story_cov: dict[str, list[str]] = defaultdict(list)
         ctxux_ux_cov: dict[str, list[str]] = defaultdict(list)
 
         for i, lp in enumerate(ctxux.get("local_principles", []) or []):
             base = f"ctxux.local_principles[{i}]"
+            ptr = mptr(CTX_UX_PATH, "local_principles", i)
             # user_story_ids coverage
             us_arr = lp.get("user_story_ids") or []
             if not isinstance(us_arr, list) or not us_arr:
-                issues.append(("warn-ctxux-missing-links", f"{base}: missing user_story_ids"))
+                issues.append(Issue("warn-ctxux-missing-links", f"{base}: missing user_story_ids", ptr))
             else:
                 for sid in us_arr:
                     if isinstance(sid, str):
                         if sid not in story_ids:
-                            issues.append(("ctxux-story-ref-missing", f"{base} -> UserStory:{sid}"))
+                            issues.append(Issue("ctxux-story-ref-missing", f"{base} -> UserStory:{sid}", ptr + "/user_story_ids"))
                         else:
                             ctxux_story_cov[sid].append(base)
             # global_principle_ids coverage
             gp_arr = lp.get("global_principle_ids") or []
             if not isinstance(gp_arr, list) or not gp_arr:
-                issues.append(("warn-ctxux-missing-links", f"{base}: missing global_principle_ids"))
+                issues.append(Issue("warn-ctxux-missing-links", f"{base}: missing global_principle_ids", ptr))
             else:
                 for gid in gp_arr:
                     if isinstance(gid, str):
                         if ux is not None and gid not in ux_principle_ids:
-                            issues.append(("ctxux-global-principle-missing", f"{base} -> UX:{gid}"))
+                            issues.append(Issue("ctxux-global-principle-missing", f"{base} -> UX:{gid}", ptr + "/global_principle_ids"))
                         else:
                             ctxux_ux_cov[gid].append(base)
             # telemetry can be a list of event names, or an object
@@ -956,64 +1588,49 @@ def main():
             if isinstance(tele, list):
                 for ev in tele:
                     if isinstance(ev, str) and ev and ev not in analytics_names:
-                        issues.append(("ctxux-telemetry-event-unknown", f"{base} -> {ev}"))
+                        issues.append(Issue("ctxux-telemetry-event-unknown", f"{base} -> {ev}", ptr + "/telemetry"))
             elif isinstance(tele, dict):
                 ev = tele.get("event")
                 if isinstance(ev, str) and ev and ev not in analytics_names:
-                    issues.append(("ctxux-telemetry-event-unknown", f"{base} -> {ev}"))
+                    issues.append(Issue("ctxux-telemetry-event-unknown", f"{base} -> {ev}", ptr + "/telemetry"))
 
         # antipatterns_registry refs to UserStory
         for i, ap in enumerate(ctxux.get("antipatterns_registry", []) or []):
             base = f"ctxux.antipatterns_registry[{i}]"
-            for r in ap.get("refs", []) or []:
+            for q, r in enumerate(ap.get("refs", []) or []):
                 if isinstance(r, str) and r.startswith("UserStory:#"):
                     sid = r.split("#", 1)[1]
                     if sid not in story_ids:
-                        issues.append(("ctxux-story-ref-missing", f"{base} -> UserStory:{sid}"))
+                        issues.append(Issue("ctxux-story-ref-missing", f"{base} -> UserStory:{sid}",
+                                            mptr(CTX_UX_PATH, "antipatterns_registry", i, "refs", q)))
 
         # Coverage outputs
-        hdr("Contextual UX coverage: UserStory id -> local principles")
-        for sid in sorted(story_ids):
-            locs = ctxux_story_cov.get(sid, [])
-            if locs:
-                print(f"{C.BOLD}- UserStory:{sid}:{C.RESET}")
-                for l in locs:
-                    print(f"    • {l}")
-            else:
-                warn(f"UserStory:{sid}: (no local principles)")
-
+        reporter.coverage("Contextual UX coverage: UserStory id -> local principles",
+                          [(f"UserStory:{sid}", ctxux_story_cov.get(sid, [])) for sid in sorted(story_ids)],
+                          empty="(no local principles)")
         if ux is not None:
-            hdr("Contextual UX coverage: UX global principle id -> local principles")
-            for gid in sorted(ux_principle_ids):
-                locs = ctxux_ux_cov.get(gid, [])
-                if locs:
-                    print(f"{C.BOLD}- UX:{gid}:{C.RESET}")
-                    for l in locs:
-                        print(f"    • {l}")
-                else:
-                    warn(f"UX:{gid}: (no local principles)")
-
-    if issues:
-        hdr("Issues found")
-        from collections import Counter
-        fatal = [(k, v) for (k, v) in issues if not str(k).startswith("warn-")]
-        warns = [(k, v) for (k, v) in issues if str(k).startswith("warn-")]
-        print(f"{C.RED}Total: {len(fatal)} fatal{C.RESET}, {C.YELLOW}{len(warns)} warning(s){C.RESET}")
-        from collections import Counter
-        counts = Counter(k for k,_ in issues)
-        for k, c in counts.most_common():
-            err(f"{k}: {c}")
-        hdr("Details")
-        for k, v in issues:
-            if str(k).startswith("warn-"):
-                print(f"  - {C.YELLOW}{k}{C.RESET}: {v}")
-            else:
-                print(f"  - {C.RED}{k}{C.RESET}: {v}")
-        sys.exit(1 if fatal else 0)
-    else:
-        ok("No issues found. Cross-spec trace looks consistent.")
-        sys.exit(0)
+            reporter.coverage("Contextual UX coverage: UX global principle id -> local principles",
+                              [(f"UX:{gid}", ctxux_ux_cov.get(gid, [])) for gid in sorted(ux_principle_ids)],
+                              empty="(no local principles)")
+
+    stats = rules.stop()
+    if stats:
+        reporter.profile(stats)
+    reporter.finish(issues.counts)
+    return 1 if issues.fatal() else 0
+
+
+def cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate cross-spec traceability of the specs/_build monoliths.")
+    parser.add_argument("--format", choices=sorted(REPORTERS), default="text",
+                        help="report format: colored text (default), a JSON document, NDJSON records or SARIF 2.1.0")
+    parser.add_argument("--profile", action="store_true",
+                        help="add a per-rule table (wall time, tracemalloc peak, allocated blocks, issues) to the report")
+    parser.add_argument("--profile-dump", type=Path, metavar="PATH",
+                        help="write cProfile/pstats stats of the slowest rule to PATH (implies --profile)")
+    args = parser.parse_args(argv)
+    return main(fmt=args.format, profile=args.profile, profile_dump=args.profile_dump)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())